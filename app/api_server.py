@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+import batch_recommendation
+import restaurant_agent
+import restaurant_agent_service
+import telemetry
+from restaurant_agent_service import RecommendationMode, TravelPlan
+
+# 동시에 처리할 요청 수와 대기열 길이 (초과 시 503 으로 즉시 거절)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 8))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", 32))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", 5))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
+# 시작 시 LLM 클라이언트/에이전트를 미리 만들어 첫 요청 지연을 없앨지 (끄면 첫 사용 시 생성)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+
+# -------------------------------------------------------------------
+# 요청 스키마
+class RecommendationRequest(TravelPlan):
+    name: Optional[str] = None
+    # "agent" / "fast" / "schedule" (미지정 시 RECOMMENDATION_MODE, 그 외 값은 422)
+    mode: Optional[RecommendationMode] = None
+
+
+class BatchRecommendationRequest(BaseModel):
+    plans: List[RecommendationRequest]
+    mode: Optional[RecommendationMode] = None  # 모든 계획에 공통 적용 (계획별 mode 는 무시)
+
+
+class RestaurantKeywords(BaseModel):
+    location: str
+    dates: str
+    age_group: str
+    themes: List[str]
+    group: Dict[str, int]
+
+
+# -------------------------------------------------------------------
+# 동시 요청 제한 + 백프레셔
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_pending = max_concurrent + max_queued
+        self.pending = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent)
+
+    def reserve(self):
+        """
+        처리 슬롯을 예약하고 해제 함수를 반환 (한도 초과 시 503)
+        확인과 증가 사이에 await 가 없으므로 동시에 들어온 요청도 한도를 넘지 못함
+        """
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="요청이 많아 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        self.pending += 1
+        released = False
+
+        def release():
+            # 스트림 종료와 응답 후 백그라운드 작업 양쪽에서 호출되므로 한 번만 반영
+            nonlocal released
+            if not released:
+                released = True
+                self.pending -= 1
+
+        return release
+
+    async def run(self, func, *args):
+        release = self.reserve()
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            release()
+
+    async def stream(self, release, func, *args):
+        """
+        동기 제너레이터를 워커 스레드에서 한 항목씩 꺼내 비동기로 전달 (슬롯은 reserve() 로 미리 예약)
+        클라이언트 연결이 끊겨 중간에 취소되면 제너레이터를 닫아 LLM 스트림 등 진행 중인 작업도 정리
+        """
+        iterator = None
+        running = None
+        try:
+            async with self._semaphore:
+                iterator = func(*args)
+                sentinel = object()
+                while True:
+                    running = self._executor.submit(next, iterator, sentinel)
+                    item = await asyncio.wrap_future(running)
+                    if item is sentinel:
+                        break
+                    yield item
+        finally:
+            release()
+            if iterator is not None:
+                # 실행 중인 next() 가 있으면 끝난 뒤 그 스레드에서 닫음 (실행 중인 제너레이터는 닫을 수 없음)
+                if running is not None and not running.done():
+                    running.add_done_callback(lambda _: iterator.close())
+                else:
+                    iterator.close()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+limiter = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS)
+telemetry.metrics.gauge(
+    "foodrec_pending_requests",
+    "처리 중이거나 대기 중인 요청 수",
+    lambda: [({}, limiter.pending)],
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 에이전트/LLM 클라이언트는 처음 사용할 때 한 번만 만들어지고 모든 요청에서 재사용됨
+    if WARMUP_ON_STARTUP:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, restaurant_agent_service.warm_up)
+        await loop.run_in_executor(None, restaurant_agent.get_llm)
+    yield
+    limiter.shutdown()
+
+
+app = FastAPI(title="맛집 추천 API", lifespan=lifespan)
+
+
+# -------------------------------------------------------------------
+# 엔드포인트
+@app.get("/health")
+async def health():
+    return {"status": "ok", "pending": limiter.pending}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(
+        telemetry.metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.post("/recommendations")
+async def recommendations(request: RecommendationRequest):
+    input_data = request.model_dump(exclude={"mode"}, exclude_none=True)
+    result = await limiter.run(
+        restaurant_agent_service.create_recommendation, input_data, request.mode
+    )
+    if "error" in result:
+        return JSONResponse(status_code=500, content=result)
+    return result
+
+
+@app.post("/recommendations/stream")
+async def recommendations_stream(request: RecommendationRequest):
+    # NDJSON 스트림: 한 줄에 이벤트 하나 (plan, spot..., done 또는 error)
+    release = limiter.reserve()
+    input_data = request.model_dump(exclude={"mode"}, exclude_none=True)
+
+    async def events():
+        async for event in limiter.stream(
+            release, restaurant_agent_service.stream_recommendation, input_data
+        ):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    # 스트림이 시작되기 전에 연결이 끊겨도 예약한 슬롯은 응답 후 해제
+    background = BackgroundTasks()
+    background.add_task(release)
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=background)
+
+
+@app.post("/recommendations/batch")
+async def recommendations_batch(request: BatchRecommendationRequest):
+    # NDJSON 스트림: 계획별 결과를 끝나는 순서대로 한 줄씩 ({"index": 입력 순번, ...})
+    if len(request.plans) > batch_recommendation.BATCH_MAX_PLANS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {batch_recommendation.BATCH_MAX_PLANS}개의 여행 계획만 처리할 수 있습니다.",
+        )
+    release = limiter.reserve()
+    inputs = [
+        plan.model_dump(exclude={"mode"}, exclude_none=True) for plan in request.plans
+    ]
+
+    async def results():
+        async for result in limiter.stream(
+            release, batch_recommendation.run_batch, inputs, request.mode
+        ):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    background = BackgroundTasks()
+    background.add_task(release)
+    return StreamingResponse(results(), media_type="application/x-ndjson", background=background)
+
+
+@app.post("/restaurant-recommendations")
+async def restaurant_recommendations(keywords: RestaurantKeywords):
+    result = await limiter.run(
+        restaurant_agent.generate_restaurant_recommendations, keywords.model_dump()
+    )
+    return {"recommendation": result}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
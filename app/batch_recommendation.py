@@ -0,0 +1,114 @@
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List
+
+import telemetry
+from persistent_cache import normalize_location
+from restaurant_agent_service import (
+    RECOMMENDATION_MODE,
+    TravelPlan,
+    create_recommendation,
+    error_response,
+    fetch_filtered_candidates,
+    plan_key,
+    recommendation_flight,
+    run_pipeline,
+    success_response,
+)
+
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 4))
+BATCH_MAX_PLANS = int(os.getenv("BATCH_MAX_PLANS", 100))
+
+logger = logging.getLogger(__name__)
+
+
+def group_by_location(travel_plans: Dict[int, TravelPlan]) -> "OrderedDict[str, List[int]]":
+    """
+    정규화된 main_location 별로 요청 인덱스를 묶음 (입력 순서 유지)
+    """
+    groups = OrderedDict()
+    for index, travel_plan in travel_plans.items():
+        groups.setdefault(normalize_location(travel_plan.main_location), []).append(index)
+    return groups
+
+
+def finish_plan(travel_plan: TravelPlan, mode: str, filtered: List[Dict]):
+    # 공유된 후보로 계획별 최종 단계만 실행 (같은 계획이 겹치면 한 번만 계산)
+    with telemetry.span("recommendation", mode=mode, batch=True):
+        return recommendation_flight.do(
+            plan_key(travel_plan, mode), run_pipeline, travel_plan, mode, filtered
+        )
+
+
+# -------------------------------------------------------------------
+# 여러 여행 계획을 한 번에 처리: 같은 지역은 좌표 조회/맛집 조회/필터링을 한 번만 하고,
+# 계획별 최종 단계는 제한된 워커 풀에서 돌리며 끝나는 순서대로 결과를 전달
+def run_batch(
+    inputs: List[dict], mode: str = None, max_workers: int = BATCH_MAX_WORKERS
+) -> Iterator[dict]:
+    """
+    결과는 {"index": 입력 순번, ...create_recommendation 과 같은 응답} 형태로 완료 순서대로 나온다.
+    agent 모드는 Crew 가 후보를 직접 조회하므로 계획별로 create_recommendation 을 실행한다.
+    """
+    if len(inputs) > BATCH_MAX_PLANS:
+        raise ValueError(f"한 번에 최대 {BATCH_MAX_PLANS}개의 여행 계획만 처리할 수 있습니다.")
+
+    mode = mode or RECOMMENDATION_MODE
+    travel_plans = {}
+    for index, input_data in enumerate(inputs):
+        try:
+            travel_plans[index] = TravelPlan(**input_data)
+        except Exception as e:
+            yield {"index": index, **error_response(e)}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}  # future -> ("fetch", 인덱스 목록) 또는 ("plan", 인덱스)
+    try:
+        if mode in ("fast", "schedule"):
+            for indices in group_by_location(travel_plans).values():
+                future = executor.submit(fetch_filtered_candidates, travel_plans[indices[0]])
+                pending[future] = ("fetch", indices)
+        else:
+            for index in travel_plans:
+                future = executor.submit(create_recommendation, inputs[index], mode)
+                pending[future] = ("agent", index)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, target = pending.pop(future)
+
+                if kind == "agent":
+                    yield {"index": target, **future.result()}
+                    continue
+
+                if kind == "fetch":
+                    try:
+                        filtered = future.result()
+                    except Exception as e:
+                        logger.warning("[run_batch] Error: %s", e)
+                        for index in target:
+                            yield {"index": index, **error_response(e)}
+                        continue
+                    # 같은 지역의 계획들은 조회/필터링 결과를 공유
+                    for index in target:
+                        plan_future = executor.submit(
+                            finish_plan, travel_plans[index], mode, filtered
+                        )
+                        pending[plan_future] = ("plan", index)
+                    continue
+
+                try:
+                    result_json = future.result()
+                    yield {
+                        "index": target,
+                        **success_response(inputs[target], travel_plans[target], result_json),
+                    }
+                except Exception as e:
+                    logger.exception("[run_batch] %s", e)
+                    yield {"index": target, **error_response(e)}
+    finally:
+        # 소비자가 중간에 끊으면 아직 시작하지 않은 작업은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
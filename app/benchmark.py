@@ -0,0 +1,391 @@
+"""
+오프라인 지연 시간 벤치마크
+
+외부 API(Google Geocoding, SerpAPI, Naver)는 녹화된 픽스처(또는 합성 픽스처)로 재생하고,
+OpenAI 는 StubLLM 으로 대체해서 단계별 p50/p95/p99 지연 시간과 처리량을 측정한다.
+
+    # 실제 응답 녹화 (API 키 필요, main_location 은 BENCH_LOCATION 과 같아야 재생됨)
+    HTTP_REPLAY_MODE=record python restaurant_agent_service.py
+    # 녹화된 픽스처로 벤치마크
+    python benchmark.py --fixtures .cache/fixtures/http
+    # 합성 픽스처로 벤치마크
+    python benchmark.py --concurrency 1,4,16 --candidates 20,100,500 --json .cache/bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+BENCH_LOCATION = "부산광역시 해운대구"
+BENCH_COORDINATES = (35.1631, 129.1635)
+BENCH_TYPES = ["한식", "일식", "중식", "양식", "카페", "해산물", "고깃집", "분식"]
+
+
+# -------------------------------------------------------------------
+# 통계
+def percentile(samples: List[float], q: float) -> float:
+    # nearest-rank 백분위수
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float], wall_seconds: float) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": (sum(samples) / len(samples) * 1000) if samples else 0.0,
+        "throughput_rps": len(samples) / wall_seconds if wall_seconds > 0 else 0.0,
+        "wall_seconds": wall_seconds,
+    }
+
+
+def measure(func: Callable[[], object], requests: int, concurrency: int = 1) -> Dict[str, float]:
+    """
+    func 를 requests 번 실행 (concurrency 개 워커로 동시에) 하고 통계 반환
+    """
+
+    def timed(_):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        samples = [timed(i) for i in range(requests)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(timed, range(requests)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+# -------------------------------------------------------------------
+# 합성 데이터
+def synthetic_candidates(count: int, seed: int = 0) -> List[Dict]:
+    """
+    SerpAPI google_maps local_results 형태의 후보 (좌표는 기준점 반경 약 3km)
+    """
+    rng = random.Random(seed)
+    latitude, longitude = BENCH_COORDINATES
+    candidates = []
+    for i in range(count):
+        candidates.append(
+            {
+                "title": f"식당{i}",
+                "place_id": f"bench-{seed}-{i}",
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "reviews": rng.randint(50, 5000),
+                "address": f"부산 해운대구 우동 {i}",
+                "type": rng.choice(BENCH_TYPES),
+                "hours": "09:00~21:00",
+                "gps_coordinates": {
+                    "latitude": latitude + rng.uniform(-0.027, 0.027),
+                    "longitude": longitude + rng.uniform(-0.033, 0.033),
+                },
+            }
+        )
+    return candidates
+
+
+def synthetic_place_items(count: int) -> Dict:
+    # 네이버 지도 GraphQL 응답 형태
+    items = [
+        {
+            "__typename": "RestaurantListSummary",
+            "id": str(1000000 + i),
+            "name": f"식당{i}",
+            "category": BENCH_TYPES[i % len(BENCH_TYPES)],
+            "visitorReviewScore": "4.4",
+            "visitorReviewCount": "1,234",
+            "roadAddress": f"부산 해운대구 우동 {i}",
+            "x": str(BENCH_COORDINATES[1]),
+            "y": str(BENCH_COORDINATES[0]),
+        }
+        for i in range(count)
+    ]
+    return {"data": {"restaurants": {"items": items}}}
+
+
+def seed_fixtures(candidate_count: int) -> None:
+    """
+    녹화된 응답이 없을 때 geocode / SerpAPI / Naver 요청에 대응하는 합성 픽스처 생성
+    """
+    import candidate_retrieval
+    import http_replay
+    import restaurant_agent_service as service
+
+    latitude, longitude = BENCH_COORDINATES
+    store = http_replay.fixtures
+
+    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    params = {"address": BENCH_LOCATION}
+    store.save_json(
+        http_replay.fixture_key(url, params),
+        url,
+        {"results": [{"geometry": {"location": {"lat": latitude, "lng": longitude}}}]},
+    )
+
+    candidates = synthetic_candidates(candidate_count)
+    page_size = service.restaurant_search_tool._page_size
+    url = "https://serpapi.com/search"
+    for page in range(service.SEARCH_PAGE_COUNT):
+        start = page * page_size
+        params = {
+            "engine": "google_maps",
+            "q": f"{BENCH_LOCATION} 맛집",
+            "ll": f"@{latitude},{longitude},14z",
+            "hl": "ko",
+            "gl": "kr",
+            "start": start,
+        }
+        page_candidates = candidates[page::service.SEARCH_PAGE_COUNT]
+        store.save_json(http_replay.fixture_key(url, params), url, {"local_results": page_candidates})
+
+    url = "https://openapi.naver.com/v1/search/local.json"
+    items = [
+        {
+            "title": f"<b>식당</b>{i}",
+            "category": BENCH_TYPES[i % len(BENCH_TYPES)],
+            "address": f"부산 해운대구 우동 {i}",
+            "roadAddress": f"부산 해운대구 해운대로 {i}",
+            "mapx": str(int(longitude * 1e7)),
+            "mapy": str(int(latitude * 1e7)),
+        }
+        for i in range(5)
+    ]
+    for sort in candidate_retrieval.NAVER_SEARCH_SORTS:
+        params = {"query": f"{BENCH_LOCATION} 맛집", "display": 5, "sort": sort}
+        store.save_json(http_replay.fixture_key(url, params), url, {"items": items})
+
+
+# -------------------------------------------------------------------
+# 환경 구성 (서비스 모듈은 import 시점에 환경 변수를 읽으므로 먼저 설정)
+def configure_environment(args) -> None:
+    workdir = tempfile.mkdtemp(prefix="foodrec-bench-")
+    os.environ["HTTP_REPLAY_MODE"] = "replay"
+    os.environ["HTTP_FIXTURE_DIR"] = args.fixtures or os.path.join(workdir, "fixtures")
+    os.environ["HTTP_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ["LLM_CACHE_PATH"] = os.path.join(workdir, "llm.sqlite3")
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(workdir, "geocode.sqlite3")
+    os.environ["RESTAURANT_STORE_PATH"] = os.path.join(workdir, "restaurants.sqlite3")
+    os.environ["CRAWL_IMPORT_PATH"] = os.path.join(workdir, "places.jsonl")
+    # 재생 모드에서는 인증 정보가 픽스처 키에 포함되지 않으므로 임의 값이면 충분
+    for name in ("OPENAI_API_KEY", "SERPAPI_API_KEY", "NAVER_SEARCH_CLIENT_ID", "NAVER_SEARCH_CLIENT_SECRET"):
+        os.environ.setdefault(name, "benchmark")
+    # 파이프라인 내부 단계별 시간은 메모리에 모은 span 으로 집계
+    os.environ["TELEMETRY_EXPORTER"] = "memory"
+    os.environ["TELEMETRY_MEMORY_SPANS"] = "1000000"
+    if not args.warm:
+        # 캐시를 모두 무효화해서 매 요청이 전체 파이프라인을 거치게 함
+        os.environ["LLM_CACHE_TTL"] = "0"
+        os.environ["GEOCODE_CACHE_TTL"] = "0"
+        os.environ["RECOMMENDATION_CACHE_TTL"] = "0"
+        os.environ["LOCAL_SEARCH_MAX_AGE"] = "0.000001"
+
+
+def install_stub_llm(stub) -> None:
+    import restaurant_agent
+    import restaurant_agent_service as service
+
+    service.get_final_recommendation_llm = lambda: stub
+    service.stream_llm_tokens = stub.stream
+    restaurant_agent.get_llm = lambda: stub
+
+
+# -------------------------------------------------------------------
+# 단계별 벤치마크
+def bench_stages(candidate_sizes: List[int], requests: int, stub) -> List[Dict]:
+    import restaurant_agent_service as service
+    from itinerary_scheduler import build_itinerary, trip_days
+    from prompt_compaction import popularity_score, rehydrate
+    from restaurant_index import restaurant_index
+    from restaurant_store import RestaurantStore
+
+    travel_plan = service.TravelPlan(
+        main_location=BENCH_LOCATION,
+        start_date="2025-02-01T00:00:00",
+        end_date="2025-02-03T00:00:00",
+        companion_count=3,
+        concepts=["가족", "맛집"],
+    )
+    days = trip_days(travel_plan.start_date, travel_plan.end_date)
+    results = []
+    for size in candidate_sizes:
+        raw = synthetic_candidates(size)
+        filtered = service.restaurant_filter_tool._run(raw)
+        prompt, id_map, _ = service.prepare_final_prompt(travel_plan, filtered)
+        response = stub.respond(prompt)
+        store = RestaurantStore(os.path.join(tempfile.mkdtemp(prefix="foodrec-store-"), "store.sqlite3"))
+        store.upsert_many(raw)
+
+        stages = {
+            "filter": lambda: service.restaurant_filter_tool._run(raw),
+            "compact_prompt": lambda: service.prepare_final_prompt(travel_plan, filtered),
+            "llm_stub": lambda: stub.call([{"role": "user", "content": prompt}]),
+            "parse_rehydrate": lambda: rehydrate(service.parse_spots(response), id_map, dict),
+            "schedule": lambda: build_itinerary(days, filtered, score=popularity_score),
+            "store_radius": lambda: store.within_radius(*BENCH_COORDINATES, 3.0),
+            "index_search": lambda: restaurant_index.search(
+                restaurant_index.parse_query("해운대 고기집 4명 가족")
+            ),
+        }
+        for stage, func in stages.items():
+            results.append({"stage": stage, "candidates": size, "concurrency": 1, **measure(func, requests)})
+    return results
+
+
+def bench_crawler(candidate_sizes: List[int], requests: int) -> List[Dict]:
+    """
+    크롬 조작은 재생할 수 없으므로 응답 파싱 -> 레코드 변환 -> 저장 구간만 측정
+    """
+    from crawl_sink import CrawlRecord, JsonlSink
+    from naver_extract import _find_place_items, from_place_item
+
+    results = []
+    for size in candidate_sizes:
+        payload = synthetic_place_items(size)
+        path = os.path.join(tempfile.mkdtemp(prefix="foodrec-crawl-"), "places.jsonl")
+
+        def process():
+            with JsonlSink(path) as sink:
+                for index, item in enumerate(_find_place_items(payload)):
+                    sink.write(CrawlRecord.from_raw(from_place_item(item, BENCH_LOCATION, 1, index)))
+
+        results.append({"stage": "crawl_extract_sink", "candidates": size, "concurrency": 1, **measure(process, requests)})
+    return results
+
+
+def bench_end_to_end(concurrency_levels: List[int], requests: int, candidate_count: int) -> List[Dict]:
+    import restaurant_agent
+    import restaurant_agent_service as service
+    import telemetry
+
+    exporter = telemetry.get_exporter()
+    input_data = {
+        "main_location": BENCH_LOCATION,
+        "start_date": "2025-02-01T00:00:00",
+        "end_date": "2025-02-03T00:00:00",
+        "companion_count": 3,
+        "concepts": ["가족", "맛집"],
+    }
+    keywords = {
+        "location": BENCH_LOCATION,
+        "dates": "2025년 2월 1일 ~ 2025년 2월 3일",
+        "age_group": "30대",
+        "themes": ["가족 여행"],
+        "group": {"adults": 2, "children": 1, "pets": 0},
+    }
+
+    def check(result):
+        if isinstance(result, dict) and "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    first_spot = []
+
+    def stream():
+        started = time.perf_counter()
+        for event in service.stream_recommendation(input_data):
+            if event["event"] == "spot" and started is not None:
+                first_spot.append(time.perf_counter() - started)
+                started = None
+            check(event)
+
+    pipelines = {
+        "create_recommendation[fast]": lambda: check(service.create_recommendation(input_data, "fast")),
+        "create_recommendation[schedule]": lambda: check(service.create_recommendation(input_data, "schedule")),
+        "stream_recommendation": stream,
+        "generate_restaurant_recommendations": lambda: restaurant_agent.generate_restaurant_recommendations(keywords),
+    }
+    results = []
+    for concurrency in concurrency_levels:
+        for stage, func in pipelines.items():
+            first_spot.clear()
+            exporter.clear()
+            stats = measure(func, requests, concurrency)
+            results.append({"stage": stage, "candidates": candidate_count, "concurrency": concurrency, **stats})
+            if first_spot:
+                results.append(
+                    {
+                        "stage": "  stream_first_spot",
+                        "candidates": candidate_count,
+                        "concurrency": concurrency,
+                        **summarize(first_spot, stats["wall_seconds"]),
+                    }
+                )
+            # 파이프라인 안의 단계 (geocode, search_page, filter, llm ...) 별 지연 시간
+            durations = {}
+            for span in exporter.spans():
+                durations.setdefault(span.name, []).append(span.duration)
+            for name, samples in durations.items():
+                results.append(
+                    {
+                        "stage": f"  span:{name}",
+                        "candidates": candidate_count,
+                        "concurrency": concurrency,
+                        **summarize(samples, stats["wall_seconds"]),
+                    }
+                )
+    return results
+
+
+def print_table(results: List[Dict]) -> None:
+    header = f"{'stage':38} {'cand':>5} {'conc':>4} {'n':>5} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'rps':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['stage']:38} {r['candidates']:>5} {r['concurrency']:>4} {r['count']:>5} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['throughput_rps']:>9.1f}"
+        )
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="맛집 추천 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--candidates", type=_int_list, default=[20, 100, 500])
+    parser.add_argument("--requests", type=int, default=50, help="측정 구간별 요청 수")
+    parser.add_argument("--fixtures", help="녹화된 픽스처 디렉터리 (없으면 합성 픽스처 생성)")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="녹화된 외부 API 응답 시간 재현 배율")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="StubLLM 첫 토큰 지연 (초)")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="StubLLM 초당 생성 토큰 수 (0 이면 즉시)")
+    parser.add_argument("--warm", action="store_true", help="캐시를 켠 상태로 측정")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    from stub_llm import StubLLM
+
+    stub = StubLLM(latency=args.llm_latency, tokens_per_second=args.llm_tps)
+    install_stub_llm(stub)
+    e2e_candidates = max(args.candidates)
+    if not args.fixtures:
+        seed_fixtures(e2e_candidates)
+
+    results = bench_stages(args.candidates, args.requests, stub)
+    results += bench_crawler(args.candidates, args.requests)
+    results += bench_end_to_end(args.concurrency, args.requests, e2e_candidates)
+    print_table(results)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+import http_client
+import telemetry
+from entity_resolution import EntityIndex, record_position
+from prompt_compaction import strip_tags
+
+load_dotenv()
+NAVER_SEARCH_CLIENT_ID = os.getenv("NAVER_SEARCH_CLIENT_ID")
+NAVER_SEARCH_CLIENT_SECRET = os.getenv("NAVER_SEARCH_CLIENT_SECRET")
+# 조회할 후보 출처 (설정되지 않은 API 키의 출처는 자동으로 제외)
+RETRIEVAL_SOURCES = [
+    s.strip() for s in os.getenv("RETRIEVAL_SOURCES", "serpapi,naver,store").split(",") if s.strip()
+]
+# 네이버 지역 검색은 요청당 최대 5개이므로 정렬 기준을 바꿔 동시에 조회
+NAVER_SEARCH_SORTS = ("random", "comment")
+# 같은 식당의 필드가 출처마다 다르면 앞 출처의 값을 사용
+SOURCE_PRIORITY = ("serpapi", "store", "naver")
+
+logger = logging.getLogger(__name__)
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        number = float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def has_rating(candidate: Dict) -> bool:
+    # 필터 조건(평점, 리뷰 수)을 평가할 수 있는 후보인지
+    return (
+        _to_float(candidate.get("rating")) is not None
+        and _to_float(candidate.get("reviews")) is not None
+    )
+
+
+def popularity(candidate: Dict) -> float:
+    # 평점 x log(리뷰 수) (통합 후보 스키마 기준)
+    return (_to_float(candidate.get("rating")) or 0.0) * math.log1p(
+        _to_float(candidate.get("reviews")) or 0.0
+    )
+
+
+# -------------------------------------------------------------------
+# 출처별 응답을 통합 후보 스키마로 변환
+# (serpAPI local_results 형태 + sources; 필터/저장소가 그대로 사용)
+def normalize_serpapi(item: Dict) -> Dict:
+    return {**item, "sources": ["serpapi"]}
+
+
+def normalize_store(record: Dict) -> Dict:
+    return {**record, "sources": sorted(set(record.get("sources") or []) | {"store"})}
+
+
+def _naver_coordinate(value) -> Optional[float]:
+    # 네이버 지역 검색 mapx/mapy 는 WGS84 좌표 x 10^7 (예전 KATEC 좌표는 사용하지 않음)
+    number = _to_float(value)
+    if number is None or abs(number) < 1e7:
+        return None
+    return number / 1e7
+
+
+def normalize_naver(item: Dict) -> Dict:
+    return {
+        "place_id": None,
+        "title": strip_tags(item.get("title", "")),
+        "type": item.get("category", ""),
+        "rating": None,
+        "reviews": None,
+        "address": item.get("roadAddress") or item.get("address", ""),
+        "road_address": item.get("roadAddress", ""),
+        "jibun_address": item.get("address", ""),
+        "phone": item.get("telephone", ""),
+        "website": item.get("link", ""),
+        "gps_coordinates": {
+            "latitude": _naver_coordinate(item.get("mapy")),
+            "longitude": _naver_coordinate(item.get("mapx")),
+        },
+        "sources": ["naver"],
+    }
+
+
+def search_naver_places(query, display=5, sort="random"):
+    url = "https://openapi.naver.com/v1/search/local.json"
+    headers = {
+        "X-Naver-Client-Id": NAVER_SEARCH_CLIENT_ID,
+        "X-Naver-Client-Secret": NAVER_SEARCH_CLIENT_SECRET,
+    }
+    params = {"query": query, "display": display, "sort": sort}
+
+    with telemetry.span("naver_search", sort=sort) as span:
+        response = http_client.get(url, headers=headers, params=params)
+        data = response.json() if response.status_code == 200 else None
+        span.set(candidates=len(data.get("items", [])) if data else 0)
+        return data
+
+
+def naver_local_candidates(query: str, sort: str = "random") -> List[Dict]:
+    data = search_naver_places(query, sort=sort) or {}
+    return [normalize_naver(item) for item in data.get("items", [])]
+
+
+def naver_configured() -> bool:
+    return bool(NAVER_SEARCH_CLIENT_ID and NAVER_SEARCH_CLIENT_SECRET)
+
+
+# -------------------------------------------------------------------
+# 여러 출처를 동시에 조회하고 마감 시간까지 응답한 출처만 사용
+def fan_out(
+    tasks: List[Tuple[str, Callable[[], List[Dict]]]], deadline: float
+) -> Dict[str, List[Dict]]:
+    """
+    tasks 는 [(출처 이름, 조회 함수), ...]. 같은 출처의 여러 작업(페이지 등)은 순서대로 이어붙임
+    """
+    results: Dict[str, List[Dict]] = {}
+    if not tasks:
+        return results
+
+    def run(source: str, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        with telemetry.span("retrieve_source", source=source) as span:
+            candidates = fetch()
+            span.set(candidates=len(candidates))
+            return candidates
+
+    executor = ThreadPoolExecutor(max_workers=len(tasks))
+    futures = [
+        (source, executor.submit(telemetry.bind(run), source, fetch)) for source, fetch in tasks
+    ]
+    wait([future for _, future in futures], timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for i, (source, future) in enumerate(futures):
+        if not future.done():
+            logger.warning("[fan_out] Timeout: %s (task %s)", source, i)
+            continue
+        try:
+            results.setdefault(source, []).extend(future.result())
+        except Exception as e:
+            logger.warning("[fan_out] Error: %s (task %s): %s", source, i, e)
+    return results
+
+
+# -------------------------------------------------------------------
+# 출처 간 중복 식당 합치기 (entity_resolution 의 이름/주소/좌표 매칭)
+def _source_rank(source: str) -> int:
+    return SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else len(SOURCE_PRIORITY)
+
+
+def merge_candidates(records: List[Dict]) -> Dict:
+    """
+    같은 식당으로 판정된 레코드들을 하나로 합침 (출처 우선순위대로 비어 있지 않은 값 사용)
+    """
+    ranked = sorted(
+        records, key=lambda r: min(map(_source_rank, r.get("sources", [])), default=len(SOURCE_PRIORITY))
+    )
+    merged: Dict = {}
+    for record in ranked:
+        for key, value in record.items():
+            if key == "sources":
+                continue
+            if key == "gps_coordinates":
+                if "gps_coordinates" not in merged or record_position(merged) is None:
+                    merged[key] = value
+                continue
+            if merged.get(key) in (None, "", []):
+                merged[key] = value
+    merged["sources"] = sorted({s for r in records for s in r.get("sources", [])})
+    return merged
+
+
+def fuse_candidates(results: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    출처별 후보 리스트를 하나로 합침 (출처 우선순위 -> 출처 내 순서 유지)
+    """
+    index = EntityIndex()
+    groups: List[List[Dict]] = []
+    for source in sorted(results, key=_source_rank):
+        for candidate in results[source]:
+            entity = index.add(candidate)
+            if entity == len(groups):
+                groups.append([])
+            groups[entity].append(candidate)
+    return [merge_candidates(records) for records in groups]
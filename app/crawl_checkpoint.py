@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from persistent_cache import normalize_location
+
+
+def task_key(query: str, page: int) -> str:
+    return f"{normalize_location(query)}|{page}"
+
+
+def place_key(query: str, name: str) -> str:
+    # 클릭 전에 목록에서 알 수 있는 정보(검색어 + 가게 이름)로 만든 키
+    return f"{normalize_location(query)}|{normalize_location(name)}"
+
+
+# -------------------------------------------------------------------
+# 크롤링 진행 상황 체크포인트 (JSON 파일, 원자적 저장)
+# mark_* 는 메모리 상태만 바꾸고, 결과를 싱크에 기록한 뒤 호출하는 save() 에서만 파일에 반영
+class CrawlCheckpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state: Dict = {"tasks": {}, "places": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+            self.state.setdefault("tasks", {})
+            self.state.setdefault("places", {})
+
+    # 작업(검색어, 페이지) 단위 상태
+    def is_done(self, query: str, page: int) -> bool:
+        with self._lock:
+            return self.state["tasks"].get(task_key(query, page), {}).get("done", False)
+
+    def last_index(self, query: str, page: int) -> int:
+        with self._lock:
+            return self.state["tasks"].get(task_key(query, page), {}).get("last_index", 0)
+
+    def mark_done(self, query: str, page: int) -> None:
+        with self._lock:
+            task = self.state["tasks"].setdefault(task_key(query, page), {})
+            task.update({"query": query, "page": page, "done": True})
+
+    # 가게 단위 상태
+    def is_fresh(
+        self,
+        query: str,
+        name: str,
+        freshness_seconds: Optional[float],
+        place_id: Optional[str] = None,
+    ) -> bool:
+        """
+        freshness_seconds 이내에 이미 수집한 가게인지 확인 (None 이면 항상 False)
+        place_id 를 알면 장소 ID 기록을 우선 사용 (다른 검색어로 수집한 같은 가게도 건너뜀)
+        """
+        if freshness_seconds is None:
+            return False
+        with self._lock:
+            places = self.state["places"]
+            collected_at = (place_id and places.get(f"id:{place_id}")) or places.get(
+                place_key(query, name)
+            )
+        return collected_at is not None and time.time() - collected_at <= freshness_seconds
+
+    def mark_place(self, query: str, page: int, index: int, record: Dict) -> None:
+        now = time.time()
+        with self._lock:
+            task = self.state["tasks"].setdefault(task_key(query, page), {})
+            task.update(
+                {
+                    "query": query,
+                    "page": page,
+                    "last_index": max(index, task.get("last_index", 0)),
+                    "done": False,
+                }
+            )
+            self.state["places"][place_key(query, record["name"])] = now
+            if record.get("place_id"):
+                self.state["places"][f"id:{record['place_id']}"] = now
+
+    def reset_tasks(self) -> None:
+        """
+        증분 재수집을 위해 작업 진행 상황만 초기화 (수집한 가게 기록은 유지)
+        """
+        with self._lock:
+            self.state["tasks"] = {}
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
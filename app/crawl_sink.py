@@ -0,0 +1,189 @@
+import glob
+import importlib.util
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+# -------------------------------------------------------------------
+# 크롤링 결과 행 스키마
+class CrawlRecord(BaseModel):
+    query: str
+    page: int
+    index: int
+    place_id: Optional[str] = None
+    name: str
+    category: Optional[str] = None
+    rating: Optional[float] = None
+    rating_text: Optional[str] = None
+    reviews: Optional[int] = None
+    address: Optional[str] = None
+    district: Optional[str] = None  # 목록 화면의 동네 이름 (상세 주소가 아님)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    source: str = "naver_crawler"
+    crawled_at: str = Field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    @classmethod
+    def from_raw(cls, raw: Dict) -> "CrawlRecord":
+        """
+        크롤러 dict 를 행으로 변환 ("정보 없음" 같은 안내 문구는 None 으로, 평점은 숫자로)
+        """
+        placeholders = {"정보 없음", "평점 없음", "주소 정보 없음", ""}
+        values = {
+            k: (None if isinstance(v, str) and v in placeholders else v) for k, v in raw.items()
+        }
+        rating_text = values.pop("rating", None)
+        rating = None
+        if isinstance(rating_text, (int, float)):
+            rating = float(rating_text)
+        elif rating_text:
+            # 예: "별점4.52" -> 4.52
+            match = re.search(r"\d+(?:\.\d+)?", rating_text)
+            rating = float(match.group()) if match else None
+        fields = {k: v for k, v in values.items() if k in cls.model_fields}
+        if rating_text is not None:
+            fields["rating_text"] = str(rating_text)
+        return cls(**fields, rating=rating)
+
+
+# -------------------------------------------------------------------
+# 버퍼링 후 일괄 기록하는 JSONL 싱크 (append-only)
+class JsonlSink:
+    def __init__(self, path: str, buffer_size: int = 100):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: List[CrawlRecord] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, record: CrawlRecord) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        lines = "".join(
+            json.dumps(r.model_dump(), ensure_ascii=False) + "\n" for r in self._buffer
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------------------------------------------------
+# 배치 단위로 Parquet 파일(part-*.parquet)을 쓰는 컬럼 포맷 싱크
+class ParquetSink:
+    def __init__(self, directory: str, batch_size: int = 1000):
+        # pyarrow 는 컬럼 포맷 출력을 쓸 때만 필요 (첫 flush 가 아니라 생성 시점에 바로 확인)
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("Parquet 출력을 쓰려면 pyarrow 가 필요합니다.")
+
+        self.directory = directory
+        self.batch_size = batch_size
+        self._buffer: List[CrawlRecord] = []
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._part = len(glob.glob(os.path.join(directory, "part-*.parquet")))
+
+    def write(self, record: CrawlRecord) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist([r.model_dump() for r in self._buffer])
+        self._part += 1
+        pq.write_table(table, os.path.join(self.directory, f"part-{self._part:05d}.parquet"))
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compact_parquet(directory: str, output_path: str) -> int:
+    """
+    part 파일들을 하나의 Parquet 파일로 합치고 행 수를 반환
+    """
+    import pyarrow.parquet as pq
+
+    parts = sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+    if not parts:
+        return 0
+    table = pq.ParquetDataset(parts).read()
+    pq.write_table(table, output_path)
+    return table.num_rows
+
+
+# -------------------------------------------------------------------
+# 여러 싱크에 동시에 기록
+class MultiSink:
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, record: CrawlRecord) -> None:
+        for sink in self.sinks:
+            sink.write(record)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """
+    JSONL 결과를 레코드 단위로 읽기 (RestaurantStore.load_crawled_records 입력으로 사용)
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+PLACE_LIST_SELECTOR = "li.UEzoS"
+PLACE_NAME_SELECTOR = "span.TYaxT"
+PLACE_TITLE_SELECTOR = "span.GHAhO"
+
+IGNORED_EXCEPTIONS = (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+
+
+# -------------------------------------------------------------------
+# 대기 시간 측정 (대기 이름별 소요 시간 / 타임아웃 횟수)
+class WaitMetrics:
+    def __init__(self):
+        # 조건이 맞은 대기의 소요 시간만 백분위 표본으로 사용 (타임아웃은 항상 예산 전체라 표본을 왜곡)
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._timeouts: Dict[str, int] = defaultdict(int)
+        self._timeout_seconds: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, duration: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self._timeouts[name] += 1
+                self._timeout_seconds[name] += duration
+            else:
+                self._durations[name].append(duration)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._durations.get(name, []))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            names = list(dict.fromkeys([*self._durations, *self._timeouts]))
+        result = {}
+        for name in names:
+            samples = self._durations.get(name, [])
+            count = len(samples) + self._timeouts[name]
+            total = sum(samples) + self._timeout_seconds[name]
+            p95 = self.percentile(name, 0.95)
+            result[name] = {
+                "count": count,
+                "total": round(total, 3),
+                "mean": round(total / count, 3),
+                "p95": round(p95, 3) if p95 is not None else None,
+                "timeouts": self._timeouts[name],
+            }
+        return result
+
+    def print_summary(self) -> None:
+        print("\n=== 대기 시간 통계 (초) ===")
+        for name, stats in self.summary().items():
+            print(
+                f"{name}: {stats['count']}회, 합계 {stats['total']}, 평균 {stats['mean']}, "
+                f"p95 {stats['p95']}, 타임아웃 {stats['timeouts']}"
+            )
+
+
+wait_metrics = WaitMetrics()
+
+
+# -------------------------------------------------------------------
+# DOM 조건 기반 대기 (관측된 p95 로 타임아웃을 조정)
+class AdaptiveWaiter:
+    def __init__(
+        self,
+        driver,
+        metrics: WaitMetrics = wait_metrics,
+        min_timeout: float = 2.0,
+        max_timeout: float = 15.0,
+        factor: float = 3.0,
+        poll_frequency: float = 0.1,
+        warmup: int = 5,
+    ):
+        self.driver = driver
+        self.metrics = metrics
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.poll_frequency = poll_frequency
+        self.warmup = warmup
+        self._observed: Dict[str, int] = defaultdict(int)  # 성공 + 타임아웃
+        self._consecutive_timeouts: Dict[str, int] = defaultdict(int)
+
+    def timeout_for(self, name: str) -> float:
+        # 연속 타임아웃마다 예산을 절반으로 줄임 (끝내 맞지 않는 조건에 매번 최대 시간을 쓰지 않도록)
+        budget = max(self.min_timeout, self.max_timeout / 2 ** self._consecutive_timeouts[name])
+        # 충분히 관측되기 전이거나 성공 표본이 없으면 예산 그대로 사용
+        p95 = self.metrics.percentile(name, 0.95)
+        if self._observed[name] < self.warmup or p95 is None:
+            return budget
+        return min(budget, max(self.min_timeout, p95 * self.factor))
+
+    def until(self, name: str, condition: Callable, timeout: Optional[float] = None):
+        """
+        조건이 참이 될 때까지 대기, 타임아웃 시 None 반환
+        """
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(
+                self.driver,
+                timeout or self.timeout_for(name),
+                poll_frequency=self.poll_frequency,
+                ignored_exceptions=IGNORED_EXCEPTIONS,
+            ).until(condition)
+            timed_out = False
+        except TimeoutException:
+            result = None
+            timed_out = True
+        self.metrics.record(name, time.perf_counter() - started, timed_out)
+        self._observed[name] += 1
+        self._consecutive_timeouts[name] = self._consecutive_timeouts[name] + 1 if timed_out else 0
+        return result
+
+
+# -------------------------------------------------------------------
+# 대기 조건
+def _switch_to_frame(driver, selector: str) -> bool:
+    driver.switch_to.default_content()
+    frames = driver.find_elements(By.CSS_SELECTOR, selector)
+    if not frames:
+        return False
+    driver.switch_to.frame(frames[0])
+    return True
+
+
+def search_list_ready(driver):
+    # 검색 결과 iframe 으로 전환하고 목록이 렌더링되었는지 확인
+    if not _switch_to_frame(driver, "#searchIframe"):
+        return False
+    return len(driver.find_elements(By.CSS_SELECTOR, PLACE_LIST_SELECTOR)) > 0
+
+
+def title_matches(name: str, title: Optional[str]) -> bool:
+    # 목록과 상세 화면의 띄어쓰기가 다른 경우가 있어 공백은 무시하고 비교
+    return bool(title) and "".join(name.split()) in "".join(title.split())
+
+
+def entry_place_loaded(name: str) -> Callable:
+    # 상세 정보 iframe 으로 전환하고, 클릭한 가게 이름이 제목에 렌더링되었는지 확인
+    def _condition(driver):
+        if not _switch_to_frame(driver, "#entryIframe"):
+            return False
+        titles = driver.find_elements(By.CSS_SELECTOR, PLACE_TITLE_SELECTOR)
+        return bool(titles) and title_matches(name, titles[0].text)
+
+    return _condition
+
+
+def list_length_grew(previous_count: int) -> Callable:
+    def _condition(driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, PLACE_LIST_SELECTOR))
+        return count if count > previous_count else False
+
+    return _condition
+
+
+def first_place_changed(previous_name: str) -> Callable:
+    # 페이지 이동 후 목록의 첫 번째 가게가 바뀌었는지 확인
+    def _condition(driver):
+        names = driver.find_elements(By.CSS_SELECTOR, PLACE_NAME_SELECTOR)
+        return bool(names) and names[0].text != previous_name
+
+    return _condition
+
+
+def first_place_name(driver) -> str:
+    names = driver.find_elements(By.CSS_SELECTOR, PLACE_NAME_SELECTOR)
+    return names[0].text if names else ""
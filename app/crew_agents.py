@@ -0,0 +1,152 @@
+from typing import Dict, List, Type
+
+from crewai import LLM, Agent, Crew, Task
+from crewai.tools import BaseTool
+from pydantic import BaseModel
+
+import restaurant_agent_service as service
+from single_flight import once
+
+# CrewAI 는 agent 모드에서만 필요하므로 이 모듈은 처음 사용할 때 import 된다.
+# 툴 로직은 restaurant_agent_service 의 툴 객체를 그대로 쓰고, 여기서는 CrewAI 용 래퍼만 정의
+
+
+# -------------------------------------------------------------------
+# CrewAI 툴 래퍼
+class GeocodingCrewTool(BaseTool):
+    name: str = service.GeocodingTool.name
+    description: str = service.GeocodingTool.description
+
+    def _run(self, location: str) -> str:
+        return service.geocoding_tool._run(location)
+
+
+class RestaurantSearchCrewTool(BaseTool):
+    name: str = service.RestaurantSearchTool.name
+    description: str = service.RestaurantSearchTool.description
+    # 수정: TravelPlan 대신 RestaurantSearchArgs 사용
+    args_schema: Type[BaseModel] = service.RestaurantSearchArgs
+
+    def _run(self, location: str, coordinates: str) -> List[Dict]:
+        return service.restaurant_search_tool._run(location, coordinates)
+
+
+class RestaurantFilterCrewTool(BaseTool):
+    name: str = service.RestaurantFilterTool.name
+    description: str = service.RestaurantFilterTool.description
+
+    def _run(self, candidates: List[Dict]) -> List[Dict]:
+        return service.restaurant_filter_tool._run(candidates)
+
+
+class FinalRecommendationCrewTool(BaseTool):
+    name: str = service.FinalRecommendationTool.name
+    description: str = service.FinalRecommendationTool.description
+
+    def _run(self, filtered_list: str) -> str:
+        return service.final_recommendation_tool._run(filtered_list)
+
+
+# -------------------------------------------------------------------
+# 에이전트 / LLM 클라이언트 (처음 사용할 때 한 번만 생성하고 재사용)
+@once
+def get_agent_llm() -> LLM:
+    # 좌표 조회/맛집 조회/필터링 에이전트가 공유하는 LLM 클라이언트
+    return LLM(model="gpt-4o-mini", temperature=0, api_key=service.OPENAI_API_KEY)
+
+
+@once
+def get_agents() -> Dict[str, Agent]:
+    return {
+        "geocoding": Agent(
+            role="좌표 조회 전문가",
+            goal="사용자 입력 위치의 위도와 경도를 정확히 조회한다.",
+            backstory="나는 위치 데이터 전문가이며, 구글 Geocoding API를 활용해 정확한 좌표를 제공할 수 있다.",
+            tools=[GeocodingCrewTool()],
+            llm=get_agent_llm(),
+            verbose=service.AGENT_VERBOSE,
+        ),
+        "restaurant_search": Agent(
+            role="맛집 조회 전문가",
+            goal="좌표 정보를 활용하여 맛집 후보 리스트(최대 40개)를 조회한다.",
+            backstory="나는 맛집 검색 전문가이며, serpAPI·네이버 지역 검색·로컬 맛집 저장소를 함께 조회해 후보 리스트를 제공할 수 있다.",
+            tools=[RestaurantSearchCrewTool()],
+            llm=get_agent_llm(),
+            verbose=service.AGENT_VERBOSE,
+        ),
+        "restaurant_filter": Agent(
+            role="맛집 필터링 전문가",
+            goal="맛집 후보 리스트 중 조건에 맞는 식당만을 선별한다.",
+            backstory="나는 데이터 필터링 전문가로, 후보 리스트에서 평점과 리뷰 수 기준으로 유효한 식당을 선별할 수 있다.",
+            tools=[RestaurantFilterCrewTool()],
+            llm=get_agent_llm(),
+            verbose=service.AGENT_VERBOSE,
+        ),
+        "final_recommendation": Agent(
+            role="최종 추천 에이전트",
+            goal="필터링된 맛집 후보 리스트를 바탕으로 최종 추천 맛집 리스트를 엄격한 JSON 형식으로 생성한다.",
+            backstory="나는 여행객들을 위한 맛집 추천 전문가이자 JSON 생성기입니다. 오직 JSON 형식만 출력해야 합니다.",
+            tools=[FinalRecommendationCrewTool()],
+            llm=service.get_final_recommendation_llm(),
+            verbose=service.AGENT_VERBOSE,
+        ),
+    }
+
+
+# -------------------------------------------------------------------
+# 전체 Crew 구성 및 실행 (태스크는 요청마다 새로 만들고 에이전트는 재사용)
+def run_crew(travel_plan: service.TravelPlan):
+    location = travel_plan.main_location
+    agents = get_agents()
+
+    # 태스크 1: 좌표 조회
+    geocoding_task = Task(
+        description=f"[좌표 조회]\n'{location}'의 위도와 경도를 조회합니다.",
+        agent=agents["geocoding"],
+        expected_output="위도,경도 형식의 문자열",
+    )
+
+    # 태스크 2: 맛집 후보 조회 (좌표 필요)
+    restaurant_search_task = Task(
+        description=f"[맛집 조회]\n'{location}'의 맛집 후보 리스트를 조회합니다.",
+        agent=agents["restaurant_search"],
+        context=[geocoding_task],
+        expected_output="맛집 후보 리스트 (원시 데이터)",
+    )
+
+    # 태스크 3: 맛집 후보 필터링
+    restaurant_filter_task = Task(
+        description="[맛집 필터링]\n조회된 맛집 후보 리스트 중 평점 4점 이상, 리뷰 500개 이상인 식당만 선별합니다.",
+        agent=agents["restaurant_filter"],
+        context=[restaurant_search_task],
+        expected_output="필터링된 맛집 리스트 (리스트 형식)",
+    )
+
+    # 태스크 4: 최종 추천 생성 (엄격한 JSON 형식)
+    final_recommendation_task = Task(
+        description="[최종 추천 생성]\n필터링된 맛집 리스트를 참고하여, 지정된 프롬프트에 따라 최종 추천 맛집 리스트를 JSON 형식으로 출력합니다.",
+        agent=agents["final_recommendation"],
+        context=[restaurant_filter_task],
+        expected_output="엄격한 JSON 형식의 추천 맛집 리스트",
+    )
+
+    # Crew 구성: 모든 태스크 등록
+    crew = Crew(
+        agents=list(agents.values()),
+        tasks=[
+            geocoding_task,
+            restaurant_search_task,
+            restaurant_filter_task,
+            final_recommendation_task,
+        ],
+        verbose=service.AGENT_VERBOSE,
+    )
+
+    final_result = crew.kickoff()
+
+    # 최종 결과가 JSON 형식인지 확인 후 반환 (예: 최종 결과에 Spots 필드가 있으면)
+    if hasattr(final_result, "Spots"):
+        result_json = {"Spots": final_result.Spots}
+    else:
+        result_json = final_result
+    return result_json
@@ -0,0 +1,388 @@
+import math
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from prompt_compaction import strip_tags
+from restaurant_store import (
+    EARTH_RADIUS_KM,
+    geohash_cell_size,
+    geohash_decode,
+    geohash_encode,
+    geohash_neighbours,
+    haversine_km,
+    qualified_place_id,
+)
+
+# 좌표 블로킹용 지오해시 정밀도 (7 = 약 150m 셀, 매칭 거리 안의 이웃 셀까지 비교)
+ER_GEOHASH_PRECISION = int(os.getenv("ER_GEOHASH_PRECISION", 7))
+# 이름이 비슷하고 이 거리 안에 있으면 같은 식당
+ER_MATCH_DISTANCE_KM = float(os.getenv("ER_MATCH_DISTANCE_KM", 0.15))
+# 주소가 같아도 좌표가 이보다 멀면 다른 식당 (도시가 다른 같은 도로명 등)
+ER_ADDRESS_MAX_KM = float(os.getenv("ER_ADDRESS_MAX_KM", 1.0))
+# 주소 블로킹용 지오해시 정밀도 (5 = 약 5km 셀, 좌표 셀의 앞자리)
+ER_ADDRESS_PRECISION = int(os.getenv("ER_ADDRESS_PRECISION", 5))
+# 같은 식당으로 볼 이름 유사도 (주소 일치 시 / 좌표만 가까울 때)
+# (지점명/지역명을 뺀 핵심 이름 기준, 같은 건물의 다른 식당이 합쳐지지 않도록 주소 일치 시에도 높게)
+ER_ADDRESS_NAME_THRESHOLD = float(os.getenv("ER_ADDRESS_NAME_THRESHOLD", 0.6))
+ER_DISTANCE_NAME_THRESHOLD = float(os.getenv("ER_DISTANCE_NAME_THRESHOLD", 0.8))
+# 블록 크기가 이보다 크면 (흔한 글자쌍 등) 비교 후보 생성에서 제외해서 선형에 가깝게 유지
+ER_MAX_BLOCK_SIZE = int(os.getenv("ER_MAX_BLOCK_SIZE", 100))
+ER_KEY_CACHE_SIZE = int(os.getenv("ER_KEY_CACHE_SIZE", 100_000))
+
+
+# -------------------------------------------------------------------
+# 이름 정규화: 태그 제거 + 한글을 로마자로 변환해서 구글(영문 표기)/네이버(한글) 이름을 같은 공간에서 비교
+# (국어의 로마자 표기법 기준, 음운 변화 규칙은 생략)
+ROMAN_INITIALS = [
+    "g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s",
+    "ss", "", "j", "jj", "ch", "k", "t", "p", "h",
+]
+ROMAN_MEDIALS = [
+    "a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae",
+    "oe", "yo", "u", "wo", "we", "wi", "yu", "eu", "ui", "i",
+]
+ROMAN_FINALS = [
+    "", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l",
+    "p", "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t",
+]
+
+
+def romanize(text: str) -> str:
+    chars = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            chars.append(
+                ROMAN_INITIALS[code // 588]
+                + ROMAN_MEDIALS[(code % 588) // 28]
+                + ROMAN_FINALS[code % 28]
+            )
+        else:
+            chars.append(char)
+    return "".join(chars)
+
+
+# 지점 표기: 띄어 쓴 마지막 "…점" ("해운대점", "본점") 또는 붙여 쓴 "…역점"/"…호점"
+BRANCH_SUFFIX = re.compile(r"\s+\S*점$|(?:[가-힣]+역|\d+호)점$")
+
+
+def name_key(name: str, strip_branch: bool = False) -> str:
+    text = unicodedata.normalize("NFKC", strip_tags(name)).lower().strip()
+    if strip_branch:
+        text = BRANCH_SUFFIX.sub("", text) or text
+    return re.sub(r"[^a-z0-9]", "", romanize(text))
+
+
+def name_grams(key: str) -> FrozenSet[str]:
+    if len(key) < 2:
+        return frozenset([key]) if key else frozenset()
+    return frozenset(key[i : i + 2] for i in range(len(key) - 1))
+
+
+# 주소의 지역명 ("부산광역시" -> 부산, "해운대구"/"해운대로" -> 해운대, "우동") 을 로마자로 추출
+# 이름 앞뒤에 붙은 지역명("해운대암소갈비", "본죽 해운대점")이 유사도를 좌우하지 않도록 비교 전에 제거
+REGION_SUFFIX = re.compile(r"(?:특별자치시|특별자치도|특별시|광역시|시|도|군|구|읍|면|동|리|가|로|길)$")
+
+
+def region_tokens(*addresses: str) -> FrozenSet[str]:
+    tokens = set()
+    for address in addresses:
+        for run in re.findall(r"[가-힣]{2,}", unicodedata.normalize("NFKC", address or "")):
+            if run in ("번길", "번지"):
+                continue
+            stem = REGION_SUFFIX.sub("", run)
+            tokens.add(romanize(stem if len(stem) >= 2 else run))
+    return frozenset(tokens)
+
+
+@lru_cache(maxsize=65536)
+def core_grams(name: str, regions: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    지역명(+ 바로 뒤의 "역점"/"점")을 뺀 핵심 이름의 글자쌍 (남는 게 없으면 전체 이름)
+    """
+    core = name
+    if regions:
+        pattern = "|".join(re.escape(r) for r in sorted(regions, key=len, reverse=True))
+        core = re.sub(f"(?:{pattern})(?:yeok)?(?:jeom)?", "", name)
+    return name_grams(core if len(core) >= 2 else name)
+
+
+def name_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    # 글자쌍(bigram) Dice 계수
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+# -------------------------------------------------------------------
+# 주소 정규화: 도로명("해운대로 570", "해운대로570번길 10")과 지번("우동 1411-1") 을 각각 키로 추출
+ROAD_ADDRESS = re.compile(r"([가-힣0-9]+(?:로|길))\s*(\d+(?:-\d+)?)(?:번지)?(?![\d가-힣])")
+JIBUN_ADDRESS = re.compile(r"([가-힣0-9]+(?:동|리|가))\s*(?:산\s*)?(\d+(?:-\d+)?)(?:번지)?(?![\d가-힣])")
+
+
+def address_keys(*addresses: str) -> FrozenSet[str]:
+    keys = set()
+    for address in addresses:
+        text = unicodedata.normalize("NFKC", address or "")
+        for match in ROAD_ADDRESS.finditer(text):
+            keys.add(f"road:{match.group(1)}{match.group(2)}")
+        for match in JIBUN_ADDRESS.finditer(text):
+            keys.add(f"jibun:{match.group(1)}{match.group(2)}")
+    return frozenset(keys)
+
+
+# -------------------------------------------------------------------
+# 레코드별 비교용 특징 (통합 후보 스키마 기준)
+class EntityKey(NamedTuple):
+    place_id: Optional[str]  # 출처 접두어 포함 ("google:…", "naver:…")
+    name: str  # 지점 표기를 뺀 이름
+    grams: FrozenSet[str]  # 블로킹용 (name 의 글자쌍)
+    numbers: Tuple[str, ...]  # 이름 안의 숫자 ("2호점", "1번가" 등 지점 구분)
+    addresses: FrozenSet[str]
+    regions: FrozenSet[str]
+    position: Optional[Tuple[float, float]]
+    cell: Optional[str]
+
+
+def record_position(record: Dict) -> Optional[Tuple[float, float]]:
+    coords = record.get("gps_coordinates") or {}
+    try:
+        latitude, longitude = float(coords["latitude"]), float(coords["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if math.isnan(latitude) or math.isnan(longitude):
+        return None
+    return latitude, longitude
+
+
+def entity_key(record: Dict, precision: int = ER_GEOHASH_PRECISION) -> EntityKey:
+    return _entity_key(
+        qualified_place_id(record.get("place_id")),
+        record.get("title", ""),
+        (
+            record.get("address", ""),
+            record.get("road_address", ""),
+            record.get("jibun_address", ""),
+        ),
+        record_position(record),
+        precision,
+    )
+
+
+# 같은 식당이 요청마다(저장소/외부 API) 반복해서 들어오므로 정규화 결과를 재사용
+@lru_cache(maxsize=ER_KEY_CACHE_SIZE)
+def _entity_key(
+    place_id: Optional[str],
+    title: str,
+    addresses: Tuple[str, ...],
+    position: Optional[Tuple[float, float]],
+    precision: int,
+) -> EntityKey:
+    name = name_key(title, strip_branch=True)
+    return EntityKey(
+        place_id=place_id,
+        name=name,
+        grams=name_grams(name),
+        numbers=tuple(re.findall(r"\d+", name_key(title))),
+        addresses=address_keys(*addresses),
+        regions=region_tokens(*addresses),
+        position=position,
+        cell=geohash_encode(*position, precision) if position else None,
+    )
+
+
+@lru_cache(maxsize=65536)
+def neighbour_cells(cell: str, radius_km: float) -> Tuple[str, ...]:
+    # 셀 안 어느 점에서든 반경 안에 들어올 수 있는 셀 (셀 크기 단위로 올림한 칸 수만큼 이웃)
+    latitude, _ = geohash_decode(cell)
+    lat_step, lng_step = geohash_cell_size(len(cell))
+    km_per_degree = math.radians(EARTH_RADIUS_KM)
+    lat_steps = math.ceil(radius_km / (lat_step * km_per_degree))
+    lng_steps = math.ceil(
+        radius_km / (lng_step * km_per_degree * max(math.cos(math.radians(latitude)), 1e-6))
+    )
+    return tuple(geohash_neighbours(cell, lat_steps, lng_steps))
+
+
+def id_source(place_id: Optional[str]) -> Optional[str]:
+    return place_id.split(":", 1)[0] if place_id else None
+
+
+def match_score(
+    a: EntityKey, b: EntityKey, distance_km: float = ER_MATCH_DISTANCE_KM
+) -> Optional[float]:
+    """
+    같은 식당이면 (핵심 이름) 유사도, 아니면 None
+    """
+    # 장소 ID 는 같은 출처끼리만 결정적 (구글 place_id 와 네이버 플레이스 ID 는 이름/주소로 비교)
+    if a.place_id and b.place_id and id_source(a.place_id) == id_source(b.place_id):
+        return 1.0 if a.place_id == b.place_id else None
+    if a.numbers and b.numbers and a.numbers != b.numbers:
+        return None
+    # 한쪽 주소에만 있는 지역명도 양쪽 이름에서 함께 제거
+    regions = a.regions | b.regions
+    similarity = name_similarity(core_grams(a.name, regions), core_grams(b.name, regions))
+    if similarity < min(ER_ADDRESS_NAME_THRESHOLD, ER_DISTANCE_NAME_THRESHOLD):
+        return None
+    distance = (
+        haversine_km(*a.position, *b.position) if a.position and b.position else None
+    )
+    if a.addresses & b.addresses and (distance is None or distance <= ER_ADDRESS_MAX_KM):
+        return similarity if similarity >= ER_ADDRESS_NAME_THRESHOLD else None
+    if distance is not None and distance <= distance_km:
+        return similarity if similarity >= ER_DISTANCE_NAME_THRESHOLD else None
+    return None
+
+
+# -------------------------------------------------------------------
+# 엔티티 인덱스: 블로킹으로 비교 후보를 좁혀서 레코드를 하나씩 추가할 때마다 기존 레코드 중 같은 식당을 찾음
+#   - place_id (같은 출처의 서로 다른 place_id 는 항상 다른 식당)
+#   - (주소 키, 넓은 지오해시 셀): 같은 도로명/지번이라도 멀리 떨어진 도시끼리는 비교하지 않음
+#   - (지오해시 셀, 이름 글자쌍): 가까우면서 이름이 겹치는 레코드만 비교
+# 블록이 max_block_size 보다 커지면 (흔한 글자쌍/대형 건물 등) 건너뛰어서 레코드 수에 거의 선형으로 유지
+class EntityIndex:
+    def __init__(
+        self,
+        precision: int = ER_GEOHASH_PRECISION,
+        distance_km: float = ER_MATCH_DISTANCE_KM,
+        max_block_size: int = ER_MAX_BLOCK_SIZE,
+    ):
+        self.precision = precision
+        self.distance_km = distance_km
+        self.max_block_size = max_block_size
+        self.keys: List[Optional[EntityKey]] = []
+        self.entity_of: List[int] = []  # 레코드 순번 -> 엔티티 번호
+        self.entity_count = 0
+        self._by_place_id: Dict[str, int] = {}
+        self._pending: List[Tuple[int, Dict]] = []  # 특징 계산을 미룬 (순번, 레코드)
+        # 블록은 place_id 출처별로 나눠서 보관 (None = place_id 없음)
+        # (같은 출처의 place_id 가 서로 다르면 항상 다른 식당이므로 같은 출처 블록끼리는 비교 불필요)
+        self._partitions: Set[Optional[str]] = set()
+        self._by_address: Dict[Tuple, List[int]] = defaultdict(list)
+        self._by_cell: Dict[Tuple[str, Optional[str]], Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _candidates(self, key: EntityKey) -> Iterable[int]:
+        source = id_source(key.place_id)
+        partitions = [p for p in self._partitions if p is None or p != source]
+
+        # 주소 블록은 모두 비교
+        blocks = []
+        if key.addresses:
+            # 좌표가 있으면 주변 넓은 셀과 좌표 없는 레코드, 없으면 같은 주소 키 전체와 비교
+            if key.cell:
+                regions = neighbour_cells(key.cell[:ER_ADDRESS_PRECISION], ER_ADDRESS_MAX_KM)
+                regions += (None,)
+            else:
+                regions = ("*",)
+            for address in key.addresses:
+                for region in regions:
+                    for partition in partitions:
+                        blocks.append(self._by_address.get((address, region, partition), []))
+        for members in blocks:
+            if len(members) <= self.max_block_size:
+                yield from members
+
+        # 좌표 블록은 이름 글자쌍을 충분히 공유한 레코드만 비교
+        # (Dice >= t 이면 공유 글자쌍 수 >= t / (2 - t) * |a|)
+        if key.cell and key.grams:
+            shared = defaultdict(int)
+            for cell in neighbour_cells(key.cell, self.distance_km):
+                for partition in partitions:
+                    grams = self._by_cell.get((cell, partition))
+                    if not grams:
+                        continue
+                    for gram in key.grams:
+                        members = grams.get(gram)
+                        if members and len(members) <= self.max_block_size:
+                            for index in members:
+                                shared[index] += 1
+            threshold = ER_DISTANCE_NAME_THRESHOLD
+            min_shared = threshold / (2 - threshold) * len(key.grams)
+            for index, count in shared.items():
+                if count >= min_shared:
+                    yield index
+
+    def match(self, key: EntityKey) -> Optional[int]:
+        """
+        같은 식당으로 판정된 기존 레코드 중 이름이 가장 비슷한 레코드의 순번 (없으면 None)
+        """
+        seen = set()
+        best, best_similarity = None, -1.0
+        for index in self._candidates(key):
+            if index in seen:
+                continue
+            seen.add(index)
+            similarity = match_score(key, self.keys[index], self.distance_km)
+            if similarity is not None and similarity > best_similarity:
+                best, best_similarity = index, similarity
+        return best
+
+    def _insert(self, index: int, key: EntityKey) -> None:
+        partition = id_source(key.place_id)
+        region = key.cell[:ER_ADDRESS_PRECISION] if key.cell else None
+        for address in key.addresses:
+            self._by_address[(address, region, partition)].append(index)
+            self._by_address[(address, "*", partition)].append(index)
+        if key.cell:
+            grams = self._by_cell[(key.cell, partition)]
+            for gram in key.grams:
+                grams[gram].append(index)
+
+    def _index_pending(self) -> None:
+        for index, record in self._pending:
+            self.keys[index] = entity_key(record, self.precision)
+            self._insert(index, self.keys[index])
+        self._pending = []
+
+    def add(self, record: Dict) -> int:
+        """
+        레코드를 추가하고 엔티티 번호 반환 (기존 레코드와 같은 식당이면 그 번호)
+        """
+        index = len(self.keys)
+        place_id = qualified_place_id(record.get("place_id"))
+        source = id_source(place_id)
+        if place_id in self._by_place_id:
+            # 같은 place_id 는 비교 없이 같은 식당 (블록에는 처음 레코드만 있으면 충분)
+            self.keys.append(self.keys[self._by_place_id[place_id]])
+            self.entity_of.append(self.entity_of[self._by_place_id[place_id]])
+            return self.entity_of[index]
+
+        entity = self.entity_count
+        if place_id and self._partitions <= {source}:
+            # 같은 출처의 place_id 가 있는 레코드끼리는 비교할 필요가 없으므로,
+            # place_id 가 없거나 출처가 다른 레코드가 처음 들어올 때까지 특징 계산/블록 등록을 미룸
+            self._pending.append((index, record))
+            self.keys.append(None)
+        else:
+            self._index_pending()
+            key = entity_key(record, self.precision)
+            matched = self.match(key)
+            if matched is not None:
+                entity = self.entity_of[matched]
+            self.keys.append(key)
+            self._insert(index, key)
+
+        if entity == self.entity_count:
+            self.entity_count += 1
+        self.entity_of.append(entity)
+        self._partitions.add(source)
+        if place_id:
+            self._by_place_id[place_id] = index
+        return entity
+
+
+def resolve_entities(records: Iterable[Dict]) -> List[int]:
+    """
+    레코드별 엔티티 번호 리스트 (같은 번호 = 같은 식당, 처음 등장 순서대로 0부터)
+    """
+    index = EntityIndex()
+    return [index.add(record) for record in records]
@@ -1,73 +1,86 @@
-from selenium import webdriver
+import os
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
-
-def switch_left():
-    try:
-        driver.switch_to.default_content()
-        iframe = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#searchIframe"))
-        )
-        driver.switch_to.frame(iframe)
-    except Exception as e:
-        print(f"iframe 전환 중 오류: {e}")
-
-def switch_right():
-    try:
-        driver.switch_to.default_content()
-        iframe = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#entryIframe"))
-        )
-        driver.switch_to.frame(iframe)
-    except Exception as e:
-        print(f"iframe 전환 중 오류: {e}")
+
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_sink import CrawlRecord, JsonlSink
+from crawler_waits import (
+    AdaptiveWaiter,
+    entry_place_loaded,
+    list_length_grew,
+    search_list_ready,
+    wait_metrics,
+)
+from naver_crawler import create_driver, current_place_id, switch_left, switch_right
+
+QUERY = "부산 해운대 음식점"
+# 스크롤 목록 전체를 한 페이지로 보고 체크포인트에 기록
+PAGE = 1
+# 이 개수만큼 기록할 때마다 싱크를 flush 하고 체크포인트 저장
+CHECKPOINT_EVERY = int(os.getenv("CRAWL_CHECKPOINT_EVERY", 20))
+
+# 체크포인트 (중단 시 이어서 수집), CRAWL_FRESHNESS_HOURS 를 지정하면 증분 재수집
+# (페이지 단위로 기록하는 food_crawler2 와 진행 상황이 섞이지 않도록 파일을 따로 사용)
+checkpoint = CrawlCheckpoint(
+    os.getenv("CRAWL_SCROLL_CHECKPOINT_PATH", ".cache/crawl_checkpoint_scroll.json")
+)
+freshness_hours = os.getenv("CRAWL_FRESHNESS_HOURS")
+freshness_seconds = float(freshness_hours) * 3600 if freshness_hours else None
+if freshness_seconds is not None:
+    checkpoint.reset_tasks()
+if checkpoint.is_done(QUERY, PAGE):
+    print(f"[{QUERY}] 이미 수집을 완료했습니다. (다시 수집하려면 CRAWL_FRESHNESS_HOURS 지정)")
+    raise SystemExit
+resume_after = checkpoint.last_index(QUERY, PAGE)
 
 # 웹드라이버 설정
-options = webdriver.ChromeOptions()
-options.add_argument('window-size=1920,1080')
-options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36')
+driver = create_driver(headless=False)
+waiter = AdaptiveWaiter(driver)
+sink = JsonlSink(os.getenv("CRAWL_OUTPUT_PATH", ".cache/crawl/places.jsonl"))
+
+
+def persist():
+    # 싱크에 기록한 레코드까지만 체크포인트에 반영
+    sink.flush()
+    checkpoint.save()
 
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
 
 try:
-    # 네이버 지도 접속
+    # 네이버 지도 접속 후 검색 결과 목록이 렌더링될 때까지 대기 (iframe 전환 포함)
     URL = 'https://map.naver.com/p/search/부산%20해운대%20음식점'
     driver.get(URL)
-    time.sleep(3)  # 페이지 로딩 대기
+    if not waiter.until("search_list_ready", search_list_ready):
+        switch_left(driver)
 
-    # iframe 전환
-    switch_left()
-    time.sleep(2)
-
-    # 스크롤 처리
-    last_height = driver.execute_script("return document.body.scrollHeight")
+    # 스크롤 처리: 목록 길이가 더 이상 늘어나지 않으면 종료
+    place_count = len(driver.find_elements(By.CSS_SELECTOR, "li.UEzoS"))
     while True:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+        grown = waiter.until("list_length_grew", list_length_grew(place_count), timeout=2)
+        if not grown:
             break
-        last_height = new_height
+        place_count = grown
 
     # 검색 결과 수집
     places = driver.find_elements(By.CSS_SELECTOR, "li.UEzoS")
     print(f"총 {len(places)}개의 장소를 찾았습니다.")
 
+    written = 0
     for i, place in enumerate(places, 1):
+        # 이전 실행에서 이미 기록한 위치까지는 건너뜀
+        if i <= resume_after:
+            continue
         try:
-            # 가게 이름 클릭
+            # 가게 이름 클릭 (증분 모드: 신선도 기간 안에 수집한 가게는 건너뜀)
             name_element = place.find_element(By.CSS_SELECTOR, "span.TYaxT")
             name = name_element.text
+            if checkpoint.is_fresh(QUERY, name, freshness_seconds):
+                continue
             name_element.click()
-            time.sleep(2)
 
-            # 상세 정보 수집을 위해 iframe 전환
-            switch_right()
-            time.sleep(2)
+            # 상세 정보 iframe 에 클릭한 가게가 렌더링될 때까지 대기 (iframe 전환 포함)
+            if not waiter.until("entry_place_loaded", entry_place_loaded(name)):
+                switch_right(driver)
 
             # 상세 정보 수집
             try:
@@ -91,18 +104,38 @@ try:
             print(f"평점: {rating}")
             print(f"주소: {address}")
             print("-" * 50)
+            record = {
+                "query": QUERY,
+                "page": PAGE,
+                "index": i,
+                "place_id": current_place_id(driver),
+                "name": name,
+                "category": category,
+                "rating": rating,
+                "address": address,
+            }
+            sink.write(CrawlRecord.from_raw(record))
+            checkpoint.mark_place(QUERY, PAGE, i, record)
+            written += 1
+            if written % CHECKPOINT_EVERY == 0:
+                persist()
 
             # 다음 가게를 위해 검색 결과 프레임으로 전환
-            switch_left()
-            time.sleep(1)
+            switch_left(driver)
 
         except Exception as e:
             print(f"가게 정보 수집 중 오류: {e}")
-            switch_left()
+            switch_left(driver)
             continue
 
+    checkpoint.mark_done(QUERY, PAGE)
+
 except Exception as e:
     print(f"크롤링 중 오류 발생: {e}")
 
 finally:
+    # 중단되어도 지금까지 기록한 레코드까지만 체크포인트에 반영한 뒤 싱크를 닫음
+    persist()
     driver.quit()
+    sink.close()
+    wait_metrics.print_summary()
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import http_replay
+import telemetry
+
+# 외부 API 호출 공통 설정
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", 8))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+# -------------------------------------------------------------------
+# 모든 툴이 공유하는 HTTP 세션 (keep-alive 커넥션 풀 + 지수 백오프 재시도)
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = _build_session()
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_host_limits_lock = threading.Lock()
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        semaphore = _host_limits.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(HTTP_PER_HOST_LIMIT)
+            _host_limits[host] = semaphore
+        return semaphore
+
+
+def get(
+    url: str,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
+    timeout: Optional[Timeout] = None,
+) -> requests.Response:
+    """
+    공유 세션으로 GET 요청 (호스트별 동시 요청 수 제한, 기본 타임아웃 적용)
+    HTTP_REPLAY_MODE 에 따라 응답을 픽스처로 기록하거나 픽스처에서 재생
+    """
+    mode = http_replay.HTTP_REPLAY_MODE
+    with telemetry.span("http", host=urlparse(url).netloc) as span:
+        if mode == "replay":
+            response = http_replay.fixtures.load(
+                http_replay.fixture_key(url, params, headers), url
+            )
+            span.set(status_code=response.status_code, replay=True)
+            return response
+
+        if timeout is None:
+            timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        started = time.perf_counter()
+        with _host_semaphore(url):
+            response = _session.get(url, params=params, headers=headers, timeout=timeout)
+        span.set(status_code=response.status_code)
+
+    if mode == "record" and response.ok:
+        http_replay.fixtures.save(
+            http_replay.fixture_key(url, params, headers),
+            url,
+            response,
+            time.perf_counter() - started,
+        )
+    return response
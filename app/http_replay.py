@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# "off": 실제 호출, "record": 실제 호출 후 응답을 픽스처로 저장, "replay": 픽스처로만 응답
+HTTP_REPLAY_MODE = os.getenv("HTTP_REPLAY_MODE", "off")
+HTTP_FIXTURE_DIR = os.getenv("HTTP_FIXTURE_DIR", ".cache/fixtures/http")
+# 재생 시 기록된 응답 시간을 몇 배로 흉내낼지 (0 이면 즉시 응답)
+HTTP_REPLAY_LATENCY_SCALE = float(os.getenv("HTTP_REPLAY_LATENCY_SCALE", 0))
+
+# 픽스처 키와 파일에서 제외할 인증 정보
+SECRET_PARAMS = {"key", "api_key"}
+SECRET_HEADERS = {"x-naver-client-id", "x-naver-client-secret", "authorization"}
+
+
+class FixtureNotFound(LookupError):
+    pass
+
+
+def fixture_key(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> str:
+    """
+    (URL, 인증 정보를 뺀 파라미터/헤더)의 정규화된 해시
+    """
+    canonical = json.dumps(
+        {
+            "url": url,
+            "params": {
+                k: str(v) for k, v in (params or {}).items() if k not in SECRET_PARAMS
+            },
+            "headers": {
+                k.lower(): str(v)
+                for k, v in (headers or {}).items()
+                if k.lower() not in SECRET_HEADERS
+            },
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# -------------------------------------------------------------------
+# 외부 API 응답 픽스처 저장소 (요청 하나당 JSON 파일 하나)
+class FixtureStore:
+    def __init__(self, directory: str, latency_scale: float = HTTP_REPLAY_LATENCY_SCALE):
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def save(self, key: str, url: str, response: requests.Response, elapsed: float) -> None:
+        self._write(
+            key,
+            {
+                "url": url,
+                "status_code": response.status_code,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "body": response.text,
+                "elapsed": elapsed,
+            },
+        )
+
+    def save_json(self, key: str, url: str, data, elapsed: float = 0.0) -> None:
+        # 녹화 없이 합성 응답을 픽스처로 만들 때 사용 (벤치마크 시드)
+        self._write(
+            key,
+            {
+                "url": url,
+                "status_code": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps(data, ensure_ascii=False),
+                "elapsed": elapsed,
+            },
+        )
+
+    def _write(self, key: str, fixture: Dict) -> None:
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(fixture, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def load(self, key: str, url: str) -> requests.Response:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise FixtureNotFound(f"[http_replay] No fixture for {url} ({key})")
+        with open(path, encoding="utf-8") as f:
+            fixture = json.load(f)
+
+        if self.latency_scale > 0:
+            time.sleep(fixture.get("elapsed", 0) * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = fixture["status_code"]
+        response.headers = CaseInsensitiveDict(fixture.get("headers", {}))
+        response._content = fixture["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = fixture.get("url", url)
+        return response
+
+
+fixtures = FixtureStore(HTTP_FIXTURE_DIR)
@@ -0,0 +1,103 @@
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from restaurant_store import haversine_km
+
+# 하루 식사 슬롯: (order, 이름, 시각)
+MEAL_SLOTS = [
+    (1, "아침", "09:00"),
+    (2, "점심", "12:30"),
+    (3, "저녁", "18:30"),
+]
+# 거리 1km 당 감점, 같은 날 같은 종류 식당 감점
+DISTANCE_WEIGHT = 0.05
+DIVERSITY_PENALTY = 0.3
+SHORTAGE_REASON = "적합한 후보가 부족합니다"
+
+
+def trip_days(start_date: str, end_date: str) -> List[date]:
+    """
+    ISO 형식 시작/종료일로부터 여행 날짜 목록 (양 끝 포함, 최소 1일)
+    """
+    start = datetime.fromisoformat(start_date).date()
+    end = datetime.fromisoformat(end_date).date()
+    return [start + timedelta(days=i) for i in range(max((end - start).days, 0) + 1)]
+
+
+def korean_trip_days(text: str) -> List[date]:
+    """
+    "2025년 1월 22일 ~ 2025년 1월 25일" 형식의 기간을 날짜 목록으로 변환
+    """
+    found = re.findall(r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일", text)
+    if not found:
+        return []
+    start = date(*map(int, found[0]))
+    end = date(*map(int, found[-1]))
+    return trip_days(start.isoformat(), end.isoformat())
+
+
+def meal_plan(days: List[date], last_day_meals: int = len(MEAL_SLOTS)) -> List[Tuple[date, List[tuple]]]:
+    """
+    날짜별 식사 슬롯 (마지막 날은 last_day_meals 끼까지만)
+    """
+    plan = []
+    for i, day in enumerate(days):
+        slots = MEAL_SLOTS[:last_day_meals] if i == len(days) - 1 else MEAL_SLOTS
+        plan.append((day, list(slots)))
+    return plan
+
+
+def _position(candidate: Dict) -> Optional[Tuple[float, float]]:
+    try:
+        return float(candidate["latitude"]), float(candidate["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# -------------------------------------------------------------------
+# 점수 + 이전 장소와의 거리 + 종류 다양성으로 슬롯에 후보를 배정하는 결정적 스케줄러
+def build_itinerary(
+    days: List[date],
+    candidates: List[Dict],
+    score: Callable[[Dict], float],
+    category: Callable[[Dict], str] = lambda c: c.get("type", ""),
+    last_day_meals: int = len(MEAL_SLOTS),
+    distance_weight: float = DISTANCE_WEIGHT,
+    diversity_penalty: float = DIVERSITY_PENALTY,
+) -> List[Dict]:
+    scores = [score(c) for c in candidates]
+    top = max(scores, default=0) or 1.0
+    normalized = [s / top for s in scores]
+
+    remaining = list(range(len(candidates)))
+    spots = []
+    previous = None
+    for day_x, (day, slots) in enumerate(meal_plan(days, last_day_meals), 1):
+        day_categories = Counter()
+        for order, _, time in slots:
+            spot_time = f"{day.isoformat()}T{time}:00"
+            if not remaining:
+                spots.append(
+                    {"day_x": day_x, "order": order, "spot_time": spot_time, "reason": SHORTAGE_REASON}
+                )
+                continue
+
+            def utility(index: int) -> float:
+                candidate = candidates[index]
+                value = normalized[index]
+                position = _position(candidate)
+                if previous is not None and position is not None:
+                    value -= distance_weight * haversine_km(*previous, *position)
+                value -= diversity_penalty * day_categories[category(candidate)]
+                return value
+
+            # 동점이면 원래 순서가 앞선 후보 선택 (결정적)
+            best = max(remaining, key=lambda i: (utility(i), -i))
+            remaining.remove(best)
+            chosen = candidates[best]
+            day_categories[category(chosen)] += 1
+            previous = _position(chosen) or previous
+            spots.append({**chosen, "day_x": day_x, "order": order, "spot_time": spot_time})
+    return spots
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+
+# -------------------------------------------------------------------
+# 일정 슬롯 검증 스키마 (day_x / order / spot_time)
+class SpotSlot(BaseModel):
+    day_x: int
+    order: int
+    spot_time: str
+
+    @field_validator("day_x", "order")
+    @classmethod
+    def positive(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("1 이상이어야 합니다.")
+        return value
+
+    @field_validator("spot_time")
+    @classmethod
+    def iso_datetime(cls, value: str) -> str:
+        datetime.fromisoformat(value)
+        return value
+
+
+def validate_spot(spot: Dict) -> Optional[Dict]:
+    """
+    일정 슬롯 필드가 유효하면 spot 을 그대로, 아니면 None 반환
+    """
+    try:
+        SpotSlot(**spot)
+    except (ValidationError, TypeError):
+        return None
+    return spot
+
+
+# -------------------------------------------------------------------
+# LLM 토큰 스트림에서 "Spots" 배열의 객체를 완성되는 즉시 꺼내는 증분 파서
+class IncrementalSpotParser:
+    def __init__(self, array_key: str = "Spots"):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0  # 다음에 검사할 위치
+        self._in_array = False
+        self._done = False
+        self._depth = 0  # 배열 안에서의 중괄호 깊이
+        self._start = -1  # 현재 객체 시작 위치
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self._buffer += chunk
+        completed = []
+        if self._done:
+            return completed
+
+        if not self._in_array:
+            key = self._buffer.find(f'"{self.array_key}"')
+            if key < 0:
+                return completed
+            bracket = self._buffer.find("[", key)
+            if bracket < 0:
+                return completed
+            self._in_array = True
+            self._pos = bracket + 1
+
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            ch = buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = self._pos
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        completed.append(json.loads(buffer[self._start : self._pos + 1]))
+                    except ValueError:
+                        pass
+            elif ch == "]" and self._depth == 0:
+                self._done = True
+                self._pos += 1
+                break
+            self._pos += 1
+        return completed
+
+    @property
+    def text(self) -> str:
+        return self._buffer
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import telemetry
+from persistent_cache import PersistentTTLCache
+from prompt_compaction import estimate_tokens
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 60 * 60 * 24))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 50_000))
+
+logger = logging.getLogger(__name__)
+
+# 최종 추천 LLM 응답 캐시 (메모리 LRU + SQLite, TTL 만료)
+llm_response_cache = PersistentTTLCache(
+    path=LLM_CACHE_PATH,
+    table="llm_responses",
+    ttl_seconds=LLM_CACHE_TTL,
+    max_memory_items=256,
+    max_disk_items=LLM_CACHE_SIZE,
+)
+
+
+def llm_cache_key(
+    model: str, prompt_version: str, candidate_ids: List[str], plan: Dict
+) -> str:
+    """
+    (모델, 프롬프트 템플릿 버전, 후보 ID 목록, 여행 계획 필드)의 정규화된 해시
+    """
+    canonical = json.dumps(
+        {
+            "model": model,
+            "prompt_version": prompt_version,
+            "candidates": list(candidate_ids),
+            "plan": plan,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_valid_response(response: Optional[str], validate: Optional[Callable[[str], Any]]) -> bool:
+    """
+    응답이 비어 있지 않고 validate(파싱 함수)가 예외 없이 통과하는지 확인
+    """
+    if not response:
+        return False
+    if validate is None:
+        return True
+    try:
+        validate(response)
+    except Exception as e:
+        logger.warning("[llm_cache] Invalid response: %s", e)
+        return False
+    return True
+
+
+def cached_llm_call(
+    key: str,
+    call: Callable[[], str],
+    prompt: str = "",
+    validate: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """
+    캐시에 있으면 바로 반환하고, 없으면 LLM 을 호출해 응답을 저장
+    (prompt 는 토큰 수 집계에만 사용)
+
+    validate 는 응답을 파싱하는 함수로, 예외 없이 통과한 응답만 캐시에 저장한다.
+    (잘린 응답이나 JSON 이 아닌 응답이 TTL 동안 같은 요청에 재사용되지 않도록)
+    캐시된 응답도 validate 를 통과하지 못하면 무시하고 다시 호출한다.
+    """
+    with telemetry.span("llm", cache_hit=False) as span:
+        cached = llm_response_cache.get(key)
+        if cached is not None and is_valid_response(cached, validate):
+            span.set(cache_hit=True)
+            return cached
+        response = call()
+        span.set(
+            prompt_tokens=estimate_tokens(prompt),
+            completion_tokens=estimate_tokens(response or ""),
+        )
+        if is_valid_response(response, validate):
+            llm_response_cache.set(key, response)
+        return response
@@ -0,0 +1,412 @@
+import os
+import queue
+import re
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import quote
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_sink import CrawlRecord
+from crawler_waits import (
+    PLACE_TITLE_SELECTOR,
+    AdaptiveWaiter,
+    entry_place_loaded,
+    first_place_changed,
+    first_place_name,
+    search_list_ready,
+    title_matches,
+)
+from naver_extract import (
+    DETAIL_FIELD_SELECTORS,
+    click_list_item,
+    drain_network_log,
+    extract_detail_fields,
+    extract_list_items,
+    extract_page_json,
+    performance_logging_capability,
+)
+
+SEARCH_URL = "https://map.naver.com/p/search/{query}"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+CRAWLER_WORKERS = int(os.getenv("CRAWLER_WORKERS", os.cpu_count() or 1))
+# "json": 검색 결과 데이터(네트워크 응답/내장 상태)를 페이지 단위로 추출하고 없으면 클릭 수집
+# "dom": 목록을 한 번에 읽고, 필요한 경우에만 가게를 클릭해서 상세 정보를 보충
+CRAWLER_EXTRACTION = os.getenv("CRAWLER_EXTRACTION", "json")
+# 목록에 없는 필드를 상세 정보 화면에서 보충할지 여부
+CRAWLER_DETAIL_PASS = os.getenv("CRAWLER_DETAIL_PASS", "1") == "1"
+# 검색 결과 페이지 번호 버튼 / 다음 페이지 화살표
+PAGE_BUTTON_SELECTOR = "a.mBN2s"
+NEXT_PAGE_XPATH = "//a[.//span[contains(text(), '다음페이지')]]"
+
+
+class CrawlTask(NamedTuple):
+    query: str
+    page: int
+
+
+# -------------------------------------------------------------------
+# 웹드라이버 / iframe 유틸
+def create_driver(headless: bool = True, capture_network: bool = False) -> webdriver.Chrome:
+    options = webdriver.ChromeOptions()
+    options.add_argument("window-size=1920,1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", performance_logging_capability())
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=options)
+
+
+def switch_left(driver):
+    try:
+        driver.switch_to.default_content()
+        iframe = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#searchIframe"))
+        )
+        driver.switch_to.frame(iframe)
+    except Exception as e:
+        print(f"iframe 전환 중 오류: {e}")
+
+
+def switch_right(driver):
+    try:
+        driver.switch_to.default_content()
+        iframe = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#entryIframe"))
+        )
+        driver.switch_to.frame(iframe)
+    except Exception as e:
+        print(f"iframe 전환 중 오류: {e}")
+
+
+def place_id_from_url(url: str) -> Optional[str]:
+    # 상세 정보 iframe 주소(예: .../restaurant/1234567/home)에서 네이버 장소 ID 추출
+    match = re.search(r"/(\d{5,})(?:/|\?|$)", url or "")
+    return match.group(1) if match else None
+
+
+def current_place_id(driver) -> Optional[str]:
+    try:
+        return place_id_from_url(driver.execute_script("return location.href"))
+    except Exception:
+        return None
+
+
+def open_search(driver, waiter: AdaptiveWaiter, query: str) -> bool:
+    # 네이버 지도 검색 결과 페이지 접속 후, 검색 결과 목록이 렌더링될 때까지 대기
+    drain_network_log(driver)
+    driver.get(SEARCH_URL.format(query=quote(query)))
+    if not waiter.until("search_list_ready", search_list_ready):
+        print(f"[{query}] 검색 결과 목록을 불러오지 못했습니다.")
+        return False
+    return True
+
+
+def click_page_button(driver, waiter: AdaptiveWaiter, button) -> bool:
+    previous_name = first_place_name(driver)
+    drain_network_log(driver)
+    # JavaScript로 클릭 (더 안정적) 후 목록이 바뀔 때까지 대기
+    driver.execute_script("arguments[0].click();", button)
+    return bool(waiter.until("page_changed", first_place_changed(previous_name)))
+
+
+def go_to_page(driver, waiter: AdaptiveWaiter, page: int) -> bool:
+    """
+    page 번 버튼이 보일 때까지 보이는 번호 중 가장 뒤쪽 번호(없으면 '다음페이지')로 이동한 뒤 클릭
+    (페이지 버튼은 현재 위치 주변의 몇 개만 보이므로 깊은 페이지는 단계적으로 이동해야 함)
+    """
+    current = 1
+    while current < page:
+        # 페이지 번호 찾기 (mBN2s 클래스를 가진 버튼들)
+        buttons = {
+            button.text: button
+            for button in driver.find_elements(By.CSS_SELECTOR, PAGE_BUTTON_SELECTOR)
+        }
+        if str(page) in buttons:
+            return click_page_button(driver, waiter, buttons[str(page)])
+
+        visible = [int(text) for text in buttons if text.isdigit() and current < int(text) < page]
+        if visible:
+            step, button = max(visible), buttons[str(max(visible))]
+        else:
+            next_buttons = driver.find_elements(By.XPATH, NEXT_PAGE_XPATH)
+            if not next_buttons or next_buttons[0].get_attribute("aria-disabled") == "true":
+                break
+            step, button = current + 1, next_buttons[0]
+        if not click_page_button(driver, waiter, button):
+            break
+        current = step
+    else:
+        return True
+    print(f"페이지 {page} 버튼을 찾을 수 없습니다.")
+    return False
+
+
+# -------------------------------------------------------------------
+# 각 페이지의 데이터 수집 함수
+def collect_page_data(
+    driver,
+    waiter: AdaptiveWaiter,
+    query: str,
+    page_num: int,
+    checkpoint: Optional[CrawlCheckpoint] = None,
+    freshness_seconds: Optional[float] = None,
+    detail: bool = CRAWLER_DETAIL_PASS,
+) -> List[Dict]:
+    """
+    목록 필드는 execute_script 한 번으로 읽고, detail=True 이면 목록에 없는 필드가 있는 가게만 클릭해서 보충
+    """
+    records = []
+    resume_after = checkpoint.last_index(query, page_num) if checkpoint else 0
+
+    # 검색 결과 수집 (모든 목록 항목을 한 번에)
+    items = extract_list_items(driver)
+    print(f"[{query}] 페이지 {page_num}에서 {len(items)}개의 장소를 찾았습니다.")
+
+    for item in items:
+        i = item["index"]
+        name = item.get("name")
+        place_id = next(filter(None, map(place_id_from_url, item.get("links") or [])), None)
+        # 이전 실행에서 이미 처리한 위치까지는 건너뜀
+        if i <= resume_after or not name:
+            continue
+        # 증분 모드: 신선도 기간 안에 수집한 가게는 건너뜀
+        if checkpoint and checkpoint.is_fresh(query, name, freshness_seconds, place_id):
+            continue
+
+        record = {
+            "query": query,
+            "page": page_num,
+            "index": i,
+            "place_id": place_id,
+            "name": name,
+            "category": item.get("category"),
+            "rating": item.get("rating"),
+            "address": None,
+            "district": item.get("district"),
+        }
+
+        missing = [field for field in DETAIL_FIELD_SELECTORS if not record.get(field)]
+        if detail and missing:
+            try:
+                fill_detail_fields(driver, waiter, record, missing)
+            except Exception as e:
+                print(f"가게 정보 수집 중 오류: {e}")
+            finally:
+                # 다음 가게를 위해 검색 결과 프레임으로 전환
+                switch_left(driver)
+
+        record["category"] = record["category"] or "정보 없음"
+        record["rating"] = record["rating"] or "평점 없음"
+        # 상세 주소를 얻지 못하면 주소는 비워 둠 (목록의 동네 이름은 district 로만 기록)
+        record["address"] = record["address"] or "주소 정보 없음"
+        records.append(record)
+
+    return records
+
+
+def fill_detail_fields(driver, waiter: AdaptiveWaiter, record: Dict, fields: List[str]) -> bool:
+    """
+    가게를 클릭하고 상세 정보 iframe 에서 누락된 필드만 한 번에 읽어 채움
+    상세 화면이 이 가게로 바뀌지 않았으면 (대기 시간 초과 등) 이전에 연 가게의 정보이므로
+    레코드를 건드리지 않고 False 반환
+    """
+    if not click_list_item(driver, record["index"]):
+        return False
+    if not waiter.until("entry_place_loaded", entry_place_loaded(record["name"])):
+        print(f"[{record['name']}] 상세 정보를 불러오지 못해 목록 정보만 기록합니다.")
+        return False
+    detail = extract_detail_fields(driver, {**DETAIL_FIELD_SELECTORS, "title": PLACE_TITLE_SELECTOR})
+    if not title_matches(record["name"], detail.get("title")):
+        print(f"[{record['name']}] 상세 화면의 가게가 달라 목록 정보만 기록합니다.")
+        return False
+    record["place_id"] = place_id_from_url(detail.get("href", "")) or record["place_id"]
+    for field in fields:
+        record[field] = detail.get(field)
+    return True
+
+
+def collect_page_json(
+    driver,
+    query: str,
+    page_num: int,
+    checkpoint: Optional[CrawlCheckpoint] = None,
+    freshness_seconds: Optional[float] = None,
+) -> Optional[List[Dict]]:
+    """
+    페이지 데이터를 한 번에 추출 (추출 자체가 실패하면 None 을 반환해 클릭 수집으로 전환)
+    """
+    extracted = extract_page_json(driver, query, page_num)
+    if not extracted:
+        return None
+
+    # 클릭 수집과 같이 이전 실행에서 이미 내보낸 위치까지는 건너뜀
+    resume_after = checkpoint.last_index(query, page_num) if checkpoint else 0
+    return [
+        record
+        for record in extracted
+        if record["index"] > resume_after
+        and not (
+            checkpoint
+            and checkpoint.is_fresh(query, record["name"], freshness_seconds, record["place_id"])
+        )
+    ]
+
+
+def crawl_task(
+    driver,
+    waiter: AdaptiveWaiter,
+    task: CrawlTask,
+    checkpoint: Optional[CrawlCheckpoint] = None,
+    freshness_seconds: Optional[float] = None,
+    extraction: str = CRAWLER_EXTRACTION,
+) -> Optional[List[Dict]]:
+    """
+    한 페이지의 레코드를 반환 (이미 완료했거나 페이지를 열지 못하면 None)
+    체크포인트는 읽기만 하고, 진행 상황은 결과를 받은 crawl() 이 기록한다.
+    """
+    if checkpoint and checkpoint.is_done(task.query, task.page):
+        return None
+    if not open_search(driver, waiter, task.query):
+        return None
+    if not go_to_page(driver, waiter, task.page):
+        return None
+
+    records = None
+    if extraction == "json":
+        records = collect_page_json(
+            driver, task.query, task.page, checkpoint, freshness_seconds
+        )
+        if records is None:
+            print(f"[{task.query}] 페이지 {task.page} 데이터 추출 실패, 클릭 수집으로 전환합니다.")
+    if records is None:
+        records = collect_page_data(
+            driver, waiter, task.query, task.page, checkpoint, freshness_seconds
+        )
+    return records
+
+
+# -------------------------------------------------------------------
+# 브라우저 워커 풀: 각 워커가 자기 드라이버로 (검색어, 페이지) 작업을 나눠 처리
+def _worker(
+    tasks: "queue.Queue",
+    results: "queue.Queue",
+    stop: threading.Event,
+    headless: bool,
+    checkpoint: Optional[CrawlCheckpoint],
+    freshness_seconds: Optional[float],
+    extraction: str,
+):
+    driver = None
+    try:
+        driver = create_driver(headless, capture_network=extraction == "json")
+        waiter = AdaptiveWaiter(driver)
+        # 소비자가 crawl() 반복을 멈추면 stop 이 설정되어 남은 작업을 가져가지 않음
+        while not stop.is_set():
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                records = crawl_task(
+                    driver, waiter, task, checkpoint, freshness_seconds, extraction
+                )
+                if records is not None:
+                    results.put((task, records))
+            except Exception as e:
+                print(f"[{task.query}] 페이지 {task.page} 크롤링 중 오류 발생: {e}")
+    except Exception as e:
+        print(f"크롤링 워커 오류 발생: {e}")
+    finally:
+        if driver is not None:
+            driver.quit()
+        results.put(None)
+
+
+def crawl(
+    queries: List[str],
+    total_pages: int = 5,
+    workers: int = CRAWLER_WORKERS,
+    headless: bool = True,
+    checkpoint: Optional[CrawlCheckpoint] = None,
+    freshness_seconds: Optional[float] = None,
+    extraction: str = CRAWLER_EXTRACTION,
+    sink=None,
+) -> Iterator[Dict]:
+    """
+    검색어 x 페이지 작업을 워커 풀에 분배하고, 완료되는 순서대로 레코드를 하나의 스트림으로 반환
+
+    checkpoint 를 넘기면 완료된 페이지는 건너뛰고 중단된 페이지는 마지막 위치부터 이어서 수집한다.
+    freshness_seconds 를 함께 넘기면 증분 모드로, 페이지는 다시 돌지만 기간 안에 수집한 가게는 건너뛴다.
+    extraction="json" 이면 페이지 단위 데이터 추출을 먼저 시도하고, 실패한 페이지만 클릭 수집한다.
+    sink 를 넘기면 레코드를 반환하기 전에 싱크에 기록하고, 페이지마다/종료 시 flush 한다.
+    반복을 중간에 멈추면 (close) 워커에 중단 신호를 보내 남은 페이지는 수집하지 않는다.
+
+    체크포인트는 레코드가 소비된 뒤에만 전진하고, 파일 저장은 싱크를 flush 한 다음에만 하므로
+    중단되어도 출력에 없는 가게가 완료로 기록되지 않는다. (다시 수집되는 중복은 생길 수 있음)
+    """
+    if checkpoint and freshness_seconds is not None:
+        checkpoint.reset_tasks()
+
+    tasks: "queue.Queue" = queue.Queue()
+    for query in queries:
+        for page in range(1, total_pages + 1):
+            if checkpoint and checkpoint.is_done(query, page):
+                continue
+            tasks.put(CrawlTask(query, page))
+    if tasks.empty():
+        return
+
+    worker_count = max(1, min(workers, tasks.qsize()))
+    results: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(tasks, results, stop, headless, checkpoint, freshness_seconds, extraction),
+            daemon=True,
+        )
+        for _ in range(worker_count)
+    ]
+    for thread in threads:
+        thread.start()
+
+    def persist() -> None:
+        if sink is not None:
+            sink.flush()
+        if checkpoint:
+            checkpoint.save()
+
+    finished = 0
+    try:
+        while finished < worker_count:
+            result = results.get()
+            if result is None:
+                finished += 1
+                continue
+            task, records = result
+            for record in records:
+                if sink is not None:
+                    sink.write(CrawlRecord.from_raw(record))
+                yield record
+                if checkpoint:
+                    checkpoint.mark_place(task.query, task.page, record["index"], record)
+            if checkpoint:
+                checkpoint.mark_done(task.query, task.page)
+            persist()
+    finally:
+        # 중간에 반복을 멈춰도 (generator close) 워커가 남은 페이지를 계속 돌지 않도록
+        # 중단 신호를 보내고 남은 작업을 비움 (진행 중인 페이지는 끝난 뒤 워커가 종료)
+        stop.set()
+        while True:
+            try:
+                tasks.get_nowait()
+            except queue.Empty:
+                break
+        persist()
@@ -0,0 +1,216 @@
+import json
+from typing import Dict, List, Optional
+
+# 네이버 지도 검색 결과를 내려주는 GraphQL 응답 URL 일부
+GRAPHQL_URL_MARKERS = ("pcmap-api.place.naver.com/graphql", "/graphql")
+# 검색 결과 항목의 __typename 접미사 (RestaurantListSummary, PlaceSummary 등)
+SUMMARY_TYPENAME_SUFFIX = "Summary"
+
+# 검색 결과 iframe 에 내장된 Apollo 캐시에서 목록 항목만 한 번에 꺼내는 스크립트
+APOLLO_STATE_SCRIPT = """
+const state = window.__APOLLO_STATE__ || {};
+return Object.keys(state)
+    .filter((key) => /Summary:/.test(key))
+    .map((key) => state[key]);
+"""
+
+
+def performance_logging_capability() -> Dict:
+    # 네트워크 응답을 가로채기 위해 크롬 성능 로그 활성화
+    return {"performance": "ALL"}
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def from_place_item(item: Dict, query: str, page: int, index: int) -> Dict:
+    """
+    GraphQL/Apollo 항목을 크롤러 레코드 형태로 변환
+    """
+    return {
+        "query": query,
+        "page": page,
+        "index": index,
+        "place_id": str(item["id"]) if item.get("id") else None,
+        "name": item.get("name", ""),
+        "category": item.get("category") or "정보 없음",
+        "rating": _to_float(item.get("visitorReviewScore")) or "평점 없음",
+        "reviews": _to_int(item.get("visitorReviewCount")),
+        "address": item.get("roadAddress")
+        or item.get("address")
+        or item.get("commonAddress")
+        or "주소 정보 없음",
+        # 네이버 좌표는 x=경도, y=위도
+        "latitude": _to_float(item.get("y")),
+        "longitude": _to_float(item.get("x")),
+    }
+
+
+def _find_place_items(payload) -> List[Dict]:
+    # 응답 JSON 을 순회하며 검색 결과 항목(__typename 이 *Summary 이고 id/name 보유)을 수집
+    found = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            typename = node.get("__typename", "")
+            if typename.endswith(SUMMARY_TYPENAME_SUFFIX) and node.get("id") and node.get("name"):
+                found.append(node)
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return found
+
+
+# -------------------------------------------------------------------
+# 네트워크 응답 캡처
+def drain_network_log(driver) -> None:
+    """
+    지금까지 쌓인 성능 로그를 비움 (페이지 이동 직전에 호출)
+    """
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
+
+
+def capture_place_items(driver) -> List[Dict]:
+    """
+    마지막으로 로그를 비운 뒤 도착한 GraphQL 응답에서 검색 결과 항목을 추출
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+
+    items = []
+    seen = set()
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") != "Network.responseReceived":
+            continue
+        params = message.get("params", {})
+        url = params.get("response", {}).get("url", "")
+        if not any(marker in url for marker in GRAPHQL_URL_MARKERS):
+            continue
+        try:
+            body = driver.execute_cdp_cmd(
+                "Network.getResponseBody", {"requestId": params["requestId"]}
+            )
+            payload = json.loads(body.get("body", ""))
+        except Exception:
+            continue
+        for item in _find_place_items(payload):
+            if item["id"] not in seen:
+                seen.add(item["id"])
+                items.append(item)
+    return items
+
+
+def embedded_place_items(driver) -> List[Dict]:
+    """
+    현재 프레임(검색 결과 iframe)의 Apollo 캐시에서 검색 결과 항목을 추출
+    """
+    try:
+        return driver.execute_script(APOLLO_STATE_SCRIPT) or []
+    except Exception:
+        return []
+
+
+def extract_page_json(driver, query: str, page: int) -> List[Dict]:
+    """
+    페이지 전체 레코드를 한 번에 추출: 네트워크 응답 -> 내장 상태 순서로 시도, 둘 다 없으면 빈 리스트
+    """
+    items = capture_place_items(driver)
+    if not items and page == 1:
+        # 내장 상태는 최초 로딩된 1페이지만 담고 있음
+        items = embedded_place_items(driver)
+    return [from_place_item(item, query, page, i) for i, item in enumerate(items, 1)]
+
+
+# -------------------------------------------------------------------
+# 배치 DOM 추출: 목록/상세 필드를 execute_script 한 번으로 읽기
+PLACE_LIST_SELECTOR = "li.UEzoS"
+# 목록 카드의 주소(span.Pb4bU)는 "해운대구 우동" 같은 동네 이름뿐이라 district 로 따로 받고,
+# address 는 상세 화면(span.LDgIH)의 전체 주소만 사용 (상세 수집을 못 하면 비워 둠)
+LIST_FIELD_SELECTORS = {
+    "name": "span.TYaxT",
+    "category": "span.KCMnt",
+    "rating": "span.h69bs",
+    "district": "span.Pb4bU",
+}
+DETAIL_FIELD_SELECTORS = {
+    "category": "span.lnJFt",
+    "rating": "span.PXMot",
+    "address": "span.LDgIH",
+}
+
+LIST_ITEMS_SCRIPT = """
+const [itemSelector, fields] = arguments;
+return Array.from(document.querySelectorAll(itemSelector)).map((item, i) => {
+    // 장소 ID 는 항목 안 링크 주소(.../place/1234567 등)에서 추출
+    const row = {index: i + 1, links: Array.from(item.querySelectorAll("a[href]"), (a) => a.href)};
+    for (const [key, selector] of Object.entries(fields)) {
+        const el = item.querySelector(selector);
+        row[key] = el ? el.innerText.trim() : null;
+    }
+    return row;
+});
+"""
+
+DETAIL_FIELDS_SCRIPT = """
+const [fields] = arguments;
+const row = {href: location.href};
+for (const [key, selector] of Object.entries(fields)) {
+    const el = document.querySelector(selector);
+    row[key] = el ? el.innerText.trim() : null;
+}
+return row;
+"""
+
+CLICK_ITEM_SCRIPT = """
+const [itemSelector, nameSelector, index] = arguments;
+const item = document.querySelectorAll(itemSelector)[index - 1];
+const name = item && item.querySelector(nameSelector);
+if (!name) return false;
+name.scrollIntoView();
+name.click();
+return true;
+"""
+
+
+def extract_list_items(driver) -> List[Dict]:
+    """
+    현재 프레임(검색 결과 iframe)의 모든 목록 항목 필드를 한 번에 읽기
+    """
+    return driver.execute_script(LIST_ITEMS_SCRIPT, PLACE_LIST_SELECTOR, LIST_FIELD_SELECTORS) or []
+
+
+def extract_detail_fields(driver, fields: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    현재 프레임(상세 정보 iframe)의 상세 필드와 주소(href)를 한 번에 읽기
+    """
+    return driver.execute_script(DETAIL_FIELDS_SCRIPT, fields or DETAIL_FIELD_SELECTORS) or {}
+
+
+def click_list_item(driver, index: int) -> bool:
+    return bool(
+        driver.execute_script(
+            CLICK_ITEM_SCRIPT, PLACE_LIST_SELECTOR, LIST_FIELD_SELECTORS["name"], index
+        )
+    )
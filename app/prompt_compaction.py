@@ -0,0 +1,86 @@
+import json
+import math
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 3000))
+PROMPT_TOP_K = int(os.getenv("PROMPT_TOP_K", 30))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 대략적인 토큰 수 추정 (ASCII 약 4자당 1토큰, 한글 등은 1자당 1토큰)
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def strip_tags(text: str) -> str:
+    # 네이버 검색 결과 제목의 <b> 태그 등 제거
+    return re.sub(r"<[^>]+>", "", text or "")
+
+
+def popularity_score(candidate: Dict) -> float:
+    # 평점 x log(리뷰 수) (필터링된 맛집 스키마 기준)
+    return float(candidate.get("satisfaction") or 0) * math.log1p(
+        float(candidate.get("likes") or 0)
+    )
+
+
+def compact_dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+# -------------------------------------------------------------------
+# 후보 리스트 압축: 필요한 필드만 남기고 짧은 ID 부여, 토큰 예산 안에서 상위 k개 선택
+def compact_candidates(
+    candidates: List[Dict],
+    fields: Dict[str, Callable[[Dict], object]],
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    top_k: int = PROMPT_TOP_K,
+    score: Optional[Callable[[Dict], float]] = None,
+) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """
+    fields 는 {출력 필드명: 후보에서 값을 꺼내는 함수}.
+    반환값은 (LLM 에 보낼 압축 후보 리스트, {짧은 ID: 원본 후보}).
+    """
+    ranked = list(candidates)
+    if score is not None:
+        ranked.sort(key=score, reverse=True)
+    ranked = ranked[:top_k]
+
+    compact = []
+    id_map = {}
+    used_tokens = 0
+    for i, candidate in enumerate(ranked, 1):
+        short_id = f"r{i}"
+        row = {"id": short_id}
+        for name, getter in fields.items():
+            value = getter(candidate)
+            if value not in (None, "", []):
+                row[name] = value
+        tokens = estimate_tokens(compact_dumps(row))
+        if compact and used_tokens + tokens > token_budget:
+            break
+        used_tokens += tokens
+        compact.append(row)
+        id_map[short_id] = candidate
+    return compact, id_map
+
+
+def rehydrate(items: List[Dict], id_map: Dict[str, Dict], fill: Callable[[Dict], Dict]) -> List[Dict]:
+    """
+    LLM 응답 항목의 짧은 ID 를 원본 후보 필드로 되돌림 (fill 로 원본 -> 출력 필드 변환).
+    모르는 ID(후보 부족 안내 등)는 그대로 둔다.
+    """
+    result = []
+    for item in items:
+        candidate = id_map.get(str(item.get("id", "")))
+        if candidate is None:
+            result.append(item)
+            continue
+        merged = dict(fill(candidate))
+        merged.update({k: v for k, v in item.items() if k != "id"})
+        result.append(merged)
+    return result
@@ -1,38 +1,88 @@
+import logging
 import os
 from dotenv import load_dotenv
-from langchain_community.chat_models import ChatOpenAI
-import requests
+import telemetry
+import restaurant_agent_service as service
+from candidate_retrieval import naver_local_candidates, popularity
+from itinerary_scheduler import korean_trip_days, meal_plan
+from llm_cache import cached_llm_call, llm_cache_key
+from prompt_compaction import compact_candidates, compact_dumps, rehydrate
+from single_flight import once
 import json
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-NAVER_SEARCH_CLIENT_ID = os.getenv("NAVER_SEARCH_CLIENT_ID")
-NAVER_SEARCH_CLIENT_SECRET = os.getenv("NAVER_SEARCH_CLIENT_SECRET")
 
-llm = ChatOpenAI(model="gpt-4o-mini", openai_api_key=OPENAI_API_KEY)
+RECOMMENDATION_MODEL = "gpt-4o-mini"
+# 프롬프트 내용을 바꾸면 버전을 올려서 이전 LLM 응답 캐시를 무효화
+PROMPT_VERSION = "4"
 
+# LLM 에 보낼 식당 필드 (통합 후보 스키마에서 링크/좌표 등 나머지 필드는 제외)
+COMPACT_PLACE_FIELDS = {
+    "name": lambda item: item.get("title"),
+    "category": lambda item: item.get("type"),
+    "rating": lambda item: item.get("rating"),
+    "address": lambda item: item.get("road_address") or item.get("address"),
+}
 
-def search_naver_places(query, display=5):
-    url = "https://openapi.naver.com/v1/search/local.json"
-    headers = {
-        "X-Naver-Client-Id": NAVER_SEARCH_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_SEARCH_CLIENT_SECRET,
-    }
-    params = {"query": query, "display": display}
 
-    response = requests.get(url, headers=headers, params=params)
-    return response.json() if response.status_code == 200 else None
+@once
+def get_llm():
+    # langchain 은 import 가 무거우므로 처음 추천할 때 불러와서 클라이언트를 한 번만 생성
+    from langchain_community.chat_models import ChatOpenAI
+
+    return ChatOpenAI(model=RECOMMENDATION_MODEL, openai_api_key=OPENAI_API_KEY)
+
+
+def retrieve_places(location: str):
+    # 좌표를 얻으면 모든 출처(serpAPI/네이버/로컬 저장소)를 동시에 조회하고,
+    # 좌표 조회에 실패하면 좌표가 필요 없는 네이버 지역 검색만 사용
+    coordinates = service.geocoding_tool._run(location)
+    try:
+        [float(v) for v in coordinates.split(",")]
+    except ValueError:
+        return naver_local_candidates(f"{location} 맛집")
+    return service.restaurant_search_tool._run(location, coordinates)
+
+
+def parse_recommendations(response: str) -> dict:
+    """
+    {"recommendations": [...]} 형태의 JSON 객체만 허용 (JSON 이 아니거나 잘린 응답 등은 ValueError)
+    """
+    text = response.strip().strip("`")
+    data = json.loads(text[len("json") :] if text.startswith("json") else text)
+    if not isinstance(data, dict) or not isinstance(data.get("recommendations"), list):
+        raise ValueError("응답에 recommendations 리스트가 없습니다.")
+    return data
+
+
+def rehydrate_response(response: str, id_map: dict) -> str:
+    # 응답 JSON 의 id 를 원본 식당의 이름/주소/종류로 채움 (형식이 맞지 않으면 ValueError)
+    data = parse_recommendations(response)
+    data["recommendations"] = rehydrate(
+        data["recommendations"],
+        id_map,
+        lambda item: {key: getter(item) for key, getter in COMPACT_PLACE_FIELDS.items()},
+    )
+    return json.dumps(data, ensure_ascii=False, indent=2)
 
 
 def generate_restaurant_recommendations(keywords):
-    restaurants_data = []
+    restaurants_data = retrieve_places(keywords["location"])
 
-    search_query = f"{keywords['location']} 맛집"
-    places_data = search_naver_places(search_query)
+    # 필요한 필드만 남기고 짧은 ID 를 붙여서 전달 (응답의 ID 로 이름/주소/종류를 다시 채움)
+    compact, id_map = compact_candidates(restaurants_data, COMPACT_PLACE_FIELDS, score=popularity)
+    candidate_lines = "\n".join(compact_dumps(row) for row in compact)
 
-    if places_data and "items" in places_data:
-        restaurants_data = places_data["items"]
+    # 여행 기간에서 날짜별 식사 슬롯 도출 (마지막 날은 아침, 점심 2끼)
+    days = korean_trip_days(keywords["dates"])
+    meal_rules = "\n".join(
+        f"    - {day.month}월 {day.day}일 ({day_x}일차): "
+        + ", ".join(name for _, name, _ in slots)
+        for day_x, (day, slots) in enumerate(meal_plan(days, last_day_meals=2), 1)
+    ) or "    - 하루 3끼(아침, 점심, 저녁) 추천"
 
     user_data_description = f"""
     당신은 대한민국에 있는 식당에 대한 전문가이자 추천 AI입니다. 사용자의 여행 데이터를 기반으로 여행 일정에 가장 적합한 식당을 추천해주세요.
@@ -44,15 +94,14 @@ def generate_restaurant_recommendations(keywords):
     - 그룹 구성: 성인 {keywords['group']['adults']}, 아동 {keywords['group']['children']}, 반려동물 {keywords['group']['pets']}
     - 여행 테마: {', '.join(keywords['themes'])}
 
-    실제 식당 데이터:
-    {json.dumps(restaurants_data, ensure_ascii=False, indent=2)}
+    실제 식당 데이터 (id, name, category, rating, address):
+    {candidate_lines}
 
     위 실제 식당 데이터를 기반으로 {keywords['location']} 지역의 식당을 추천해주세요.
     제공된 실제 식당 정보만 사용하여 추천해주세요.
 
-    추천 일정 규칙:
-    - 전체 여행일(1월 22일~24일)은 하루 3끼(아침, 점심, 저녁) 추천
-    - 마지막 여행일(1월 25일)은 2끼(아침, 점심) 추천
+    추천 일정 규칙 (날짜별 추천 끼니):
+{meal_rules}
 
     다음과 같은 JSON 형식으로 응답해주세요:
     {{
@@ -60,10 +109,8 @@ def generate_restaurant_recommendations(keywords):
             {{
                 "day": "1일차",
                 "order": "1",
-                "name": "식당명",
+                "id": "식당 데이터의 id",
                 "description": "식당 설명",
-                "address": "주소",
-                "category": "음식 종류",
                 "reason": "추천 이유",
                 "place_description": "장소 상세 설명"
             }}
@@ -71,22 +118,35 @@ def generate_restaurant_recommendations(keywords):
     }}
     """
 
+    cache_key = llm_cache_key(
+        RECOMMENDATION_MODEL,
+        PROMPT_VERSION,
+        [f"{r.get('title', '')}|{r.get('address', '')}" for r in id_map.values()],
+        keywords,
+    )
     try:
-        response = llm.predict(user_data_description)
-        return response.strip()
+        response = cached_llm_call(
+            cache_key,
+            lambda: get_llm().predict(user_data_description).strip(),
+            user_data_description,
+            validate=parse_recommendations,
+        )
+        with telemetry.span("validate_recommendations"):
+            return rehydrate_response(response, id_map)
     except Exception as e:
-        print(f"GPT 호출 오류: {e}")
+        logger.warning("GPT 호출 오류: %s", e)
         return "추천 실패: GPT 호출 중 문제가 발생했습니다."
 
 
-keywords = {
-    "location": "부산 해운대",
-    "dates": "2025년 1월 22일 ~ 2025년 1월 25일",
-    "age_group": "10대 미만",
-    "themes": ["가족 여행", "리조트"],
-    "group": {"adults": 2, "children": 1, "pets": 1},
-}
+if __name__ == "__main__":
+    keywords = {
+        "location": "부산 해운대",
+        "dates": "2025년 1월 22일 ~ 2025년 1월 25일",
+        "age_group": "10대 미만",
+        "themes": ["가족 여행", "리조트"],
+        "group": {"adults": 2, "children": 1, "pets": 1},
+    }
 
-recommendation = generate_restaurant_recommendations(keywords)
-print("\n=== 추천 맛집 ===")
-print(recommendation)
+    recommendation = generate_restaurant_recommendations(keywords)
+    print("\n=== 추천 맛집 ===")
+    print(recommendation)
@@ -1,19 +1,74 @@
-import traceback
+import logging
 import os
-import requests
+import http_client
+import telemetry
+import time
 import json
-from crewai import Agent, Task, Crew, LLM
+import copy
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import quote
 from datetime import datetime
 from dotenv import load_dotenv
-from crewai.tools import BaseTool
 from pydantic import BaseModel
-from typing import List, Dict, Type
+from typing import Iterator, List, Dict, Literal, Optional, Tuple
+from persistent_cache import PersistentTTLCache, normalize_location
+from candidate_retrieval import (
+    NAVER_SEARCH_SORTS,
+    RETRIEVAL_SOURCES,
+    fan_out,
+    fuse_candidates,
+    has_rating,
+    naver_configured,
+    naver_local_candidates,
+    normalize_serpapi,
+    normalize_store,
+)
+from crawl_sink import read_jsonl
+from itinerary_scheduler import build_itinerary, trip_days
+from itinerary_stream import IncrementalSpotParser, validate_spot
+from llm_cache import cached_llm_call, is_valid_response, llm_cache_key, llm_response_cache
+from prompt_compaction import (
+    compact_candidates,
+    compact_dumps,
+    estimate_tokens,
+    popularity_score,
+    rehydrate,
+)
+from restaurant_filter import CandidateTable, FilterCriteria
+from restaurant_store import RestaurantStore, qualified_place_id
+from single_flight import FlightAbandoned, SingleFlight, once
 
 # 환경 변수 로드
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 GOOGLE_MAP_API_KEY = os.getenv("GOOGLE_MAP_API_KEY")
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", ".cache/geocode.sqlite3")
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", 60 * 60 * 24 * 30))
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 10_000))
+SEARCH_PAGE_COUNT = int(os.getenv("SEARCH_PAGE_COUNT", 2))
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", 10))
+RESTAURANT_STORE_PATH = os.getenv("RESTAURANT_STORE_PATH", ".cache/restaurants.sqlite3")
+LOCAL_SEARCH_RADIUS_KM = float(os.getenv("LOCAL_SEARCH_RADIUS_KM", 3))
+LOCAL_SEARCH_MAX_AGE = float(os.getenv("LOCAL_SEARCH_MAX_AGE", 60 * 60 * 24 * 7))
+CRAWL_IMPORT_PATH = os.getenv("CRAWL_IMPORT_PATH", ".cache/crawl/places.jsonl")
+# 크롤링 결과를 불러올 때 좌표 없는 주소를 동시에 지오코딩할 워커 수 / 한 번에 조회할 최대 주소 수
+# (남은 주소는 다음 시작 때 조회, 이미 조회한 주소는 geocode_cache 에서 바로 응답)
+CRAWL_IMPORT_GEOCODE_WORKERS = int(os.getenv("CRAWL_IMPORT_GEOCODE_WORKERS", 8))
+CRAWL_IMPORT_GEOCODE_LIMIT = int(os.getenv("CRAWL_IMPORT_GEOCODE_LIMIT", 200))
+# "agent": 모든 단계를 CrewAI 에이전트로 실행, "fast": 최종 추천 단계만 LLM 사용
+# "schedule": 일정 배정까지 규칙 기반으로 처리 (LLM 은 설명 생성에만 선택적으로 사용)
+RecommendationMode = Literal["agent", "fast", "schedule"]
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "agent")
+SCHEDULE_LLM_DESCRIPTIONS = os.getenv("SCHEDULE_LLM_DESCRIPTIONS", "0") == "1"
+# 동일한 여행 계획의 결과를 재사용하는 시간 (초)
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", 60))
+# CrewAI 에이전트 실행 로그 출력 (콘솔 출력 자체가 처리량을 떨어뜨리므로 기본은 끔)
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "0") == "1"
+
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------------------------------------------
@@ -34,145 +89,293 @@ class RestaurantSearchArgs(BaseModel):
 
 # -------------------------------------------------------------------
 # 2. 좌표 조회 툴 (Geocoding API 활용)
-class GeocodingTool(BaseTool):
+# 같은 지명이 반복 조회되므로 정규화된 지명을 키로 좌표를 캐싱 (메모리 LRU + SQLite)
+geocode_cache = PersistentTTLCache(
+    path=GEOCODE_CACHE_PATH,
+    table="geocode",
+    ttl_seconds=GEOCODE_CACHE_TTL,
+    max_memory_items=1024,
+    max_disk_items=GEOCODE_CACHE_SIZE,
+)
+
+
+# (툴 로직은 CrewAI 없이 실행할 수 있는 일반 클래스, 에이전트용 래퍼는 crew_agents.py)
+class GeocodingTool:
     name: str = "GeocodingTool"
     description: str = (
         "Google Geocoding API를 사용하여 주어진 위치의 위도와 경도를 반환합니다."
     )
 
     def _run(self, location: str) -> str:
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {"address": location, "key": GOOGLE_MAP_API_KEY}
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("results"):
-                loc = data["results"][0]["geometry"]["location"]
-                return f"{loc['lat']},{loc['lng']}"
-            else:
-                return ""
-        except Exception as e:
-            return f"[GeocodingTool] Error: {str(e)}"
+        with telemetry.span("geocode", cache_hit=False) as span:
+            cache_key = normalize_location(location)
+            cached = geocode_cache.get(cache_key)
+            if cached is not None:
+                span.set(cache_hit=True)
+                return cached
+
+            url = "https://maps.googleapis.com/maps/api/geocode/json"
+            params = {"address": location, "key": GOOGLE_MAP_API_KEY}
+            try:
+                response = http_client.get(url, params=params)
+                response.raise_for_status()
+                data = response.json()
+                if data.get("results"):
+                    loc = data["results"][0]["geometry"]["location"]
+                    coordinates = f"{loc['lat']},{loc['lng']}"
+                    geocode_cache.set(cache_key, coordinates)
+                    return coordinates
+                else:
+                    return ""
+            except Exception as e:
+                span.fail(e)
+                return f"[GeocodingTool] Error: {str(e)}"
 
 
-# 좌표 조회 에이전트 생성
-geocoding_agent = Agent(
-    role="좌표 조회 전문가",
-    goal="사용자 입력 위치의 위도와 경도를 정확히 조회한다.",
-    backstory="나는 위치 데이터 전문가이며, 구글 Geocoding API를 활용해 정확한 좌표를 제공할 수 있다.",
-    tools=[GeocodingTool()],
-    llm=LLM(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY),
-    verbose=True,
-)
+geocoding_tool = GeocodingTool()
+
+
+def geocode_address(address: str) -> Optional[Tuple[float, float]]:
+    # GeocodingTool 결과("위도,경도")를 숫자로 변환 (실패/결과 없음이면 None)
+    if not GOOGLE_MAP_API_KEY:
+        return None
+    try:
+        latitude, longitude = (float(v) for v in geocoding_tool._run(address).split(","))
+    except ValueError:
+        return None
+    return latitude, longitude
+
+
+def geocode_addresses(addresses: List[str]) -> Dict[str, Tuple[float, float]]:
+    """
+    주소 리스트를 워커 풀에서 한 번에 지오코딩 (캐시에 없는 주소는 최대 CRAWL_IMPORT_GEOCODE_LIMIT 개)
+    """
+    if not GOOGLE_MAP_API_KEY or not addresses:
+        return {}
+    cached, uncached = [], []
+    for address in addresses:
+        is_cached = geocode_cache.get(normalize_location(address)) is not None
+        (cached if is_cached else uncached).append(address)
+    if len(uncached) > CRAWL_IMPORT_GEOCODE_LIMIT:
+        logger.info(
+            "[GeocodingTool] Deferring %s addresses to the next import",
+            len(uncached) - CRAWL_IMPORT_GEOCODE_LIMIT,
+        )
+    batch = cached + uncached[:CRAWL_IMPORT_GEOCODE_LIMIT]
+    with ThreadPoolExecutor(max_workers=CRAWL_IMPORT_GEOCODE_WORKERS) as executor:
+        positions = executor.map(geocode_address, batch)
+        return {a: p for a, p in zip(batch, positions) if p is not None}
 
 
 # -------------------------------------------------------------------
 # 3. 맛집 후보 조회 툴 (serpAPI 기반)
-class RestaurantSearchTool(BaseTool):
+# 조회 결과를 로컬 저장소에 쌓아두고, 같은 지역을 다시 조회하면 저장소에서 바로 응답
+# (저장 내용을 메모리 격자 인덱스로 읽어들이므로 처음 사용할 때 생성)
+@once
+def get_restaurant_store() -> RestaurantStore:
+    store = RestaurantStore(RESTAURANT_STORE_PATH)
+    # 크롤러 결과(JSONL)가 있으면 저장소에 반영해서 로컬 후보로 사용
+    # (좌표가 없는 레코드의 주소는 한 번에 모아 지오코딩, 결과는 geocode_cache 에 저장됨)
+    if CRAWL_IMPORT_PATH and os.path.exists(CRAWL_IMPORT_PATH):
+        count = store.load_crawled_records(read_jsonl(CRAWL_IMPORT_PATH), geocode_addresses)
+        logger.info("[RestaurantStore] Imported %s crawled records", count)
+    return store
+
+
+class RestaurantSearchTool:
     name: str = "RestaurantSearchTool"
     description: str = (
-        "주어진 좌표 정보를 바탕으로 serpAPI의 구글맵 API를 호출해 맛집 후보 리스트를 최대 40개(20개씩 2회) 조회합니다."
+        "주어진 좌표 정보를 바탕으로 serpAPI 구글맵, 네이버 지역 검색, 로컬 맛집 저장소를 동시에 조회해 중복을 합친 맛집 후보 리스트를 반환합니다."
     )
-    # 수정: TravelPlan 대신 RestaurantSearchArgs 사용
-    args_schema: Type[BaseModel] = RestaurantSearchArgs
 
-    def __init__(self, serpapi_key: str, google_maps_api_key: str):
-        super().__init__()
+    def __init__(
+        self,
+        serpapi_key: str,
+        google_maps_api_key: str,
+        page_count: int = SEARCH_PAGE_COUNT,
+        page_size: int = 20,
+        deadline: float = SEARCH_DEADLINE_SECONDS,
+    ):
         self._serpapi_key = serpapi_key
         self._google_maps_api_key = google_maps_api_key
+        self._page_count = page_count
+        self._page_size = page_size
+        self._deadline = deadline
 
-    def _run(self, location: str, coordinates: str) -> List[Dict]:
+    def _fetch_page(self, location: str, coordinates: str, start: int) -> List[Dict]:
         url = "https://serpapi.com/search"
-        all_candidates = []
-        for start in [0, 20]:
-            params = {
-                "engine": "google_maps",
-                "q": f"{location} 맛집",
-                "ll": f"@{coordinates},14z",
-                "hl": "ko",
-                "gl": "kr",
-                "api_key": self._serpapi_key,
-                "start": start,
-            }
-            try:
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                candidates = data.get("local_results", [])
-                all_candidates.extend(candidates)
-            except Exception as e:
-                print(f"[RestaurantSearchTool] Error at start={start}: {e}")
-        return all_candidates
-
-
-# 맛집 후보 조회 에이전트 생성
-restaurant_search_agent = Agent(
-    role="맛집 조회 전문가",
-    goal="좌표 정보를 활용하여 맛집 후보 리스트(최대 40개)를 조회한다.",
-    backstory="나는 맛집 검색 전문가이며, serpAPI를 통해 후보 리스트를 제공할 수 있다.",
-    tools=[RestaurantSearchTool(SERPAPI_API_KEY, GOOGLE_MAP_API_KEY)],
-    llm=LLM(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY),
-    verbose=True,
-)
+        params = {
+            "engine": "google_maps",
+            "q": f"{location} 맛집",
+            "ll": f"@{coordinates},14z",
+            "hl": "ko",
+            "gl": "kr",
+            "api_key": self._serpapi_key,
+            "start": start,
+        }
+        with telemetry.span("search_page", start=start) as span:
+            response = http_client.get(url, params=params, timeout=self._deadline)
+            response.raise_for_status()
+            data = response.json()
+            results = data.get("local_results", [])
+            span.set(candidates=len(results))
+            return [normalize_serpapi(item) for item in results]
+
+    def _search_local(self, coordinates: str) -> List[Dict]:
+        try:
+            latitude, longitude = (float(v) for v in coordinates.split(","))
+        except ValueError:
+            return []
+        nearby = get_restaurant_store().within_radius(
+            latitude, longitude, LOCAL_SEARCH_RADIUS_KM, LOCAL_SEARCH_MAX_AGE
+        )
+        return [record for _, record in nearby]
+
+    def _run(self, location: str, coordinates: str) -> List[Dict]:
+        with telemetry.span("search", cache_hit=False) as span:
+            candidates = self._search(location, coordinates, span)
+            span.set(candidates=len(candidates))
+            return candidates
+
+    def _search(self, location: str, coordinates: str, span) -> List[Dict]:
+        # 로컬 저장소에 평점/리뷰 수가 있는 후보가 충분하면 외부 API 호출 없이 반환
+        # (네이버 전용 후보처럼 평점이 없는 레코드는 필터에서 모두 빠지므로 세지 않음)
+        limit = self._page_count * self._page_size
+        local_candidates = []
+        if "store" in RETRIEVAL_SOURCES:
+            local_candidates = [normalize_store(r) for r in self._search_local(coordinates)]
+            rated = [c for c in local_candidates if has_rating(c)]
+            if len(rated) >= limit:
+                span.set(cache_hit=True)
+                return rated[:limit]
+
+        # 설정된 외부 출처(serpAPI 페이지, 네이버 정렬별 검색)를 동시에 요청하고,
+        # 마감 시간까지 응답한 출처만 사용
+        tasks = []
+        if "serpapi" in RETRIEVAL_SOURCES and self._serpapi_key:
+            for page in range(self._page_count):
+                start = page * self._page_size
+                tasks.append(("serpapi", partial(self._fetch_page, location, coordinates, start)))
+        if "naver" in RETRIEVAL_SOURCES and naver_configured():
+            for sort in NAVER_SEARCH_SORTS:
+                tasks.append(("naver", partial(naver_local_candidates, f"{location} 맛집", sort)))
+        results = fan_out(tasks, self._deadline)
+
+        # 출처 간 같은 식당은 하나로 합치고 (serpAPI > 로컬 저장소 > 네이버 순으로 필드 선택),
+        # 새로 받은 후보는 저장소에 반영
+        fused = fuse_candidates({**results, "store": local_candidates})
+        get_restaurant_store().upsert_many(c for c in fused if c["sources"] != ["store"])
+        return fused
+
+
+restaurant_search_tool = RestaurantSearchTool(SERPAPI_API_KEY, GOOGLE_MAP_API_KEY)
 
 
 # -------------------------------------------------------------------
 # 4. 맛집 후보 필터링 툴
-class RestaurantFilterTool(BaseTool):
+def map_url(candidate: Dict) -> str:
+    # 장소 ID 출처에 맞는 지도 링크 (크롤링 출처는 "naver:" 접두어의 네이버 플레이스 ID),
+    # 장소 ID 가 없는 후보(네이버 지역 검색 출처)는 네이버 지도 검색 링크 사용
+    place_id = qualified_place_id(candidate.get("place_id"))
+    if place_id and place_id.startswith("naver:"):
+        return f"https://map.naver.com/p/entry/place/{place_id[len('naver:'):]}"
+    if place_id:
+        return f"https://www.google.com/maps/place/?q=place_id:{candidate['place_id']}"
+    query = quote(f"{candidate.get('title', '')} {candidate.get('address', '')}".strip())
+    return f"https://map.naver.com/p/search/{query}"
+
+
+class RestaurantFilterTool:
     name: str = "RestaurantFilterTool"
     description: str = (
         "조회된 맛집 후보 리스트 중 평점 4점 이상, 리뷰 수 500개 이상인 식당만 필터링합니다."
     )
 
+    def __init__(self, criteria: FilterCriteria = None):
+        self.criteria = criteria or FilterCriteria()
+
     def _run(self, candidates: List[Dict]) -> List[Dict]:
+        with telemetry.span("filter", input_candidates=len(candidates)) as span:
+            filtered = self._filter(candidates)
+            span.set(candidates=len(filtered))
+            return filtered
+
+    def _filter(self, candidates: List[Dict]) -> List[Dict]:
+        # 평점/리뷰 수 파싱, 조건 필터링, 중복 제거를 컬럼 단위로 한 번에 처리
+        table = CandidateTable(candidates)
         filtered = []
-        seen = set()
-        for result in candidates:
-            try:
-                rating = float(result.get("rating", 0))
-                reviews = int(result.get("reviews", 0))
-            except Exception:
-                continue
-            unique_key = f"{result.get('title', '')}_{result.get('address', '')}"
-            if rating >= 4.0 and reviews >= 500 and unique_key not in seen:
-                restaurant = {
-                    "kor_name": result.get("title", ""),
-                    "eng_name": result.get("title", "")
-                    .encode("ascii", "ignore")
-                    .decode(),
-                    "description": "",
-                    "address": result.get("address", ""),
-                    "zip": "",
-                    "url": result.get("website", ""),
-                    "image_url": result.get("thumbnail", ""),
-                    "map_url": f"https://www.google.com/maps/place/?q=place_id:{result.get('place_id')}",
-                    "likes": reviews,
-                    "satisfaction": rating,
-                    "spot_category": 1,
-                    "phone_number": result.get("phone", ""),
-                    "business_status": True,
-                    "business_hours": result.get("hours", ""),
-                }
-                filtered.append(restaurant)
-                seen.add(unique_key)
+        for i in table.select(self.criteria):
+            result = table.rows[i]
+            rating = float(table.rating[i])
+            reviews = int(table.reviews[i])
+            restaurant = {
+                "kor_name": result.get("title", ""),
+                "eng_name": result.get("title", "")
+                .encode("ascii", "ignore")
+                .decode(),
+                "description": "",
+                "address": result.get("address", ""),
+                "zip": "",
+                "url": result.get("website", ""),
+                "image_url": result.get("thumbnail", ""),
+                "map_url": map_url(result),
+                "likes": reviews,
+                "satisfaction": rating,
+                "spot_category": 1,
+                "phone_number": result.get("phone", ""),
+                "business_status": True,
+                "business_hours": result.get("hours", ""),
+                "type": result.get("type", ""),
+                "latitude": None if np.isnan(table.latitude[i]) else float(table.latitude[i]),
+                "longitude": None if np.isnan(table.longitude[i]) else float(table.longitude[i]),
+            }
+            filtered.append(restaurant)
         return filtered
 
 
-# 맛집 필터링 에이전트 생성
-restaurant_filter_agent = Agent(
-    role="맛집 필터링 전문가",
-    goal="맛집 후보 리스트 중 조건에 맞는 식당만을 선별한다.",
-    backstory="나는 데이터 필터링 전문가로, 후보 리스트에서 평점과 리뷰 수 기준으로 유효한 식당을 선별할 수 있다.",
-    tools=[RestaurantFilterTool()],
-    llm=LLM(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY),
-    verbose=True,
-)
+restaurant_filter_tool = RestaurantFilterTool()
 
 
 # -------------------------------------------------------------------
 # 5. 최종 추천 생성 툴 (엄격한 JSON 형식 프롬프트 적용)
-class FinalRecommendationTool(BaseTool):
+FINAL_RECOMMENDATION_MODEL = "gpt-4o-mini"
+# 프롬프트 내용을 바꾸면 버전을 올려서 이전 LLM 응답 캐시를 무효화
+FINAL_PROMPT_VERSION = "2"
+
+# 빠른 파이프라인용 압축 프롬프트: 후보는 짧은 ID 와 필요한 필드만 보내고, 응답의 ID 로 원본 필드를 채움
+COMPACT_FINAL_PROMPT = """당신은 여행객들을 위한 맛집 추천 전문가이자, JSON 생성기입니다.
+오직 아래 형식의 JSON 하나만 출력하세요 (JSON 전후로 추가 문구 금지).
+
+{{"Spots": [{{"id": "r1", "description": "string", "day_x": 1, "order": 1, "spot_time": "2025-02-01T09:00:00"}}]}}
+
+- 여행 기간의 하루마다 3곳씩(아침, 점심, 저녁) 선정하세요.
+- id 는 반드시 아래 후보 리스트의 id 중에서만 고르고, 같은 id 를 두 번 쓰지 마세요.
+- day_x 는 1일차부터 시작, order 는 1, 2, 3
+- spot_time: ISO 8601 형식 "YYYY-MM-DDTHH:mm:ss"
+- 후보가 부족하면 남은 칸은 id 를 "none" 으로 하고 description 에 "적합한 후보가 부족합니다" 라고 쓰세요.
+
+여행 계획:
+- main_location: {main_location}
+- start_date: {start_date}
+- end_date: {end_date}
+- companion_count: {companion_count}
+- concepts: {concepts}
+
+맛집 후보 리스트 (name, rating, reviews, address, hours):
+{candidates}
+"""
+
+# LLM 에 보낼 후보 필드 (URL/이미지/지도 링크 등은 제외)
+COMPACT_CANDIDATE_FIELDS = {
+    "name": lambda r: r.get("kor_name"),
+    "rating": lambda r: r.get("satisfaction"),
+    "reviews": lambda r: r.get("likes"),
+    "address": lambda r: r.get("address"),
+    "hours": lambda r: r.get("business_hours"),
+}
+
+
+class FinalRecommendationTool:
     name: str = "FinalRecommendationTool"
     description: str = (
         "필터링된 맛집 리스트를 기반으로 최종 추천 맛집 리스트를 엄격한 JSON 형식으로 생성합니다."
@@ -234,99 +437,398 @@ class FinalRecommendationTool(BaseTool):
         return prompt.strip()
 
 
-# 최종 추천 생성 에이전트 생성
-final_recommendation_agent = Agent(
-    role="최종 추천 에이전트",
-    goal="필터링된 맛집 후보 리스트를 바탕으로 최종 추천 맛집 리스트를 엄격한 JSON 형식으로 생성한다.",
-    backstory="나는 여행객들을 위한 맛집 추천 전문가이자 JSON 생성기입니다. 오직 JSON 형식만 출력해야 합니다.",
-    tools=[FinalRecommendationTool()],
-    llm=LLM(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY),
-    verbose=True,
-)
+final_recommendation_tool = FinalRecommendationTool()
+
+
+@once
+def get_final_recommendation_llm():
+    # 최종 추천 LLM 클라이언트는 처음 사용할 때 한 번만 생성 (CrewAI 도 이때 import)
+    from crewai import LLM
+
+    return LLM(model=FINAL_RECOMMENDATION_MODEL, temperature=0, api_key=OPENAI_API_KEY)
+
+
+# -------------------------------------------------------------------
+# 6. 빠른 파이프라인 (좌표 조회/맛집 조회/필터링은 툴을 직접 호출하고, 최종 추천만 LLM 사용)
+def parse_spots(text: str) -> List[Dict]:
+    """
+    LLM 응답에서 JSON을 추출해 Spots 리스트를 반환
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[len("json") :]
+    data = json.loads(text)
+    if isinstance(data, dict):
+        return data.get("Spots", [])
+    return data if isinstance(data, list) else []
+
+
+def require_spots(text: str) -> List[Dict]:
+    """
+    parse_spots + 검증을 통과한 일정이 하나도 없으면 ValueError (LLM 응답 캐시 저장 조건)
+    """
+    spots = parse_spots(text)
+    if not any(validate_spot(spot) is not None for spot in spots):
+        raise ValueError("응답에 유효한 Spots 가 없습니다.")
+    return spots
+
+
+def fetch_filtered_candidates(travel_plan: TravelPlan) -> List[Dict]:
+    """
+    좌표 조회 -> 맛집 조회 -> 필터링
+    """
+    location = travel_plan.main_location
+
+    coordinates = geocoding_tool._run(location)
+    if not coordinates or coordinates.startswith("[GeocodingTool] Error"):
+        raise ValueError(f"'{location}'의 좌표를 조회할 수 없습니다. {coordinates}")
+
+    candidates = restaurant_search_tool._run(location, coordinates)
+    return restaurant_filter_tool._run(candidates)
+
+
+def prepare_final_prompt(travel_plan: TravelPlan, filtered: List[Dict] = None):
+    """
+    후보 조회/필터링 후 압축해서 (프롬프트, ID 매핑, 캐시 키) 반환
+    (filtered 가 주어지면 조회/필터링을 건너뛰고 그 후보를 사용)
+    """
+    if filtered is None:
+        filtered = fetch_filtered_candidates(travel_plan)
+
+    # 필요한 필드만 남긴 상위 후보를 토큰 예산 안에서 선택
+    with telemetry.span("compact_prompt", input_candidates=len(filtered)) as span:
+        compact, id_map = compact_candidates(
+            filtered, COMPACT_CANDIDATE_FIELDS, score=popularity_score
+        )
+        span.set(candidates=len(compact))
+
+    # 후보와 여행 계획이 같으면 이전 LLM 응답을 재사용
+    cache_key = llm_cache_key(
+        FINAL_RECOMMENDATION_MODEL,
+        FINAL_PROMPT_VERSION,
+        [r["map_url"] for r in id_map.values()],
+        travel_plan.model_dump(),
+    )
+    prompt = COMPACT_FINAL_PROMPT.format(
+        main_location=travel_plan.main_location,
+        start_date=travel_plan.start_date,
+        end_date=travel_plan.end_date,
+        companion_count=travel_plan.companion_count,
+        concepts=", ".join(travel_plan.concepts),
+        candidates="\n".join(compact_dumps(row) for row in compact),
+    )
+    return prompt, id_map, cache_key
+
+
+def run_fast_pipeline(travel_plan: TravelPlan, filtered: List[Dict] = None) -> List[Dict]:
+    prompt, id_map, cache_key = prepare_final_prompt(travel_plan, filtered)
+    response = cached_llm_call(
+        cache_key,
+        lambda: get_final_recommendation_llm().call([{"role": "user", "content": prompt}]),
+        prompt,
+        validate=require_spots,
+    )
+    with telemetry.span("validate_spots") as span:
+        spots = parse_spots(response)
+        span.set(
+            candidates=len(spots),
+            invalid=sum(1 for spot in spots if validate_spot(spot) is None),
+        )
+        return rehydrate(spots, id_map, dict)
 
 
 # -------------------------------------------------------------------
-# 6. 전체 Crew 구성 및 실행 함수
-def create_recommendation(input_data: dict) -> dict:
+# 7. 규칙 기반 일정 파이프라인 (슬롯 배정은 스케줄러, LLM 은 설명 생성에만 선택적으로 사용)
+DESCRIPTION_PROMPT = """아래 식당들을 여행객에게 소개하는 한 문장 설명을 한국어로 작성하세요.
+오직 {{"id": "설명"}} 형태의 JSON 객체 하나만 출력하세요.
+
+여행 계획: {main_location}, 동행 {companion_count}명, 컨셉 {concepts}
+
+식당 리스트 (id, name, type):
+{candidates}
+"""
+
+
+def parse_descriptions(text: str) -> Dict[str, str]:
+    """
+    {"id": "설명"} 형태의 JSON 객체만 허용 (리스트/문자열 등은 ValueError)
+    """
+    text = text.strip().strip("`")
+    data = json.loads(text[len("json") :] if text.startswith("json") else text)
+    if not isinstance(data, dict):
+        raise ValueError(f"설명 응답이 JSON 객체가 아닙니다: {type(data).__name__}")
+    return data
+
+
+def describe_spots(spots: List[Dict], travel_plan: TravelPlan) -> List[Dict]:
+    named = [spot for spot in spots if spot.get("kor_name")]
+    compact, id_map = compact_candidates(
+        named,
+        {"name": lambda r: r.get("kor_name"), "type": lambda r: r.get("type")},
+        top_k=len(named),
+    )
+    prompt = DESCRIPTION_PROMPT.format(
+        main_location=travel_plan.main_location,
+        companion_count=travel_plan.companion_count,
+        concepts=", ".join(travel_plan.concepts),
+        candidates="\n".join(compact_dumps(row) for row in compact),
+    )
+    cache_key = llm_cache_key(
+        FINAL_RECOMMENDATION_MODEL,
+        f"description-{FINAL_PROMPT_VERSION}",
+        [r["map_url"] for r in id_map.values()],
+        travel_plan.model_dump(),
+    )
+    try:
+        response = cached_llm_call(
+            cache_key,
+            lambda: get_final_recommendation_llm().call([{"role": "user", "content": prompt}]),
+            prompt,
+            validate=parse_descriptions,
+        )
+        descriptions = parse_descriptions(response)
+    except Exception as e:
+        # 설명은 부가 정보이므로 실패해도 일정은 그대로 반환
+        logger.warning("[describe_spots] Error: %s", e)
+        return spots
+    for short_id, spot in id_map.items():
+        description = descriptions.get(short_id)
+        if isinstance(description, str):
+            spot["description"] = description
+    return spots
+
+
+def run_schedule_pipeline(travel_plan: TravelPlan, filtered: List[Dict] = None) -> List[Dict]:
+    if filtered is None:
+        filtered = fetch_filtered_candidates(travel_plan)
+    days = trip_days(travel_plan.start_date, travel_plan.end_date)
+    with telemetry.span("schedule", input_candidates=len(filtered)) as span:
+        spots = build_itinerary(days, filtered, score=popularity_score)
+        span.set(candidates=len(spots))
+    if SCHEDULE_LLM_DESCRIPTIONS:
+        spots = describe_spots(spots, travel_plan)
+    return spots
+
+
+# -------------------------------------------------------------------
+# 8. 전체 Crew 실행 함수 (에이전트 구성은 crew_agents.py, 처음 사용할 때 import)
+def run_agent_pipeline(travel_plan: TravelPlan):
+    from crew_agents import run_crew
+
+    return run_crew(travel_plan)
+
+
+# 동일한 여행 계획으로 동시에 들어온 요청은 한 번만 계산하고 결과를 공유
+recommendation_flight = SingleFlight(result_ttl=RECOMMENDATION_CACHE_TTL)
+
+# 캐시/단일 실행 상태는 /metrics 수집 시점에 읽어서 게이지로 노출
+telemetry.metrics.gauge(
+    "foodrec_cache_hit_ratio",
+    "캐시 적중률 (프로세스 시작 이후)",
+    lambda: [
+        ({"cache": "geocode"}, geocode_cache.stats()["hit_rate"]),
+        ({"cache": "llm"}, llm_response_cache.stats()["hit_rate"]),
+    ],
+)
+telemetry.metrics.gauge(
+    "foodrec_single_flight_requests",
+    "동일 여행 계획 요청 처리 현황 (hits, shared, misses, in_flight)",
+    lambda: [({"result": k}, v) for k, v in recommendation_flight.stats().items()],
+)
+
+
+def plan_key(travel_plan: TravelPlan, mode: str) -> tuple:
+    return (
+        mode,
+        normalize_location(travel_plan.main_location),
+        travel_plan.start_date,
+        travel_plan.end_date,
+        travel_plan.companion_count,
+        tuple(sorted(normalize_location(c) for c in travel_plan.concepts)),
+    )
+
+
+def run_pipeline(travel_plan: TravelPlan, mode: str, filtered: List[Dict] = None):
+    # filtered: 미리 조회/필터링된 후보 (agent 모드는 Crew 가 직접 조회하므로 사용하지 않음)
+    if mode == "fast":
+        return run_fast_pipeline(travel_plan, filtered)
+    if mode == "schedule":
+        return run_schedule_pipeline(travel_plan, filtered)
+    return run_agent_pipeline(travel_plan)
+
+
+def build_plan(input_data: dict, travel_plan: TravelPlan) -> dict:
+    return {
+        "name": input_data.get("name", "여행 일정"),
+        "start_date": input_data["start_date"],
+        "end_date": input_data["end_date"],
+        "main_location": travel_plan.main_location,
+        "companion_count": travel_plan.companion_count,
+        "concepts": ", ".join(travel_plan.concepts),
+        "created_at": datetime.now().strftime("%Y-%m-%d"),
+        "updated_at": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+
+def success_response(input_data: dict, travel_plan: TravelPlan, result_json) -> dict:
+    return {
+        "message": "요청이 성공적으로 처리되었습니다.",
+        "plan": build_plan(input_data, travel_plan),
+        "spots": result_json if isinstance(result_json, list) else [],
+    }
+
+
+def error_response(e: Exception) -> dict:
+    return {"message": "요청 처리 중 오류가 발생했습니다.", "error": str(e)}
+
+
+def create_recommendation(input_data: dict, mode: str = None) -> dict:
     try:
         # 사용자 여행 데이터 처리
         travel_plan = TravelPlan(**input_data)
-        location = travel_plan.main_location
 
-        # 태스크 1: 좌표 조회
-        geocoding_task = Task(
-            description=f"[좌표 조회]\n'{location}'의 위도와 경도를 조회합니다.",
-            agent=geocoding_agent,
-            expected_output="위도,경도 형식의 문자열",
-        )
+        mode = mode or RECOMMENDATION_MODE
+        with telemetry.span("recommendation", mode=mode):
+            result_json = recommendation_flight.do(
+                plan_key(travel_plan, mode), run_pipeline, travel_plan, mode
+            )
 
-        # 태스크 2: 맛집 후보 조회 (좌표 필요)
-        restaurant_search_task = Task(
-            description=f"[맛집 조회]\n'{location}'의 맛집 후보 리스트를 조회합니다.",
-            agent=restaurant_search_agent,
-            context=[geocoding_task],
-            expected_output="맛집 후보 리스트 (원시 데이터)",
-        )
+        return success_response(input_data, travel_plan, result_json)
+    except Exception as e:
+        logger.exception("[create_recommendation] %s", e)
+        return error_response(e)
 
-        # 태스크 3: 맛집 후보 필터링
-        restaurant_filter_task = Task(
-            description="[맛집 필터링]\n조회된 맛집 후보 리스트 중 평점 4점 이상, 리뷰 500개 이상인 식당만 선별합니다.",
-            agent=restaurant_filter_agent,
-            context=[restaurant_search_task],
-            expected_output="필터링된 맛집 리스트 (리스트 형식)",
-        )
 
-        # 태스크 4: 최종 추천 생성 (엄격한 JSON 형식)
-        final_recommendation_task = Task(
-            description="[최종 추천 생성]\n필터링된 맛집 리스트를 참고하여, 지정된 프롬프트에 따라 최종 추천 맛집 리스트를 JSON 형식으로 출력합니다.",
-            agent=final_recommendation_agent,
-            context=[restaurant_filter_task],
-            expected_output="엄격한 JSON 형식의 추천 맛집 리스트",
-        )
+# -------------------------------------------------------------------
+# 9. 스트리밍 추천 (LLM 토큰을 받는 대로 Spots 를 파싱해서 완성된 일정부터 전달)
+def stream_llm_tokens(prompt: str) -> Iterator[str]:
+    import litellm
+
+    response = litellm.completion(
+        model=FINAL_RECOMMENDATION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,
+        api_key=OPENAI_API_KEY,
+        stream=True,
+    )
+    try:
+        for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        # 끝까지 읽지 않고 닫히면 (클라이언트 연결 끊김) HTTP 스트림도 바로 닫음
+        close = getattr(response, "close", None)
+        if close is not None:
+            close()
+
+
+def stream_spots(travel_plan: TravelPlan) -> Iterator[Dict]:
+    """
+    LLM 토큰을 받는 대로 파싱해서 검증된 일정(후보 정보로 복원)을 하나씩 반환
+    """
+    prompt, id_map, cache_key = prepare_final_prompt(travel_plan)
+    cached = llm_response_cache.get(cache_key)
+    if cached is not None and not is_valid_response(cached, require_spots):
+        cached = None
+    tokens = [cached] if cached is not None else stream_llm_tokens(prompt)
+
+    # 제너레이터는 여러 스레드에서 이어서 소비되므로 with span 대신 구간을 직접 기록
+    started = time.perf_counter()
+    first_spot = None
+    parser = IncrementalSpotParser()
+    count = 0
+    invalid = 0
+    try:
+        for token in tokens:
+            for item in parser.feed(token):
+                if validate_spot(item) is None:
+                    logger.warning("[stream_recommendation] Invalid spot skipped: %s", item)
+                    invalid += 1
+                    continue
+                count += 1
+                if first_spot is None:
+                    first_spot = time.perf_counter() - started
+                yield rehydrate([item], id_map, dict)[0]
+    finally:
+        # 클라이언트 연결이 끊겨 제너레이터가 닫히면 LLM 스트림도 함께 닫음
+        if hasattr(tokens, "close"):
+            tokens.close()
+
+    telemetry.record_span(
+        "llm_stream",
+        started,
+        cache_hit=cached is not None,
+        prompt_tokens=0 if cached is not None else estimate_tokens(prompt),
+        completion_tokens=0 if cached is not None else estimate_tokens(parser.text),
+        first_spot_seconds=first_spot or 0.0,
+        candidates=count,
+        invalid=invalid,
+    )
+    # 스트림이 중간에 끊기면 일부 일정만 받았어도 캐시하지 않음 (전체 응답이 파싱될 때만 저장)
+    if cached is None and is_valid_response(parser.text, require_spots):
+        llm_response_cache.set(cache_key, parser.text)
 
-        # Crew 구성: 모든 태스크 등록
-        crew = Crew(
-            agents=[
-                geocoding_agent,
-                restaurant_search_agent,
-                restaurant_filter_agent,
-                final_recommendation_agent,
-            ],
-            tasks=[
-                geocoding_task,
-                restaurant_search_task,
-                restaurant_filter_task,
-                final_recommendation_task,
-            ],
-            verbose=True,
-        )
 
-        final_result = crew.kickoff()
-
-        # 최종 결과가 JSON 형식인지 확인 후 반환 (예: 최종 결과에 Spots 필드가 있으면)
-        if hasattr(final_result, "Spots"):
-            result_json = {"Spots": final_result.Spots}
-        else:
-            result_json = final_result
-
-        return {
-            "message": "요청이 성공적으로 처리되었습니다.",
-            "plan": {
-                "name": input_data.get("name", "여행 일정"),
-                "start_date": input_data["start_date"],
-                "end_date": input_data["end_date"],
-                "main_location": location,
-                "companion_count": travel_plan.companion_count,
-                "concepts": ", ".join(travel_plan.concepts),
-                "created_at": datetime.now().strftime("%Y-%m-%d"),
-                "updated_at": datetime.now().strftime("%Y-%m-%d"),
-            },
-            "spots": result_json if isinstance(result_json, list) else [],
-        }
+def stream_recommendation(input_data: dict) -> Iterator[dict]:
+    """
+    이벤트 스트림: plan -> spot (검증된 일정이 완성될 때마다) -> done, 실패 시 error
+
+    fast 모드와 같은 결과이므로 같은 single-flight 키를 사용: 같은 계획이 이미 계산 중이거나
+    결과가 남아 있으면 그 결과를 전달하고, 직접 스트리밍한 결과는 다음 요청을 위해 공유한다.
+    """
+    try:
+        travel_plan = TravelPlan(**input_data)
+        yield {"event": "plan", "plan": build_plan(input_data, travel_plan)}
+
+        key = plan_key(travel_plan, "fast")
+        while True:
+            leader, future = recommendation_flight.join(key)
+            if leader:
+                break
+            try:
+                spots = recommendation_flight.result(future)
+            except FlightAbandoned:
+                continue
+            for spot in spots:
+                yield {"event": "spot", "spot": spot}
+            yield {"event": "done", "count": len(spots)}
+            return
+
+        spots = []
+        spot_stream = stream_spots(travel_plan)
+        try:
+            for spot in spot_stream:
+                spots.append(spot)
+                yield {"event": "spot", "spot": copy.deepcopy(spot)}
+        except GeneratorExit:
+            # 연결이 끊겨 결과가 완성되지 않음 - 기다리던 요청은 직접 다시 계산
+            recommendation_flight.abandon(key, future)
+            raise
+        except Exception as e:
+            recommendation_flight.fail(key, future, e)
+            raise
+        finally:
+            spot_stream.close()
+        recommendation_flight.finish(key, future, spots)
+        yield {"event": "done", "count": len(spots)}
     except Exception as e:
-        print(f"[ERROR] {e}")
-        traceback.print_exc()
-        return {"message": "요청 처리 중 오류가 발생했습니다.", "error": str(e)}
+        logger.exception("[stream_recommendation] %s", e)
+        yield {"event": "error", "error": str(e)}
+
+
+def warm_up(mode: str = None) -> None:
+    """
+    첫 요청이 느려지지 않도록 저장소/LLM 클라이언트 (agent 모드면 에이전트까지) 를 미리 생성
+    """
+    get_restaurant_store()
+    get_final_recommendation_llm()
+    if (mode or RECOMMENDATION_MODE) == "agent":
+        from crew_agents import get_agents
+
+        get_agents()
 
 
 # -------------------------------------------------------------------
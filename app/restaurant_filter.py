@@ -0,0 +1,111 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from entity_resolution import resolve_entities
+
+EARTH_RADIUS_KM = 6371.0
+CLOSED_MARKERS = ("폐업", "영업 종료", "영업종료", "closed", "휴무")
+NUMBER_PATTERN = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)", re.ASCII)
+
+
+# -------------------------------------------------------------------
+# 필터링 조건 스키마
+class FilterCriteria(BaseModel):
+    min_rating: float = 4.0
+    min_reviews: int = 500
+    categories: Optional[List[str]] = None  # 하나라도 포함되면 통과 (예: ["한식", "일식"])
+    open_now: bool = False  # 영업 종료/폐업 표시가 있는 후보 제외 (정보 없음은 통과)
+    max_distance_km: Optional[float] = None
+    origin: Optional[str] = None  # "위도,경도" (GeocodingTool 결과 형식)
+
+
+def _to_number_array(values: List) -> np.ndarray:
+    """
+    평점/리뷰 수 컬럼을 한 번에 숫자 배열로 변환 (변환 불가 값은 NaN)
+    """
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        cleaned = np.char.strip(np.char.replace(np.asarray(values, dtype=str), ",", ""))
+        # ASCII 숫자만 허용 (np.char.isnumeric 은 "五", "①", "½" 도 숫자로 보지만 float 변환은 실패)
+        return np.array(
+            [float(v) if NUMBER_PATTERN.fullmatch(v) else np.nan for v in cleaned.tolist()],
+            dtype=float,
+        )
+
+
+# -------------------------------------------------------------------
+# 컬럼 단위로 후보를 보관하고 조건을 벡터 연산으로 평가하는 테이블
+class CandidateTable:
+    def __init__(self, candidates: List[Dict]):
+        self.rows = list(candidates)
+
+        self.rating = _to_number_array([r.get("rating", 0) for r in self.rows])
+        self.reviews = _to_number_array([r.get("reviews", 0) for r in self.rows])
+
+        coords = [r.get("gps_coordinates") or {} for r in self.rows]
+        self.latitude = _to_number_array([c.get("latitude", np.nan) for c in coords])
+        self.longitude = _to_number_array([c.get("longitude", np.nan) for c in coords])
+
+        self.category = np.array(
+            [" ".join([r.get("type") or ""] + list(r.get("types") or [])) for r in self.rows],
+            dtype=object,
+        )
+        self.open_state = np.char.lower(
+            np.array([str(r.get("open_state") or "") for r in self.rows], dtype=str)
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def distances_km(self, origin: str) -> np.ndarray:
+        lat, lng = (float(v) for v in origin.split(","))
+        lat1, lng1 = np.radians(lat), np.radians(lng)
+        lat2, lng2 = np.radians(self.latitude), np.radians(self.longitude)
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def mask(self, criteria: FilterCriteria) -> np.ndarray:
+        # 파싱에 실패한 행(NaN)은 비교 결과가 False 이므로 자동으로 제외됨
+        keep = (self.rating >= criteria.min_rating) & (self.reviews >= criteria.min_reviews)
+
+        if criteria.categories:
+            pattern = "|".join(re.escape(c) for c in criteria.categories)
+            matcher = np.vectorize(lambda text: bool(re.search(pattern, text)), otypes=[bool])
+            keep &= matcher(self.category)
+
+        if criteria.open_now:
+            closed = np.zeros(len(self), dtype=bool)
+            for marker in CLOSED_MARKERS:
+                closed |= np.char.find(self.open_state, marker) >= 0
+            keep &= ~closed
+
+        if criteria.max_distance_km is not None and criteria.origin:
+            keep &= self.distances_km(criteria.origin) <= criteria.max_distance_km
+
+        return keep
+
+    def select(self, criteria: FilterCriteria) -> np.ndarray:
+        """
+        조건을 통과한 후보의 인덱스를 원래 순서대로 반환
+        (조건 통과 후보끼리 같은 식당은 처음 나온 것만 남김 - 이름/주소/좌표 기반 엔티티 매칭)
+        """
+        if not len(self):
+            return np.array([], dtype=int)
+        passed = np.flatnonzero(self.mask(criteria))
+        entities = np.asarray(resolve_entities(self.rows[i] for i in passed), dtype=int)
+        _, first_index = np.unique(entities, return_index=True)
+        return passed[np.sort(first_index)]
+
+
+def filter_candidates(
+    candidates: List[Dict], criteria: Optional[FilterCriteria] = None
+) -> List[Dict]:
+    table = CandidateTable(candidates)
+    return [table.rows[i] for i in table.select(criteria or FilterCriteria())]
@@ -0,0 +1,158 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from pydantic import BaseModel
+
+# 예시 맛집 데이터
+RESTAURANTS = [
+    {
+        "name": "해운대 고기집",
+        "type": "한식",
+        "price": "중가",
+        "region": "부산 해운대",
+        "suitable_for": "가족",
+        "capacity": "4-10인",
+        "signature": "삼겹살, 된장찌개",
+        "description": "단체석 있음, 가족 모임에 적합",
+    },
+    {
+        "name": "광안리 초밥집",
+        "type": "일식",
+        "price": "고가",
+        "region": "부산 광안리",
+        "suitable_for": "친구",
+        "capacity": "2-6인",
+        "signature": "모듬초밥, 연어초밥",
+        "description": "오션뷰, 데이트 코스",
+    },
+    {
+        "name": "해운대 디저트 카페",
+        "type": "디저트",
+        "price": "저가",
+        "region": "부산 해운대",
+        "suitable_for": "커플",
+        "capacity": "2-4인",
+        "signature": "티라미수, 망고빙수",
+        "description": "아늑한 분위기, 커플석 있음",
+    },
+]
+
+# 질의어 키워드 -> 색인 값 (음식 종류 / 가격대 / 동행 유형)
+TYPE_KEYWORDS = {
+    "한식": "한식", "고기": "한식", "삼겹살": "한식", "국밥": "한식",
+    "일식": "일식", "초밥": "일식", "스시": "일식", "횟집": "일식",
+    "디저트": "디저트", "카페": "디저트", "빙수": "디저트", "케이크": "디저트",
+}
+PRICE_KEYWORDS = {
+    "저가": "저가", "저렴": "저가", "가성비": "저가",
+    "중가": "중가", "적당": "중가",
+    "고가": "고가", "고급": "고가", "비싼": "고가",
+}
+SUITABLE_KEYWORDS = {
+    "가족": "가족", "아이": "가족", "부모님": "가족",
+    "친구": "친구", "동료": "친구", "단체": "친구",
+    "커플": "커플", "연인": "커플", "데이트": "커플",
+}
+
+DEFAULT_REGION = ["부산", "해운대"]
+MAX_CAPACITY = 30
+
+
+# -------------------------------------------------------------------
+# 질의 파싱 결과
+class ParsedQuery(BaseModel):
+    regions: List[str] = []
+    people_count: Optional[int] = None
+    types: List[str] = []
+    prices: List[str] = []
+    suitable_for: List[str] = []
+
+
+def parse_capacity(capacity: str) -> range:
+    numbers = [int(n) for n in re.findall(r"\d+", capacity)]
+    if not numbers:
+        return range(0)
+    return range(numbers[0], (numbers[-1] if len(numbers) > 1 else numbers[0]) + 1)
+
+
+def _tokenize(query: str) -> List[str]:
+    return [t for t in re.split(r"[\s,./!?~]+", query) if t]
+
+
+def _lookup_prefix(token: str, vocabulary: Dict[str, str]) -> Optional[str]:
+    # 조사가 붙은 토큰(예: "해운대에서")도 찾을 수 있도록 긴 접두어부터 사전 조회
+    for end in range(len(token), 0, -1):
+        value = vocabulary.get(token[:end])
+        if value is not None:
+            return value
+    return None
+
+
+# -------------------------------------------------------------------
+# 지역/종류/가격/동행/수용 인원 역색인
+class RestaurantIndex:
+    def __init__(self, restaurants: List[Dict]):
+        self.restaurants = restaurants
+        self.region: Dict[str, Set[int]] = defaultdict(set)
+        self.type: Dict[str, Set[int]] = defaultdict(set)
+        self.price: Dict[str, Set[int]] = defaultdict(set)
+        self.suitable_for: Dict[str, Set[int]] = defaultdict(set)
+        self.capacity: Dict[int, Set[int]] = defaultdict(set)
+
+        for doc_id, r in enumerate(restaurants):
+            for token in r["region"].split():
+                self.region[token].add(doc_id)
+            self.type[r["type"]].add(doc_id)
+            self.price[r["price"]].add(doc_id)
+            self.suitable_for[r["suitable_for"]].add(doc_id)
+            for count in parse_capacity(r["capacity"]):
+                if count <= MAX_CAPACITY:
+                    self.capacity[count].add(doc_id)
+
+        self.region_vocabulary = {token: token for token in self.region}
+
+    def parse_query(self, query: str) -> ParsedQuery:
+        parsed = ParsedQuery()
+
+        match = re.search(r"(\d+)\s*(?:명|인)", query)
+        if match:
+            parsed.people_count = int(match.group(1))
+
+        for token in _tokenize(query):
+            for vocabulary, target in (
+                (self.region_vocabulary, parsed.regions),
+                (TYPE_KEYWORDS, parsed.types),
+                (PRICE_KEYWORDS, parsed.prices),
+                (SUITABLE_KEYWORDS, parsed.suitable_for),
+            ):
+                value = _lookup_prefix(token, vocabulary)
+                if value is not None and value not in target:
+                    target.append(value)
+        return parsed
+
+    def search(self, parsed: ParsedQuery) -> List[Dict]:
+        """
+        지역 조건을 만족하는 식당을 나머지 조건 일치 점수 순으로 반환
+        """
+        regions = parsed.regions or DEFAULT_REGION
+        postings = [self.region.get(token, set()) for token in regions]
+        matched = set.intersection(*postings) if postings else set()
+
+        scores = dict.fromkeys(matched, 0)
+        for values, index, weight in (
+            (parsed.types, self.type, 2),
+            (parsed.prices, self.price, 1),
+            (parsed.suitable_for, self.suitable_for, 1),
+            ([parsed.people_count] if parsed.people_count else [], self.capacity, 2),
+        ):
+            for value in values:
+                for doc_id in index.get(value, ()):
+                    if doc_id in scores:
+                        scores[doc_id] += weight
+
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [self.restaurants[doc_id] for doc_id in ranked]
+
+
+restaurant_index = RestaurantIndex(RESTAURANTS)
@@ -0,0 +1,372 @@
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from persistent_cache import normalize_location
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# 인접 셀 계산용 표 (방향별 [짝수 길이, 홀수 길이])
+GEOHASH_NEIGHBOURS = {
+    "n": ("p0r21436x8zb9dcf5h7kjnmqesgutwvy", "bc01fg45238967deuvhjyznpkmstqrwx"),
+    "s": ("14365h7k9dcfesgujnmqp0r2twvyx8zb", "238967debc01fg45kmstqrwxuvhjyznp"),
+    "e": ("bc01fg45238967deuvhjyznpkmstqrwx", "p0r21436x8zb9dcf5h7kjnmqesgutwvy"),
+    "w": ("238967debc01fg45kmstqrwxuvhjyznp", "14365h7k9dcfesgujnmqp0r2twvyx8zb"),
+}
+GEOHASH_BORDERS = {
+    "n": ("prxz", "bcfguvyz"),
+    "s": ("028b", "0145hjnp"),
+    "e": ("bcfguvyz", "prxz"),
+    "w": ("0145hjnp", "028b"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# 지오해시 유틸
+def geohash_encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_decode(cell: str) -> Tuple[float, float]:
+    """
+    지오해시 셀의 중심 (위도, 경도) 반환
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        bits = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if (bits >> shift) & 1:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def geohash_adjacent(cell: str, direction: str) -> str:
+    """
+    direction("n"/"s"/"e"/"w") 쪽으로 맞닿은 같은 정밀도의 셀
+    """
+    parity = len(cell) % 2
+    last, parent = cell[-1], cell[:-1]
+    if last in GEOHASH_BORDERS[direction][parity] and parent:
+        parent = geohash_adjacent(parent, direction)
+    return parent + GEOHASH_BASE32[GEOHASH_NEIGHBOURS[direction][parity].index(last)]
+
+
+def geohash_neighbours(cell: str, lat_steps: int, lng_steps: int) -> Set[str]:
+    """
+    셀을 중심으로 위도 방향 ±lat_steps, 경도 방향 ±lng_steps 칸 안의 셀 (중심 셀 포함)
+    """
+    column = [cell]
+    for direction in ("n", "s"):
+        current = cell
+        for _ in range(lat_steps):
+            current = geohash_adjacent(current, direction)
+            column.append(current)
+    cells = set(column)
+    for row in column:
+        for direction in ("e", "w"):
+            current = row
+            for _ in range(lng_steps):
+                current = geohash_adjacent(current, direction)
+                cells.add(current)
+    return cells
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """
+    지오해시 셀 하나의 (위도 간격, 경도 간격) 을 도 단위로 반환
+    """
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (2**lat_bits), 360.0 / (2**lng_bits)
+
+
+def geohash_cells_in_radius(
+    latitude: float, longitude: float, radius_km: float, precision: int
+) -> Set[str]:
+    """
+    중심 좌표에서 반경 radius_km 를 덮는 경계 사각형에 걸친 모든 셀을 반환
+    """
+    lat_step, lng_step = geohash_cell_size(precision)
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lng_delta = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+
+    cells = set()
+    lat = latitude - lat_delta
+    while lat <= latitude + lat_delta + lat_step:
+        lng = longitude - lng_delta
+        while lng <= longitude + lng_delta + lng_step:
+            cells.add(
+                geohash_encode(
+                    min(max(lat, -90.0), 90.0),
+                    (lng + 180.0) % 360.0 - 180.0,
+                    precision,
+                )
+            )
+            lng += lng_step
+        lat += lat_step
+    return cells
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def qualified_place_id(place_id: Optional[str]) -> Optional[str]:
+    """
+    출처 접두어가 붙은 장소 ID ("naver:1234567", 접두어가 없으면 구글 place_id 로 보고 "google:ChIJ...")
+    (네이버 플레이스 ID 와 구글 place_id 는 서로 비교할 수 없으므로 출처별로 구분)
+    """
+    if not place_id:
+        return None
+    return place_id if ":" in place_id else f"google:{place_id}"
+
+
+def record_key(record: Dict) -> str:
+    if record.get("place_id"):
+        return f"id:{qualified_place_id(record['place_id'])}"
+    return f"addr:{normalize_location(record.get('title', ''))}|{normalize_location(record.get('address', ''))}"
+
+
+def from_crawled(record: Dict) -> Dict:
+    """
+    크롤러 레코드(name/category/rating/address/latitude/longitude)를
+    serpAPI local_results 와 같은 형태로 변환 (place_id 는 네이버 플레이스 ID 라서 "naver:" 접두어)
+    """
+    return {
+        "place_id": f"naver:{record['place_id']}" if record.get("place_id") else None,
+        "title": record.get("name", ""),
+        "type": record.get("category", ""),
+        "rating": record.get("rating"),
+        "reviews": record.get("reviews"),
+        "address": record.get("address", ""),
+        "gps_coordinates": {
+            "latitude": record.get("latitude"),
+            "longitude": record.get("longitude"),
+        },
+        "source": record.get("source", "naver_crawler"),
+        "crawled_at": record.get("crawled_at"),
+    }
+
+
+def crawled_timestamp(record: Dict) -> Optional[float]:
+    # 크롤링 시각 (ISO 문자열) -> epoch 초, 없거나 형식이 다르면 None
+    try:
+        return datetime.fromisoformat(record["crawled_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_street_address(address: Optional[str]) -> bool:
+    # 도로명/지번 번호까지 있는 주소인지 ("해운대로 570", "중동 1225-1" / 동네 이름만 있는 "우동" 은 제외)
+    return bool(address and re.search(r"(?:로|길|동|리|가)\s*\d+", address))
+
+
+def record_coordinates(record: Dict) -> Optional[Tuple[float, float]]:
+    coords = record.get("gps_coordinates") or {}
+    try:
+        return float(coords["latitude"]), float(coords["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# -------------------------------------------------------------------
+# 로컬 맛집 저장소 (SQLite 영속화 + 메모리 지오해시 격자 인덱스)
+class RestaurantStore:
+    def __init__(self, path: str, precision: int = 6):
+        self.precision = precision
+        self._records: Dict[str, Dict] = {}
+        self._positions: Dict[str, Tuple[float, float, float]] = {}
+        self._grid: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS restaurants ("
+            "key TEXT PRIMARY KEY, latitude REAL NOT NULL, longitude REAL NOT NULL, "
+            "data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _load(self) -> None:
+        rows = self._conn.execute(
+            "SELECT key, latitude, longitude, data, updated_at FROM restaurants"
+        )
+        for key, latitude, longitude, data, updated_at in rows:
+            self._index(key, json.loads(data), latitude, longitude, updated_at)
+
+    def _index(
+        self, key: str, record: Dict, latitude: float, longitude: float, updated_at: float
+    ) -> None:
+        previous = self._positions.get(key)
+        if previous is not None:
+            self._grid[geohash_encode(previous[0], previous[1], self.precision)].discard(key)
+        self._records[key] = record
+        self._positions[key] = (latitude, longitude, updated_at)
+        self._grid[geohash_encode(latitude, longitude, self.precision)].add(key)
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        """
+        serpAPI local_results 형태의 레코드를 지금 시각으로 저장 (좌표가 없는 레코드는 건너뜀)
+        """
+        now = time.time()
+        return self._upsert((record, now) for record in records)
+
+    def _upsert(self, items: Iterable[Tuple[Dict, float]], keep_newer: bool = False) -> int:
+        # keep_newer=True 이면 저장소에 더 최근 레코드가 있는 키는 덮어쓰지 않음
+        rows = []
+        with self._lock:
+            for record, updated_at in items:
+                position = record_coordinates(record)
+                if position is None:
+                    continue
+                key = record_key(record)
+                previous = self._positions.get(key)
+                if keep_newer and previous is not None and previous[2] > updated_at:
+                    continue
+                latitude, longitude = position
+                self._index(key, record, latitude, longitude, updated_at)
+                rows.append(
+                    (key, latitude, longitude, json.dumps(record, ensure_ascii=False), updated_at)
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO restaurants (key, latitude, longitude, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load_crawled_records(
+        self,
+        records: Iterable[Dict],
+        geocode: Optional[Callable[[List[str]], Dict[str, Tuple[float, float]]]] = None,
+    ) -> int:
+        """
+        크롤러 레코드를 크롤링 시각 기준으로 저장
+        (프로세스를 다시 시작해도 오래된 크롤링 결과가 max_age 를 넘기면 조회되지 않도록)
+        좌표가 없는 레코드는 번지까지 있는 주소만 모아 geocode(주소 리스트) 로 한 번에 좌표를 채우고,
+        그래도 없으면 건너뜀 (동네 이름만 있는 주소는 동네 중심 좌표가 되므로 지오코딩하지 않음)
+        """
+        now = time.time()
+        converted = [from_crawled(raw) for raw in records]
+        missing = [r for r in converted if record_coordinates(r) is None]
+        addresses = sorted({r["address"] for r in missing if is_street_address(r["address"])})
+        positions = geocode(addresses) if geocode and addresses else {}
+        for record in missing:
+            position = positions.get(record["address"])
+            if position is not None:
+                record["gps_coordinates"] = {"latitude": position[0], "longitude": position[1]}
+
+        items = []
+        for record in converted:
+            crawled_at = crawled_timestamp(record)
+            items.append((record, min(crawled_at, now) if crawled_at is not None else now))
+        count = self._upsert(items, keep_newer=True)
+        skipped = sum(1 for r in converted if record_coordinates(r) is None)
+        if skipped:
+            logger.warning(
+                "[RestaurantStore] Skipped %s crawled records without coordinates", skipped
+            )
+        return count
+
+    def within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        max_age_seconds: Optional[float] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        반경 내 레코드를 (거리km, 레코드) 형태로 가까운 순서대로 반환
+        """
+        min_updated = time.time() - max_age_seconds if max_age_seconds else 0.0
+        results = []
+        with self._lock:
+            for cell in geohash_cells_in_radius(latitude, longitude, radius_km, self.precision):
+                for key in self._grid.get(cell, ()):
+                    lat, lng, updated_at = self._positions[key]
+                    if updated_at < min_updated:
+                        continue
+                    distance = haversine_km(latitude, longitude, lat, lng)
+                    if distance <= radius_km:
+                        results.append((distance, self._records[key]))
+        results.sort(key=lambda item: item[0])
+        return results
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_radius_km: float = 50.0,
+        max_age_seconds: Optional[float] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """
+        가까운 k개 레코드를 반환 (검색 반경을 두 배씩 넓혀가며 탐색)
+        """
+        lat_step, _ = geohash_cell_size(self.precision)
+        radius_km = math.radians(lat_step) * EARTH_RADIUS_KM
+        while True:
+            results = self.within_radius(latitude, longitude, radius_km, max_age_seconds)
+            if len(results) >= k or radius_km >= max_radius_km:
+                return results[:k]
+            radius_km = min(radius_km * 2, max_radius_km)
@@ -0,0 +1,137 @@
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class FlightAbandoned(Exception):
+    pass
+
+
+def once(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    인자 없는 팩토리를 처음 호출될 때 한 번만 실행하고 이후에는 같은 객체를 반환
+    (여러 스레드가 동시에 처음 호출해도 한 번만 생성)
+    """
+    lock = threading.Lock()
+    created = []
+
+    @functools.wraps(factory)
+    def get() -> T:
+        if not created:
+            with lock:
+                if not created:
+                    created.append(factory())
+        return created[0]
+
+    return get
+
+
+# -------------------------------------------------------------------
+# 같은 키의 동시 요청은 한 번만 계산하고 결과를 공유 (+ 짧은 결과 캐시)
+# copy_results=True 이면 호출자마다 결과의 깊은 복사본을 받음
+# (한 호출자가 결과를 수정해도 다른 호출자나 결과 캐시에 영향 없음)
+class SingleFlight:
+    def __init__(
+        self, result_ttl: float = 60.0, max_results: int = 1024, copy_results: bool = True
+    ):
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self.copy_results = copy_results
+        self.hits = 0  # 결과 캐시 적중
+        self.shared = 0  # 진행 중인 계산에 합류
+        self.misses = 0  # 새로 계산
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._results: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable) -> Tuple[bool, Future]:
+        """
+        (leader, future) 반환
+        leader 이면 호출자가 직접 계산한 뒤 finish()/fail()/abandon() 중 하나로 완료해야 하고,
+        아니면 result(future) 로 결과를 기다림 (결과 캐시 적중 시 이미 완료된 future)
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[1] > time.time():
+                self.hits += 1
+                future = Future()
+                future.set_result(cached[0])
+                return False, future
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                return False, future
+
+            future = Future()
+            self._in_flight[key] = future
+            self.misses += 1
+            return True, future
+
+    def result(self, future: Future) -> Any:
+        # 먼저 시작한 요청의 결과(또는 예외)를 받음 (리더가 중단했으면 FlightAbandoned)
+        return self._copy(future.result())
+
+    def finish(self, key: Hashable, future: Future, result: Any) -> Any:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self._remember(key, result)
+        future.set_result(result)
+        return self._copy(result)
+
+    def fail(self, key: Hashable, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def abandon(self, key: Hashable, future: Future) -> None:
+        """
+        리더가 결과 없이 중단됨 (예: 스트림 연결 끊김) - 기다리던 호출자는 다시 join 해서 직접 계산
+        """
+        self.fail(key, future, FlightAbandoned(key))
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        while True:
+            leader, future = self.join(key)
+            if leader:
+                break
+            try:
+                return self.result(future)
+            except FlightAbandoned:
+                continue
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.fail(key, future, e)
+            raise
+        return self.finish(key, future, result)
+
+    def _copy(self, result: Any) -> Any:
+        return copy.deepcopy(result) if self.copy_results else result
+
+    def _remember(self, key: Hashable, result: Any) -> None:
+        if self.result_ttl <= 0:
+            return
+        now = time.time()
+        self._results[key] = (result, now + self.result_ttl)
+        self._results.move_to_end(key)
+        while self._results and (
+            len(self._results) > self.max_results
+            or next(iter(self._results.values()))[1] <= now
+        ):
+            self._results.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,100 @@
+import json
+import re
+import time
+from typing import Dict, Iterator, List
+
+from itinerary_scheduler import korean_trip_days, meal_plan, trip_days
+from prompt_compaction import compact_dumps, estimate_tokens
+
+
+# -------------------------------------------------------------------
+# 오프라인 벤치마크용 LLM 대역: 프롬프트의 후보 ID 로 형식에 맞는 JSON 을 결정적으로 생성
+class StubLLM:
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0, chunk_size: int = 8):
+        self.latency = latency  # 첫 토큰까지 걸리는 시간 (초)
+        self.tokens_per_second = tokens_per_second  # 0 이면 생성 시간 없음
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    # crewai LLM 과 같은 인터페이스
+    def call(self, messages: List[Dict]) -> str:
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        response = self.respond(prompt)
+        self._sleep(response)
+        return response
+
+    # langchain ChatOpenAI 와 같은 인터페이스
+    def predict(self, text: str) -> str:
+        return self.call([{"role": "user", "content": text}])
+
+    # 스트리밍 응답 (stream_llm_tokens 대체)
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.respond(prompt)
+        time.sleep(self.latency)
+        for start in range(0, len(response), self.chunk_size):
+            chunk = response[start : start + self.chunk_size]
+            if self.tokens_per_second > 0:
+                time.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield chunk
+
+    def _sleep(self, response: str) -> None:
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += estimate_tokens(response) / self.tokens_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+    def respond(self, prompt: str) -> str:
+        self.calls += 1
+        ids = list(dict.fromkeys(re.findall(r'"id":"(r\d+)"', prompt)))
+        if '"Spots"' in prompt:
+            return compact_dumps({"Spots": self._spots(prompt, ids)})
+        if '"recommendations"' in prompt:
+            return json.dumps({"recommendations": self._recommendations(prompt, ids)}, ensure_ascii=False)
+        # 설명 생성 프롬프트: {"id": "설명"}
+        return compact_dumps({short_id: f"{short_id} 설명" for short_id in ids})
+
+    def _spots(self, prompt: str, ids: List[str]) -> List[Dict]:
+        start = re.search(r"start_date:\s*(\S+)", prompt)
+        end = re.search(r"end_date:\s*(\S+)", prompt)
+        try:
+            days = trip_days(start.group(1), end.group(1))
+        except (AttributeError, ValueError):
+            days = []
+        remaining = iter(ids)
+        spots = []
+        for day_x, (day, slots) in enumerate(meal_plan(days), 1):
+            for order, name, slot_time in slots:
+                short_id = next(remaining, "none")
+                spots.append(
+                    {
+                        "id": short_id,
+                        "description": f"{name} 추천" if short_id != "none" else "적합한 후보가 부족합니다",
+                        "day_x": day_x,
+                        "order": order,
+                        "spot_time": f"{day.isoformat()}T{slot_time}:00",
+                    }
+                )
+        return spots
+
+    def _recommendations(self, prompt: str, ids: List[str]) -> List[Dict]:
+        dates = re.search(r"여행 날짜:\s*(.+)", prompt)
+        days = korean_trip_days(dates.group(1)) if dates else []
+        remaining = iter(ids)
+        recommendations = []
+        for day_x, (_, slots) in enumerate(meal_plan(days, last_day_meals=2), 1):
+            for order, name, _ in slots:
+                short_id = next(remaining, None)
+                if short_id is None:
+                    return recommendations
+                recommendations.append(
+                    {
+                        "day": f"{day_x}일차",
+                        "order": str(order),
+                        "id": short_id,
+                        "description": f"{name} 추천",
+                        "reason": "벤치마크용 응답",
+                        "place_description": "",
+                    }
+                )
+        return recommendations
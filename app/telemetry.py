@@ -0,0 +1,352 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "1") == "1"
+# 완료된 span 을 내보낼 곳: "none", "memory", "otlp-json" (파일), "otel" (OpenTelemetry SDK)
+TELEMETRY_EXPORTER = os.getenv("TELEMETRY_EXPORTER", "none")
+TELEMETRY_OTLP_PATH = os.getenv("TELEMETRY_OTLP_PATH", ".cache/traces.jsonl")
+TELEMETRY_MEMORY_SPANS = int(os.getenv("TELEMETRY_MEMORY_SPANS", 1000))
+SERVICE_NAME = os.getenv("SERVICE_NAME", "foodrec")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+# -------------------------------------------------------------------
+# 메트릭 저장소 (카운터 / 히스토그램 / 수집 시점에 값을 읽는 게이지)
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._histograms: Dict[Tuple[str, tuple], list] = {}
+        self._gauges: Dict[str, Callable[[], Iterable[Tuple[Dict, float]]]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("counter", help_text, ())
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> None:
+        self._meta[name] = ("histogram", help_text, tuple(buckets))
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Iterable[Tuple[Dict, float]]]) -> None:
+        # collect() 는 [(라벨, 값), ...] 을 반환 (캐시 적중률 등 다른 객체의 현재 상태)
+        self._meta[name] = ("gauge", help_text, ())
+        self._gauges[name] = collect
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = self._meta[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            state = self._histograms.get(key)
+            if state is None:
+                state = [[0] * len(buckets), 0.0, 0]
+                self._histograms[key] = state
+            index = bisect_left(buckets, value)
+            if index < len(buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render_prometheus(self) -> str:
+        """
+        Prometheus 텍스트 노출 형식 (version 0.0.4)
+        """
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: [list(s[0]), s[1], s[2]] for key, s in self._histograms.items()}
+
+        for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            elif kind == "histogram":
+                for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        le = labels + (("le", _number(bound)),)
+                        lines.append(f"{name}_bucket{_labels(le)} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                    lines.append(f"{name}_count{_labels(labels)} {count}")
+            else:
+                for labels, value in self._gauges[name]():
+                    lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+metrics = MetricsRegistry()
+metrics.histogram("foodrec_stage_duration_seconds", "단계별 처리 시간", DURATION_BUCKETS)
+metrics.histogram("foodrec_stage_candidates", "단계별 후보 수", COUNT_BUCKETS)
+metrics.counter("foodrec_llm_tokens_total", "LLM 토큰 수 (추정치)")
+metrics.counter("foodrec_cache_requests_total", "캐시 조회 결과")
+metrics.counter("foodrec_upstream_requests_total", "외부 API 응답 상태 코드")
+
+
+# -------------------------------------------------------------------
+# 단계별 span (contextvars 로 부모-자식 연결)
+class Span:
+    def __init__(self, name: str, attributes: Dict, parent: Optional["Span"]):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        # 예외를 잡아서 처리하는 구간도 error 상태로 집계되도록 표시
+        self.status = "error"
+        self.error = str(error)
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+
+class _NoopSpan:
+    def set(self, **attributes) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    with span("geocode", cache_hit=False) as s: ...; s.set(candidates=10)
+
+    특별히 집계되는 속성: candidates, prompt_tokens, completion_tokens, cache_hit, status_code, host
+    """
+    if not TELEMETRY_ENABLED:
+        yield _NoopSpan()
+        return
+
+    current = Span(name, attributes, _current_span.get())
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        current.end()
+        _current_span.reset(token)
+        _record(current)
+
+
+def record_span(name: str, started: float, status: str = "ok", **attributes) -> None:
+    """
+    with 블록으로 감쌀 수 없는 구간 (여러 스레드에서 이어서 소비되는 제너레이터 등)을
+    time.perf_counter() 시작 시각으로부터 직접 기록
+    """
+    if not TELEMETRY_ENABLED:
+        return
+    current = Span(name, attributes, _current_span.get())
+    current.duration = time.perf_counter() - started
+    current.start_time = time.time() - current.duration
+    current.status = status
+    _record(current)
+
+
+def bind(func: Callable) -> Callable:
+    """
+    현재 span 을 부모로 유지한 채 다른 스레드에서 실행할 수 있도록 컨텍스트를 복사해서 묶음
+    (executor.submit(bind(func), ...) 처럼 제출할 때마다 호출)
+    """
+    return partial(contextvars.copy_context().run, func)
+
+
+def _record(current: Span) -> None:
+    attributes = current.attributes
+    metrics.observe(
+        "foodrec_stage_duration_seconds", current.duration, stage=current.name, status=current.status
+    )
+    if "candidates" in attributes:
+        metrics.observe("foodrec_stage_candidates", attributes["candidates"], stage=current.name)
+    for kind in ("prompt", "completion"):
+        tokens = attributes.get(f"{kind}_tokens")
+        if tokens:
+            metrics.inc("foodrec_llm_tokens_total", tokens, stage=current.name, kind=kind)
+    if "cache_hit" in attributes:
+        metrics.inc(
+            "foodrec_cache_requests_total",
+            cache=current.name,
+            result="hit" if attributes["cache_hit"] else "miss",
+        )
+    if "status_code" in attributes:
+        metrics.inc(
+            "foodrec_upstream_requests_total",
+            host=attributes.get("host", ""),
+            status_code=attributes["status_code"],
+        )
+    _exporter.export(current)
+
+
+# -------------------------------------------------------------------
+# span 내보내기 (OTLP JSON 형식 호환)
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(current: Span) -> Dict:
+    start = int(current.start_time * 1e9)
+    otlp = {
+        "traceId": current.trace_id,
+        "spanId": current.span_id,
+        "name": current.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(start),
+        "endTimeUnixNano": str(start + int(current.duration * 1e9)),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in current.attributes.items()],
+        "status": {"code": 1} if current.status == "ok" else {"code": 2, "message": current.error or ""},
+    }
+    if current.parent_id:
+        otlp["parentSpanId"] = current.parent_id
+    return otlp
+
+
+def otlp_payload(spans: List[Span]) -> Dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                },
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [to_otlp(s) for s in spans]}],
+            }
+        ]
+    }
+
+
+class NoopExporter:
+    def export(self, current: Span) -> None:
+        pass
+
+
+class InMemoryExporter:
+    # 최근 span 을 메모리에 보관 (벤치마크/디버깅용)
+    def __init__(self, max_spans: int = TELEMETRY_MEMORY_SPANS):
+        self._spans = deque(maxlen=max_spans)
+
+    def export(self, current: Span) -> None:
+        self._spans.append(current)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class OTLPJsonExporter:
+    # span 하나당 OTLP JSON (ExportTraceServiceRequest) 한 줄, collector 의 파일 수신기로 읽을 수 있음
+    def __init__(self, path: str = TELEMETRY_OTLP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, current: Span) -> None:
+        line = json.dumps(otlp_payload([current]), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class OpenTelemetryExporter:
+    # OpenTelemetry SDK 가 설치된 경우 완료된 span 을 그대로 옮겨서 기록 (SDK 설정은 사용하는 쪽에서)
+    def __init__(self):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetry 로 내보내려면 opentelemetry-api 가 필요합니다.") from e
+        self._tracer = trace.get_tracer(SERVICE_NAME)
+
+    def export(self, current: Span) -> None:
+        start = int(current.start_time * 1e9)
+        otel_span = self._tracer.start_span(
+            current.name,
+            start_time=start,
+            attributes={
+                **{k: v if isinstance(v, (bool, int, float, str)) else str(v) for k, v in current.attributes.items()},
+                "foodrec.trace_id": current.trace_id,
+                "foodrec.parent_id": current.parent_id or "",
+            },
+        )
+        if current.status == "error":
+            from opentelemetry.trace import Status, StatusCode
+
+            otel_span.set_status(Status(StatusCode.ERROR, current.error or ""))
+        otel_span.end(end_time=start + int(current.duration * 1e9))
+
+
+def build_exporter(name: str):
+    if name == "memory":
+        return InMemoryExporter()
+    if name == "otlp-json":
+        return OTLPJsonExporter()
+    if name == "otel":
+        return OpenTelemetryExporter()
+    return NoopExporter()
+
+
+_exporter = build_exporter(TELEMETRY_EXPORTER)
+
+
+def set_exporter(exporter) -> None:
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter():
+    return _exporter
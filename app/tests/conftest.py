@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app/ 모듈들은 평평한 import (import telemetry 등) 를 사용하므로 app 디렉터리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
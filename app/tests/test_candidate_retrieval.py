@@ -0,0 +1,73 @@
+from candidate_retrieval import fuse_candidates, has_rating
+
+
+def serpapi(title, address, lat, lng, rating=4.5, reviews=900, place_id=None):
+    return {
+        "place_id": place_id,
+        "title": title,
+        "rating": rating,
+        "reviews": reviews,
+        "address": address,
+        "gps_coordinates": {"latitude": lat, "longitude": lng},
+        "sources": ["serpapi"],
+    }
+
+
+def naver(title, address, lat, lng, phone=""):
+    return {
+        "place_id": None,
+        "title": title,
+        "rating": None,
+        "reviews": None,
+        "address": address,
+        "phone": phone,
+        "gps_coordinates": {"latitude": lat, "longitude": lng},
+        "sources": ["naver"],
+    }
+
+
+def test_same_restaurant_is_merged_with_serpapi_fields_first():
+    fused = fuse_candidates(
+        {
+            "naver": [naver("<b>해운대암소갈비</b>", "부산 해운대구 중동2로10번길 32-10", 35.1631, 129.1636, "051-746-3333")],
+            "serpapi": [serpapi("해운대암소갈비", "부산광역시 해운대구 중동2로10번길 32-10", 35.1632, 129.1635, place_id="g1")],
+        }
+    )
+    assert len(fused) == 1
+    [merged] = fused
+    assert merged["place_id"] == "g1"
+    assert merged["rating"] == 4.5
+    assert merged["phone"] == "051-746-3333"
+    assert merged["sources"] == ["naver", "serpapi"]
+
+
+def test_different_restaurants_are_kept_in_source_priority_order():
+    fused = fuse_candidates(
+        {
+            "naver": [naver("할매국밥", "부산 해운대구 구남로 21", 35.1622, 129.1601)],
+            "store": [dict(serpapi("해운대소고기", "부산 해운대구 우동 1411", 35.1660, 129.1370), sources=["store"])],
+            "serpapi": [serpapi("본죽 해운대점", "부산 해운대구 해운대로 570", 35.1630, 129.1630)],
+        }
+    )
+    assert [c["title"] for c in fused] == ["본죽 해운대점", "해운대소고기", "할매국밥"]
+
+
+def test_has_rating_requires_rating_and_reviews():
+    assert has_rating(serpapi("A", "", 0, 0, rating="4.5", reviews="1,200"))
+    assert not has_rating(naver("A", "", 0, 0))
+    assert not has_rating(serpapi("A", "", 0, 0, reviews=None))
+
+
+def test_crawled_store_record_merges_with_google_record():
+    crawled = dict(
+        serpapi("해운대암소갈비", "부산 해운대구 중동2로10번길 32-10", 35.1631, 129.1636, place_id="naver:1234567"),
+        sources=["store"],
+    )
+    fused = fuse_candidates(
+        {
+            "serpapi": [serpapi("해운대암소갈비", "부산 해운대구 중동2로10번길 32-10", 35.1632, 129.1635, place_id="ChIJabc")],
+            "store": [crawled],
+        }
+    )
+    assert len(fused) == 1
+    assert fused[0]["place_id"] == "ChIJabc"
@@ -0,0 +1,43 @@
+import json
+
+from crawl_sink import CrawlRecord, JsonlSink, read_jsonl
+
+
+def test_from_raw_normalizes_placeholders_and_rating():
+    record = CrawlRecord.from_raw(
+        {
+            "query": "부산 해운대 음식점",
+            "page": 1,
+            "index": 3,
+            "name": "해운대암소갈비집",
+            "category": "정보 없음",
+            "rating": "별점4.52",
+            "address": "주소 정보 없음",
+        }
+    )
+    assert record.category is None
+    assert record.address is None
+    assert record.rating == 4.52
+    assert record.rating_text == "별점4.52"
+
+
+def test_from_raw_accepts_unhashable_values():
+    record = CrawlRecord.from_raw(
+        {"query": "q", "page": 1, "index": 1, "name": "a", "rating": 4.1, "tags": ["x"], "extra": {}}
+    )
+    assert record.rating == 4.1
+
+
+def test_jsonl_sink_buffers_until_flush(tmp_path):
+    path = tmp_path / "places.jsonl"
+    sink = JsonlSink(str(path), buffer_size=2)
+    sink.write(CrawlRecord(query="q", page=1, index=1, name="a"))
+    assert not path.exists()
+    sink.write(CrawlRecord(query="q", page=1, index=2, name="b"))
+    assert len(path.read_text().splitlines()) == 2
+
+    sink.write(CrawlRecord(query="q", page=1, index=3, name="c"))
+    sink.close()
+    rows = list(read_jsonl(str(path)))
+    assert [row["name"] for row in rows] == ["a", "b", "c"]
+    assert json.loads(path.read_text().splitlines()[0])["source"] == "naver_crawler"
@@ -0,0 +1,109 @@
+from entity_resolution import EntityIndex, name_key, region_tokens, resolve_entities
+from restaurant_store import (
+    geohash_adjacent,
+    geohash_cell_size,
+    geohash_decode,
+    geohash_encode,
+    geohash_neighbours,
+)
+
+ADDRESS = "부산 해운대구 해운대로 570"
+
+
+def place(title, address=ADDRESS, lat=35.1630, lng=129.1630, place_id=None, **extra):
+    return {
+        "place_id": place_id,
+        "title": title,
+        "address": address,
+        "gps_coordinates": {"latitude": lat, "longitude": lng},
+        **extra,
+    }
+
+
+def test_branches_in_the_same_building_are_different_restaurants():
+    assert resolve_entities([place("본죽 해운대점"), place("본도시락 해운대점")]) == [0, 1]
+    assert resolve_entities([place("본죽해운대점"), place("본도시락해운대점")]) == [0, 1]
+
+
+def test_shared_region_prefix_does_not_merge_restaurants():
+    assert resolve_entities([place("해운대암소갈비"), place("해운대소고기")]) == [0, 1]
+
+
+def test_same_restaurant_across_sources_is_merged():
+    index = EntityIndex()
+    naver = place(
+        "<b>해운대암소갈비</b>",
+        "부산 해운대구 중동2로10번길 32-10",
+        35.1631,
+        129.1636,
+        jibun_address="부산 해운대구 중동 1225-1",
+    )
+    google = place(
+        "Haeundae Amso Galbi", "부산광역시 해운대구 중동2로10번길 32-10", 35.1632, 129.1635, "g1"
+    )
+    korean = place("해운대암소갈비 본점", "부산 해운대구 중동 1225-1", 35.1631, 129.1635)
+    assert [index.add(r) for r in (google, naver, korean)] == [0, 0, 0]
+
+
+def test_place_ids_are_decisive_only_within_the_same_source():
+    google = place("해운대암소갈비", place_id="ChIJabc")
+    crawled = place("해운대암소갈비", place_id="naver:1234567")
+    other_google = place("해운대암소갈비", place_id="ChIJxyz")
+    assert resolve_entities([google, crawled]) == [0, 0]
+    assert resolve_entities([google, other_google]) == [0, 1]
+    assert resolve_entities([crawled, place("해운대암소갈비", place_id="naver:7654321")]) == [0, 1]
+
+
+def test_numbered_branches_stay_separate():
+    assert resolve_entities([place("스타벅스 1호점"), place("스타벅스 2호점")]) == [0, 1]
+
+
+def test_distant_records_with_the_same_name_are_different():
+    records = [
+        place("할매국밥", "부산 해운대구 구남로 21"),
+        place("할매국밥", "서울 중구 을지로 21", lat=37.5665, lng=126.9910),
+    ]
+    assert resolve_entities(records) == [0, 1]
+
+
+def test_name_key_strips_branch_suffix():
+    assert name_key("본죽 해운대점", strip_branch=True) == name_key("본죽")
+    assert name_key("본죽 해운대역점", strip_branch=True) == name_key("본죽")
+    assert name_key("스타벅스 센텀2호점", strip_branch=True) == name_key("스타벅스")
+    assert name_key("스타벅스 센텀2호점") != name_key("스타벅스")
+
+
+def test_region_tokens_from_address():
+    assert region_tokens("부산광역시 해운대구 중동2로10번길 32-10") == {"busan", "haeundae", "jungdong"}
+
+
+def test_geohash_adjacent_matches_encoding_of_shifted_point():
+    latitude, longitude = 35.1630, 129.1630
+    cell = geohash_encode(latitude, longitude, 7)
+    # 정밀도 7 셀 크기: 위도 약 0.00137도, 경도 약 0.00137도
+    assert geohash_adjacent(cell, "n") == geohash_encode(latitude + 0.00137, longitude, 7)
+    assert geohash_adjacent(cell, "s") == geohash_encode(latitude - 0.00137, longitude, 7)
+    assert geohash_adjacent(cell, "e") == geohash_encode(latitude, longitude + 0.00137, 7)
+    assert geohash_adjacent(cell, "w") == geohash_encode(latitude, longitude - 0.00137, 7)
+
+
+def test_geohash_adjacent_crosses_parent_cell_border():
+    # "ezzz" 는 부모 셀 "ezz" 의 북동쪽 모서리 셀이라 동쪽/북쪽 이웃은 부모 셀이 다름
+    latitude, longitude = geohash_decode("ezzz")
+    lat_step, lng_step = geohash_cell_size(4)
+    east = geohash_adjacent("ezzz", "e")
+    north = geohash_adjacent("ezzz", "n")
+    assert east[:3] != "ezz" and north[:3] != "ezz"
+    assert east == geohash_encode(latitude, longitude + lng_step, 4)
+    assert north == geohash_encode(latitude + lat_step, longitude, 4)
+
+
+def test_geohash_neighbours_covers_grid():
+    cell = geohash_encode(35.1630, 129.1630, 7)
+    neighbours = geohash_neighbours(cell, 1, 2)
+    assert len(neighbours) == 3 * 5
+    assert cell in neighbours
+    for dlat in (-1, 0, 1):
+        for dlng in (-2, -1, 0, 1, 2):
+            shifted = geohash_encode(35.1630 + dlat * 0.00137, 129.1630 + dlng * 0.00137, 7)
+            assert shifted in neighbours
@@ -0,0 +1,86 @@
+from datetime import date
+
+from itinerary_scheduler import (
+    MEAL_SLOTS,
+    SHORTAGE_REASON,
+    build_itinerary,
+    korean_trip_days,
+    trip_days,
+)
+
+
+def candidate(name, score, kind="한식", lat=35.16, lng=129.16):
+    return {"kor_name": name, "score": score, "type": kind, "latitude": lat, "longitude": lng}
+
+
+def by_score(c):
+    return c["score"]
+
+
+def test_trip_days_includes_both_ends_and_at_least_one_day():
+    assert trip_days("2025-02-01T00:00:00", "2025-02-03T00:00:00") == [
+        date(2025, 2, 1),
+        date(2025, 2, 2),
+        date(2025, 2, 3),
+    ]
+    assert trip_days("2025-02-03T00:00:00", "2025-02-01T00:00:00") == [date(2025, 2, 3)]
+    assert korean_trip_days("2025년 1월 31일 ~ 2025년 2월 1일") == [date(2025, 1, 31), date(2025, 2, 1)]
+
+
+def test_fills_every_slot_in_order_without_reuse():
+    days = trip_days("2025-02-01T00:00:00", "2025-02-02T00:00:00")
+    candidates = [candidate(f"c{i}", 10 - i, kind=f"k{i}") for i in range(10)]
+    spots = build_itinerary(days, candidates, score=by_score)
+
+    assert [(s["day_x"], s["order"]) for s in spots] == [
+        (day, order) for day in (1, 2) for order, _, _ in MEAL_SLOTS
+    ]
+    assert spots[0]["spot_time"] == "2025-02-01T09:00:00"
+    assert spots[-1]["spot_time"] == "2025-02-02T18:30:00"
+    names = [s["kor_name"] for s in spots]
+    assert names == ["c0", "c1", "c2", "c3", "c4", "c5"]
+
+
+def test_shortage_slots_carry_a_reason():
+    days = [date(2025, 2, 1)]
+    spots = build_itinerary(days, [candidate("only", 5)], score=by_score)
+    assert spots[0]["kor_name"] == "only"
+    assert [s.get("reason") for s in spots[1:]] == [SHORTAGE_REASON, SHORTAGE_REASON]
+
+
+def test_last_day_meals_limits_the_final_day():
+    days = trip_days("2025-02-01T00:00:00", "2025-02-02T00:00:00")
+    candidates = [candidate(f"c{i}", 1, kind=f"k{i}") for i in range(6)]
+    spots = build_itinerary(days, candidates, score=by_score, last_day_meals=1)
+    assert [(s["day_x"], s["order"]) for s in spots] == [(1, 1), (1, 2), (1, 3), (2, 1)]
+
+
+def test_diversity_penalty_avoids_repeating_a_category_in_one_day():
+    days = [date(2025, 2, 1)]
+    candidates = [
+        candidate("갈비1", 1.0, "고기"),
+        candidate("갈비2", 0.95, "고기"),
+        candidate("밀면", 0.9, "면"),
+        candidate("횟집", 0.85, "회"),
+    ]
+    names = [s["kor_name"] for s in build_itinerary(days, candidates, score=by_score)]
+    assert names == ["갈비1", "밀면", "횟집"]
+
+
+def test_distance_penalty_prefers_nearby_next_stop():
+    days = [date(2025, 2, 1)]
+    candidates = [
+        candidate("출발", 1.0, "a", lat=35.16, lng=129.16),
+        candidate("먼 곳", 0.99, "b", lat=35.50, lng=129.16),
+        candidate("가까운 곳", 0.95, "c", lat=35.161, lng=129.161),
+    ]
+    names = [s["kor_name"] for s in build_itinerary(days, candidates, score=by_score)]
+    assert names[:2] == ["출발", "가까운 곳"]
+
+
+def test_is_deterministic_on_ties():
+    days = [date(2025, 2, 1)]
+    candidates = [candidate(f"c{i}", 1.0, kind=f"k{i}") for i in range(5)]
+    first = build_itinerary(days, candidates, score=by_score)
+    assert first == build_itinerary(days, candidates, score=by_score)
+    assert [s["kor_name"] for s in first] == ["c0", "c1", "c2"]
@@ -0,0 +1,57 @@
+import json
+
+from itinerary_stream import IncrementalSpotParser, validate_spot
+
+SPOTS = [
+    {"kor_name": '해운대 "원조" 암소갈비', "day_x": 1, "order": 1, "spot_time": "2025-02-01T12:00:00"},
+    {"kor_name": "중괄호 {} 와 ] 가 든 이름 \\ 역슬래시", "day_x": 1, "order": 2, "spot_time": "2025-02-01T18:00:00"},
+    {"kor_name": "밀면집", "day_x": 2, "order": 1, "spot_time": "2025-02-02T12:00:00"},
+]
+RESPONSE = "```json\n" + json.dumps({"Spots": SPOTS}, ensure_ascii=False) + "\n```"
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalSpotParser()
+    parsed = []
+    for start in range(0, len(text), size):
+        parsed.extend(parser.feed(text[start : start + size]))
+    return parser, parsed
+
+
+def test_parses_every_chunk_size():
+    for size in (1, 2, 3, 7, 64, len(RESPONSE)):
+        parser, parsed = feed_in_chunks(RESPONSE, size)
+        assert parsed == SPOTS, size
+        assert parser.text == RESPONSE
+
+
+def test_spot_is_emitted_as_soon_as_its_object_closes():
+    parser = IncrementalSpotParser()
+    first = json.dumps(SPOTS[0], ensure_ascii=False)
+    assert parser.feed('{"Spots": [' + first[:-1]) == []
+    assert parser.feed(first[-1] + ", {") == [SPOTS[0]]
+
+
+def test_escaped_quotes_do_not_end_strings():
+    parser = IncrementalSpotParser()
+    text = '{"Spots": [{"kor_name": "a\\"}\\"b", "day_x": 1}]}'
+    assert parser.feed(text) == [{"kor_name": 'a"}"b', "day_x": 1}]
+
+
+def test_ignores_text_after_the_array_and_before_the_key():
+    parser = IncrementalSpotParser()
+    assert parser.feed('설명 {"note": {"x": 1}, "Spots": [{"a": 1}]} {"b": 2}') == [{"a": 1}]
+    assert parser.feed('{"c": 3}') == []
+
+
+def test_truncated_response_yields_only_complete_spots():
+    cut = RESPONSE.index("밀면집")
+    _, parsed = feed_in_chunks(RESPONSE[:cut], 5)
+    assert parsed == SPOTS[:2]
+
+
+def test_validate_spot():
+    assert validate_spot(SPOTS[0]) is SPOTS[0]
+    assert validate_spot({**SPOTS[0], "day_x": 0}) is None
+    assert validate_spot({**SPOTS[0], "spot_time": "오후 2시"}) is None
+    assert validate_spot({"kor_name": "x"}) is None
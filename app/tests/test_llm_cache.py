@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import llm_cache
+from persistent_cache import PersistentTTLCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PersistentTTLCache(str(tmp_path / "llm.sqlite3"), "llm_responses", ttl_seconds=60)
+    monkeypatch.setattr(llm_cache, "llm_response_cache", cache)
+    return cache
+
+
+def test_cache_key_is_canonical():
+    a = llm_cache.llm_cache_key("m", "1", ["x", "y"], {"b": 1, "a": 2})
+    b = llm_cache.llm_cache_key("m", "1", ["x", "y"], {"a": 2, "b": 1})
+    assert a == b
+    assert a != llm_cache.llm_cache_key("m", "1", ["y", "x"], {"a": 2, "b": 1})
+
+
+def test_valid_response_is_cached(cache):
+    calls = []
+
+    def call():
+        calls.append(1)
+        return '{"Spots": []}'
+
+    for _ in range(2):
+        assert llm_cache.cached_llm_call("k", call, validate=json.loads) == '{"Spots": []}'
+    assert len(calls) == 1
+
+
+def test_unparseable_response_is_returned_but_not_cached(cache):
+    replies = iter(['{"Spots": [', '{"Spots": []}'])
+    assert llm_cache.cached_llm_call("k", lambda: next(replies), validate=json.loads) == '{"Spots": ['
+    assert cache.get("k") is None
+    assert llm_cache.cached_llm_call("k", lambda: next(replies), validate=json.loads) == '{"Spots": []}'
+    assert cache.get("k") == '{"Spots": []}'
+
+
+def test_invalid_cached_entry_is_ignored(cache):
+    cache.set("k", "not json")
+    assert llm_cache.cached_llm_call("k", lambda: "[1]", validate=json.loads) == "[1]"
+    assert cache.get("k") == "[1]"
@@ -0,0 +1,57 @@
+import time
+
+from persistent_cache import PersistentTTLCache, normalize_location
+
+
+def make_cache(tmp_path, **kwargs):
+    return PersistentTTLCache(str(tmp_path / "cache.sqlite3"), "test_cache", **kwargs)
+
+
+def test_normalize_location():
+    assert normalize_location("  부산   해운대 ") == normalize_location("부산 해운대")
+    assert normalize_location("Seoul") == "seoul"
+
+
+def test_get_returns_value_before_expiry(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("a", {"lat": 1.0})
+    assert cache.get("a") == {"lat": 1.0}
+    assert cache.stats()["hits"] == 1
+
+
+def test_memory_entry_expires(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl_seconds=10)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", "value")
+
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_entry_survives_restart_until_expiry(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    make_cache(tmp_path, ttl_seconds=10).set("a", [1, 2])
+
+    reopened = make_cache(tmp_path, ttl_seconds=10)
+    assert reopened.get("a") == [1, 2]
+    assert reopened.stats()["disk_hits"] == 1
+
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    expired = make_cache(tmp_path, ttl_seconds=10)
+    assert expired.get("a") is None
+    # 만료 항목은 조회 시 디스크에서도 삭제됨
+    row = expired._conn.execute("SELECT COUNT(*) FROM test_cache").fetchone()
+    assert row[0] == 0
+
+
+def test_disk_eviction_keeps_most_recently_accessed(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl_seconds=60, max_memory_items=1, max_disk_items=2)
+    now = time.time()
+    for i, key in enumerate(["a", "b", "c"]):
+        monkeypatch.setattr(time, "time", lambda t=now + i: t)
+        cache.set(key, key)
+    keys = {row[0] for row in cache._conn.execute("SELECT key FROM test_cache")}
+    assert keys == {"b", "c"}
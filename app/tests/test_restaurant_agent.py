@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import llm_cache
+import restaurant_agent
+from persistent_cache import PersistentTTLCache
+
+KEYWORDS = {
+    "location": "부산 해운대",
+    "dates": "2025년 1월 22일 ~ 2025년 1월 23일",
+    "age_group": "30대",
+    "themes": ["맛집"],
+    "group": {"adults": 2, "children": 0, "pets": 0},
+}
+PLACES = [{"title": "해운대암소갈비", "type": "한식", "rating": 4.6, "reviews": 2000, "address": "부산 해운대구"}]
+
+
+class FakeLLM:
+    def __init__(self, replies):
+        self.replies = iter(replies)
+        self.calls = 0
+
+    def predict(self, prompt):
+        self.calls += 1
+        return next(self.replies)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PersistentTTLCache(str(tmp_path / "llm.sqlite3"), "llm_responses", ttl_seconds=60)
+    monkeypatch.setattr(llm_cache, "llm_response_cache", cache)
+    monkeypatch.setattr(restaurant_agent, "retrieve_places", lambda location: PLACES)
+    return cache
+
+
+def use_llm(monkeypatch, replies):
+    llm = FakeLLM(replies)
+    monkeypatch.setattr(restaurant_agent, "get_llm", lambda: llm)
+    return llm
+
+
+def test_truncated_reply_is_not_cached(cache, monkeypatch):
+    valid = json.dumps({"recommendations": [{"day": "1일차", "order": "1", "id": "r1"}]})
+    llm = use_llm(monkeypatch, ['{"recommendations": [', valid])
+
+    assert restaurant_agent.generate_restaurant_recommendations(KEYWORDS).startswith("추천 실패")
+    result = json.loads(restaurant_agent.generate_restaurant_recommendations(KEYWORDS))
+    assert result["recommendations"][0]["name"] == "해운대암소갈비"
+    assert llm.calls == 2
+
+    # 올바른 응답만 캐시되어 다음 호출은 LLM 없이 응답
+    restaurant_agent.generate_restaurant_recommendations(KEYWORDS)
+    assert llm.calls == 2
+
+
+def test_parse_recommendations_rejects_other_shapes():
+    assert restaurant_agent.parse_recommendations('```json\n{"recommendations": []}\n```') == {
+        "recommendations": []
+    }
+    for reply in ("추천할 수 없습니다", "[]", '{"items": []}'):
+        with pytest.raises(ValueError):
+            restaurant_agent.parse_recommendations(reply)
@@ -0,0 +1,13 @@
+from restaurant_agent_service import map_url
+
+
+def test_map_url_uses_the_place_id_source():
+    assert map_url({"place_id": "ChIJabc"}) == (
+        "https://www.google.com/maps/place/?q=place_id:ChIJabc"
+    )
+    assert map_url({"place_id": "naver:1234567"}) == "https://map.naver.com/p/entry/place/1234567"
+
+
+def test_map_url_without_place_id_searches_naver_map():
+    url = map_url({"place_id": None, "title": "할매국밥", "address": "부산 해운대구 구남로 21"})
+    assert url.startswith("https://map.naver.com/p/search/")
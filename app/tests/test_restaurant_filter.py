@@ -0,0 +1,69 @@
+import numpy as np
+
+from restaurant_filter import CandidateTable, FilterCriteria, _to_number_array, filter_candidates
+
+
+def place(title, rating, reviews, lat=35.16, lng=129.16, **extra):
+    return {
+        "title": title,
+        "rating": rating,
+        "reviews": reviews,
+        "address": f"부산 해운대구 {title}",
+        "gps_coordinates": {"latitude": lat, "longitude": lng},
+        **extra,
+    }
+
+
+def test_select_applies_rating_and_review_thresholds():
+    rows = [
+        place("A", 4.5, 900, lat=35.10),
+        place("B", 3.9, 900, lat=35.11),
+        place("C", 4.2, 499, lat=35.12),
+        place("D", 4.0, 500, lat=35.13),
+    ]
+    selected = CandidateTable(rows).select(FilterCriteria())
+    assert [rows[i]["title"] for i in selected] == ["A", "D"]
+
+
+def test_unparseable_numbers_are_dropped_and_strings_are_parsed():
+    rows = [
+        place("A", "4.5", "1,200", lat=35.10),
+        place("B", None, 900, lat=35.11),
+        place("C", "n/a", 900, lat=35.12),
+    ]
+    assert [r["title"] for r in filter_candidates(rows)] == ["A"]
+
+
+def test_non_ascii_numerals_become_nan():
+    parsed = _to_number_array(["4.5", "五", "①", "½", " 1,200 ", ".5", "-129.1"])
+    assert np.isnan(parsed[1:4]).all()
+    assert parsed[[0, 4, 5, 6]].tolist() == [4.5, 1200.0, 0.5, -129.1]
+
+    rows = [place("A", "4.5", "1,200", lat=35.10), place("B", "五", 900, lat=35.11)]
+    assert [r["title"] for r in filter_candidates(rows)] == ["A"]
+
+
+def test_category_open_state_and_distance():
+    rows = [
+        place("한식당", 4.5, 900, type="한식", lat=35.160, lng=129.160),
+        place("일식당", 4.5, 900, type="일식", lat=35.161, lng=129.161),
+        place("폐업한 한식당", 4.5, 900, type="한식", open_state="폐업", lat=35.162, lng=129.162),
+        place("먼 한식당", 4.5, 900, type="한식", lat=35.300, lng=129.160),
+    ]
+    criteria = FilterCriteria(
+        categories=["한식"], open_now=True, max_distance_km=2.0, origin="35.16,129.16"
+    )
+    assert [r["title"] for r in filter_candidates(rows, criteria)] == ["한식당"]
+
+
+def test_select_keeps_first_of_duplicate_places_in_order():
+    rows = [
+        place("해운대암소갈비집", 4.5, 900, place_id="p1"),
+        place("해운대암소갈비집", 4.6, 950, place_id="p1"),
+        place("다른 식당", 4.5, 900, place_id="p2", lat=35.20),
+    ]
+    assert list(CandidateTable(rows).select(FilterCriteria())) == [0, 2]
+
+
+def test_select_on_empty_table():
+    assert len(CandidateTable([]).select(FilterCriteria())) == 0
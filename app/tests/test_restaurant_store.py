@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+from restaurant_store import RestaurantStore
+
+
+def crawled(name, address, crawled_at, lat=None, lng=None, **extra):
+    return {
+        "query": "부산 해운대 음식점",
+        "page": 1,
+        "index": 1,
+        "name": name,
+        "category": "한식",
+        "rating": 4.5,
+        "reviews": 800,
+        "address": address,
+        "latitude": lat,
+        "longitude": lng,
+        "crawled_at": crawled_at,
+        **extra,
+    }
+
+
+def iso(seconds_ago):
+    return datetime.fromtimestamp(time.time() - seconds_ago).isoformat(timespec="seconds")
+
+
+def test_crawled_records_keep_crawl_timestamp(tmp_path):
+    store = RestaurantStore(str(tmp_path / "store.sqlite3"))
+    records = [
+        crawled("오래된 식당", "부산 해운대구 A", iso(10 * 86400), 35.16, 129.16),
+        crawled("최근 식당", "부산 해운대구 B", iso(3600), 35.161, 129.161),
+    ]
+    assert store.load_crawled_records(records) == 2
+
+    week = 7 * 86400
+    titles = [r["title"] for _, r in store.within_radius(35.16, 129.16, 1, week)]
+    assert titles == ["최근 식당"]
+
+    # 다시 불러와도 (프로세스 재시작) 오래된 레코드가 새것이 되지 않음
+    reopened = RestaurantStore(str(tmp_path / "store.sqlite3"))
+    reopened.load_crawled_records(records)
+    titles = [r["title"] for _, r in reopened.within_radius(35.16, 129.16, 1, week)]
+    assert titles == ["최근 식당"]
+
+
+def test_crawl_import_does_not_overwrite_newer_records(tmp_path):
+    store = RestaurantStore(str(tmp_path / "store.sqlite3"))
+    recent = crawled("해운대암소갈비", "부산 해운대구", iso(60), 35.16, 129.16, place_id="1", reviews=2000)
+    old = crawled("해운대암소갈비", "부산 해운대구", iso(86400), 35.16, 129.16, place_id="1")
+    assert store.load_crawled_records([recent]) == 1
+    assert store.load_crawled_records([old]) == 0
+    [(_, record)] = store.within_radius(35.16, 129.16, 1)
+    assert record["reviews"] == 2000
+    assert record["place_id"] == "naver:1"
+
+
+def test_naver_and_google_ids_are_stored_separately(tmp_path):
+    store = RestaurantStore(str(tmp_path / "store.sqlite3"))
+    store.upsert_many(
+        [
+            {
+                "place_id": "1",
+                "title": "구글 식당",
+                "gps_coordinates": {"latitude": 35.16, "longitude": 129.16},
+            }
+        ]
+    )
+    store.load_crawled_records([crawled("네이버 식당", "부산 해운대구", iso(60), 35.16, 129.16, place_id="1")])
+    assert len(store) == 2
+
+
+def test_crawled_records_without_coordinates_are_geocoded_in_one_batch(tmp_path, caplog):
+    store = RestaurantStore(str(tmp_path / "store.sqlite3"))
+    batches = []
+
+    def geocode(addresses):
+        batches.append(addresses)
+        return {"부산 해운대구 구남로 1": (35.16, 129.16)}
+
+    records = [
+        crawled("목록 식당", "부산 해운대구 구남로 1", iso(60)),
+        crawled("같은 주소", "부산 해운대구 구남로 1", iso(60)),
+        crawled("찾을 수 없음", "부산 해운대구 없는로 99", iso(60)),
+        crawled("동네 이름만", "해운대구 우동", iso(60)),
+        crawled("주소 없음", None, iso(60)),
+    ]
+    with caplog.at_level("WARNING"):
+        assert store.load_crawled_records(records, geocode) == 2
+
+    # 같은 주소는 한 번만, 동네 이름뿐인 주소는 지오코딩하지 않음
+    assert batches == [["부산 해운대구 구남로 1", "부산 해운대구 없는로 99"]]
+    titles = sorted(r["title"] for _, r in store.within_radius(35.16, 129.16, 1))
+    assert titles == ["같은 주소", "목록 식당"]
+    assert "Skipped 3 crawled records" in caplog.text
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, once
+
+
+def test_once_runs_factory_a_single_time_across_threads():
+    calls = []
+
+    @once
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(factory())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight(result_ttl=0)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return {"spots": [1, 2]}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+    leader.start()
+    started.wait(1)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", compute))) for _ in range(3)
+    ]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"spots": [1, 2]}] * 4
+    assert flight.stats()["shared"] == 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_each_caller_gets_an_independent_copy():
+    flight = SingleFlight(result_ttl=60)
+    first = flight.do("k", lambda: [{"title": "a"}])
+    first[0]["description"] = "수정됨"
+    second = flight.do("k", lambda: [{"title": "b"}])
+    assert second == [{"title": "a"}]
+    assert flight.stats()["hits"] == 1
+
+
+def test_result_cache_expires(monkeypatch):
+    flight = SingleFlight(result_ttl=10)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 1
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert flight.do("k", lambda: 3) == 3
+
+
+def test_errors_propagate_and_are_not_cached():
+    flight = SingleFlight(result_ttl=60)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_waiters_recompute_when_leader_abandons():
+    flight = SingleFlight(result_ttl=60)
+    leader, future = flight.join("k")
+    assert leader
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(flight.do("k", lambda: "recomputed")))
+    waiter.start()
+    time.sleep(0.05)
+    flight.abandon("k", future)
+    waiter.join(1)
+    assert results == ["recomputed"]
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,54 @@
+import pytest
+
+import telemetry
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setattr(telemetry, "TELEMETRY_ENABLED", True)
+    exporter = telemetry.InMemoryExporter()
+    monkeypatch.setattr(telemetry, "_exporter", exporter)
+    return exporter
+
+
+def test_span_records_status_and_nesting(exporter):
+    with telemetry.span("outer"):
+        with telemetry.span("inner", candidates=3):
+            pass
+    inner, outer = exporter.spans()
+    assert (inner.name, outer.name) == ("inner", "outer")
+    assert inner.parent_id == outer.span_id
+    assert inner.status == outer.status == "ok"
+
+
+def test_raised_and_handled_errors_mark_the_span(exporter):
+    with pytest.raises(ValueError):
+        with telemetry.span("raised"):
+            raise ValueError("boom")
+    with telemetry.span("handled") as span:
+        try:
+            raise RuntimeError("timeout")
+        except RuntimeError as e:
+            span.fail(e)
+    raised, handled = exporter.spans()
+    assert (raised.status, raised.error) == ("error", "boom")
+    assert (handled.status, handled.error) == ("error", "timeout")
+    assert 'status="error"' in telemetry.metrics.render_prometheus()
+
+
+def test_geocoding_failure_is_an_error_span(exporter, tmp_path, monkeypatch):
+    import http_client
+    import restaurant_agent_service as service
+    from persistent_cache import PersistentTTLCache
+
+    monkeypatch.setattr(
+        service, "geocode_cache", PersistentTTLCache(str(tmp_path / "geo.sqlite3"), "geo", 60)
+    )
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("unreachable")
+
+    monkeypatch.setattr(http_client, "get", fail)
+    assert service.geocoding_tool._run("부산").startswith("[GeocodingTool] Error")
+    (geocode,) = [s for s in exporter.spans() if s.name == "geocode"]
+    assert geocode.status == "error"